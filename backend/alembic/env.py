@@ -20,6 +20,7 @@ from app.core.database import Base
 from app.models.user import User
 from app.models.permission import Permission
 from app.models.s3_connection import S3Connection
+from app.models.upload_session import UploadSession
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,32 @@
+"""add_s3_connection_endpoint_settings
+
+Revision ID: b4e2a9c7d815
+Revises: 9c1d4e7a2b63
+Create Date: 2026-10-17 10:05:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e2a9c7d815'
+down_revision: Union[str, None] = '9c1d4e7a2b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('s3_connections', sa.Column('endpoint_url', sa.String(), nullable=True))
+    op.add_column('s3_connections', sa.Column('use_accelerate_endpoint', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('s3_connections', sa.Column('use_dualstack_endpoint', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('s3_connections', sa.Column('addressing_style', sa.String(), server_default='auto', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('s3_connections', 'addressing_style')
+    op.drop_column('s3_connections', 'use_dualstack_endpoint')
+    op.drop_column('s3_connections', 'use_accelerate_endpoint')
+    op.drop_column('s3_connections', 'endpoint_url')
@@ -0,0 +1,36 @@
+"""add_s3_connection_client_tuning
+
+Revision ID: d7f3b1e8a4c2
+Revises: b4e2a9c7d815
+Create Date: 2026-10-17 11:20:08.734915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f3b1e8a4c2'
+down_revision: Union[str, None] = 'b4e2a9c7d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('s3_connections', sa.Column('max_pool_connections', sa.Integer(), nullable=True))
+    op.add_column('s3_connections', sa.Column('connect_timeout', sa.Float(), nullable=True))
+    op.add_column('s3_connections', sa.Column('read_timeout', sa.Float(), nullable=True))
+    op.add_column('s3_connections', sa.Column('retry_mode', sa.String(), nullable=True))
+    op.add_column('s3_connections', sa.Column('max_attempts', sa.Integer(), nullable=True))
+    op.add_column('s3_connections', sa.Column('tcp_keepalive', sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('s3_connections', 'tcp_keepalive')
+    op.drop_column('s3_connections', 'max_attempts')
+    op.drop_column('s3_connections', 'retry_mode')
+    op.drop_column('s3_connections', 'read_timeout')
+    op.drop_column('s3_connections', 'connect_timeout')
+    op.drop_column('s3_connections', 'max_pool_connections')
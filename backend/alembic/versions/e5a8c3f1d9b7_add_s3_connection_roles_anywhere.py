@@ -0,0 +1,34 @@
+"""add_s3_connection_roles_anywhere
+
+Revision ID: e5a8c3f1d9b7
+Revises: d7f3b1e8a4c2
+Create Date: 2026-10-17 14:02:51.418263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a8c3f1d9b7'
+down_revision: Union[str, None] = 'd7f3b1e8a4c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('s3_connections', sa.Column('certificate', sa.Text(), nullable=True))
+    op.add_column('s3_connections', sa.Column('private_key', sa.Text(), nullable=True))
+    op.add_column('s3_connections', sa.Column('trust_anchor_arn', sa.String(), nullable=True))
+    op.add_column('s3_connections', sa.Column('profile_arn', sa.String(), nullable=True))
+    op.add_column('s3_connections', sa.Column('roles_anywhere_endpoint_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('s3_connections', 'roles_anywhere_endpoint_url')
+    op.drop_column('s3_connections', 'profile_arn')
+    op.drop_column('s3_connections', 'trust_anchor_arn')
+    op.drop_column('s3_connections', 'private_key')
+    op.drop_column('s3_connections', 'certificate')
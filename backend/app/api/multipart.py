@@ -0,0 +1,303 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.orm import Session
+from typing import Optional
+import math
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.models.s3_connection import S3Connection
+from app.schemas import (
+    MultipartCreateRequest,
+    MultipartCreateResponse,
+    MultipartPartUrlsRequest,
+    MultipartPartUrlsResponse,
+    MultipartPartUrl,
+    MultipartCompleteRequest,
+    MultipartCompleteResponse,
+    MultipartAbortRequest
+)
+from app.api.s3 import sanitize_key, s3_error
+from app.services.async_s3_service import async_s3_service
+from app.services.permission_service import permission_service
+from app.services.audit_service import audit_service
+
+router = APIRouter(prefix="/s3/multipart", tags=["S3 Multipart Uploads"])
+
+MEGABYTE = 1024 * 1024
+
+
+def get_part_size(file_size: Optional[int]) -> int:
+    """
+    Pick a part size that keeps the upload within the S3 part limit
+    Rounded up to whole megabytes
+    """
+    part_size = settings.MULTIPART_MIN_PART_SIZE
+    if file_size:
+        part_size = max(part_size, math.ceil(file_size / settings.MULTIPART_MAX_PARTS))
+    return math.ceil(part_size / MEGABYTE) * MEGABYTE
+
+
+def check_upload_access(
+    db: Session,
+    user: User,
+    bucket_name: str,
+    object_key: str,
+    audit_action: str,
+    request: Request
+) -> Optional[S3Connection]:
+    """
+    Check write permission for a multipart operation
+    Logs failed attempts and returns the S3 connection to use
+    """
+    try:
+        permission = permission_service.check_permission(
+            db=db,
+            user=user,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            action="write"
+        )
+    except HTTPException as e:
+        audit_service.log_action(
+            db=db,
+            user=user,
+            action=audit_action,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            status="failure",
+            ip_address=request.client.host,
+            error_message=e.detail
+        )
+        raise
+
+    return permission.s3_connection if permission else None
+
+
+@router.post("/create", response_model=MultipartCreateResponse)
+async def create_multipart_upload(
+    request_data: MultipartCreateRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a multipart upload and return its upload id and part size
+    """
+    if request_data.file_size and request_data.file_size > settings.MULTIPART_MAX_OBJECT_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File exceeds the maximum object size of {settings.MULTIPART_MAX_OBJECT_SIZE} bytes"
+        )
+
+    object_key = sanitize_key(request_data.object_key)
+    s3_connection = check_upload_access(
+        db, current_user, request_data.bucket_name, object_key, "multipart_initiated", request
+    )
+
+    try:
+        upload_id = await async_s3_service.create_multipart_upload(
+            bucket_name=request_data.bucket_name,
+            object_key=object_key,
+            content_type=request_data.content_type,
+            connection=s3_connection
+        )
+    except Exception as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="multipart_initiated",
+            bucket_name=request_data.bucket_name,
+            object_key=object_key,
+            status="failure",
+            ip_address=request.client.host,
+            error_message=str(e)
+        )
+        raise s3_error(e, "Failed to create multipart upload")
+
+    part_size = get_part_size(request_data.file_size)
+    part_count = math.ceil(request_data.file_size / part_size) if request_data.file_size else None
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="multipart_initiated",
+        bucket_name=request_data.bucket_name,
+        object_key=object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={"upload_id": upload_id, "file_size": request_data.file_size, "part_size": part_size}
+    )
+
+    return MultipartCreateResponse(
+        bucket_name=request_data.bucket_name,
+        object_key=object_key,
+        upload_id=upload_id,
+        part_size=part_size,
+        part_count=part_count
+    )
+
+
+@router.post("/part-urls", response_model=MultipartPartUrlsResponse)
+async def get_part_urls(
+    request_data: MultipartPartUrlsRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Presign a batch of part upload URLs so parts can be sent in parallel
+    """
+    part_numbers = sorted(set(request_data.part_numbers))
+    if len(part_numbers) > settings.MULTIPART_URL_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.MULTIPART_URL_BATCH_SIZE} part URLs per request"
+        )
+    if part_numbers[0] < 1 or part_numbers[-1] > settings.MULTIPART_MAX_PARTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part numbers must be between 1 and {settings.MULTIPART_MAX_PARTS}"
+        )
+
+    s3_connection = check_upload_access(
+        db, current_user, request_data.bucket_name, request_data.object_key, "multipart_part_urls", request
+    )
+
+    try:
+        urls = await async_s3_service.generate_presigned_part_urls(
+            bucket_name=request_data.bucket_name,
+            object_key=request_data.object_key,
+            upload_id=request_data.upload_id,
+            part_numbers=part_numbers,
+            connection=s3_connection
+        )
+    except Exception as e:
+        raise s3_error(e, "Failed to generate part URLs")
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="multipart_part_urls",
+        bucket_name=request_data.bucket_name,
+        object_key=request_data.object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={"upload_id": request_data.upload_id, "part_count": len(part_numbers)}
+    )
+
+    return MultipartPartUrlsResponse(
+        upload_id=request_data.upload_id,
+        parts=[MultipartPartUrl(part_number=number, url=url) for number, url in urls.items()],
+        expires_in=settings.PRESIGNED_URL_EXPIRATION
+    )
+
+
+@router.post("/complete", response_model=MultipartCompleteResponse)
+async def complete_multipart_upload(
+    request_data: MultipartCompleteRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Assemble the uploaded parts into the final object
+    """
+    s3_connection = check_upload_access(
+        db, current_user, request_data.bucket_name, request_data.object_key, "upload", request
+    )
+
+    try:
+        result = await async_s3_service.complete_multipart_upload(
+            bucket_name=request_data.bucket_name,
+            object_key=request_data.object_key,
+            upload_id=request_data.upload_id,
+            parts=[part.model_dump() for part in request_data.parts],
+            connection=s3_connection
+        )
+    except Exception as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="upload",
+            bucket_name=request_data.bucket_name,
+            object_key=request_data.object_key,
+            status="failure",
+            ip_address=request.client.host,
+            metadata={"upload_id": request_data.upload_id, "multipart": True},
+            error_message=str(e)
+        )
+        raise s3_error(e, "Failed to complete multipart upload")
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="upload",
+        bucket_name=request_data.bucket_name,
+        object_key=request_data.object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={
+            "upload_id": request_data.upload_id,
+            "multipart": True,
+            "part_count": len(request_data.parts)
+        }
+    )
+
+    return MultipartCompleteResponse(
+        bucket_name=request_data.bucket_name,
+        object_key=request_data.object_key,
+        etag=result['etag'],
+        location=result['location']
+    )
+
+
+@router.post("/abort")
+async def abort_multipart_upload(
+    request_data: MultipartAbortRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Abort a multipart upload and discard the parts uploaded so far
+    """
+    s3_connection = check_upload_access(
+        db, current_user, request_data.bucket_name, request_data.object_key, "multipart_abort", request
+    )
+
+    try:
+        await async_s3_service.abort_multipart_upload(
+            bucket_name=request_data.bucket_name,
+            object_key=request_data.object_key,
+            upload_id=request_data.upload_id,
+            connection=s3_connection
+        )
+    except Exception as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="multipart_abort",
+            bucket_name=request_data.bucket_name,
+            object_key=request_data.object_key,
+            status="failure",
+            ip_address=request.client.host,
+            metadata={"upload_id": request_data.upload_id},
+            error_message=str(e)
+        )
+        raise s3_error(e, "Failed to abort multipart upload")
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="multipart_abort",
+        bucket_name=request_data.bucket_name,
+        object_key=request_data.object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={"upload_id": request_data.upload_id}
+    )
+
+    return {
+        "message": "Multipart upload aborted"
+    }
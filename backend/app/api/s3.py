@@ -1,28 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
+from datetime import datetime, timezone
+import asyncio
+import json
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+from app.core.database import SessionLocal, get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.schemas import (
     PresignedUrlRequest,
     PresignedUrlResponse,
+    PresignedUrlBatchRequest,
+    PresignedUrlBatchResponse,
+    PresignedUrlBatchResult,
+    UploadPolicyRequest,
+    UploadPolicyResponse,
     S3ListResponse,
     S3Object
 )
 from app.services.s3_service import s3_service
+from app.services.async_s3_service import async_s3_service
 from app.services.permission_service import permission_service
 from app.services.audit_service import audit_service
+from app.services.connection_guard import ConnectionUnavailableError
 
 router = APIRouter(prefix="/s3", tags=["S3 Operations"])
 
+# Prefix of the continuation tokens of sorted or filtered listings
+LISTING_OFFSET_TOKEN = "offset:"
+
 
 class UploadCompleteRequest(BaseModel):
     bucket_name: str
     object_key: str
     status: str  # 'success' or 'failure'
     error_message: Optional[str] = None
+    upload_prefix: Optional[str] = None  # Set when uploaded with a prefix-scoped upload policy
 
 
 @router.post("/upload-complete")
@@ -35,6 +52,17 @@ async def notify_upload_complete(
     """
     Receive notification of upload completion from frontend
     """
+    if request_data.status == "success":
+        # Only a user who may write the key can have changed its listings
+        try:
+            permission_service.check_permission(
+                db, current_user, request_data.bucket_name, request_data.object_key, "write"
+            )
+        except HTTPException:
+            pass
+        else:
+            s3_service.listings.invalidate(request_data.bucket_name, request_data.object_key)
+    
     try:
         # Log the actual upload result
         audit_service.log_action(
@@ -45,6 +73,7 @@ async def notify_upload_complete(
             object_key=request_data.object_key,
             status=request_data.status,
             ip_address=request.client.host,
+            metadata={"upload_prefix": request_data.upload_prefix} if request_data.upload_prefix is not None else None,
             error_message=request_data.error_message
         )
         
@@ -74,6 +103,29 @@ def sanitize_key(key: str) -> str:
     parts[-1] = safe_filename
     return '/'.join(parts)
 
+
+def s3_error(e: Exception, message: str) -> HTTPException:
+    """
+    Build the HTTPException for a failed S3 call
+    Calls the connection guard rejected map to 503 with Retry-After,
+    calls cut short by the request deadline to 504
+    """
+    if isinstance(e, DeadlineExceeded):
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"{message}: {str(e)}"
+        )
+    if isinstance(e, ConnectionUnavailableError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{message}: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"{message}: {str(e)}"
+    )
+
 @router.post("/presigned-url", response_model=PresignedUrlResponse)
 async def get_presigned_url(
     request_data: PresignedUrlRequest,
@@ -127,7 +179,7 @@ async def get_presigned_url(
     try:
         if request_data.operation == "upload":
             # Use presigned POST for uploads
-            response = s3_service.generate_presigned_post(
+            response = await async_s3_service.generate_presigned_post(
                 bucket_name=request_data.bucket_name,
                 object_key=object_key,
                 connection=s3_connection
@@ -151,7 +203,7 @@ async def get_presigned_url(
             )
         else:
             # Use presigned GET for downloads
-            url = s3_service.generate_presigned_url(
+            url = await async_s3_service.generate_presigned_url(
                 bucket_name=request_data.bucket_name,
                 object_key=object_key,
                 operation="get_object",
@@ -186,23 +238,244 @@ async def get_presigned_url(
             ip_address=request.client.host,
             error_message=str(e)
         )
+        raise s3_error(e, "Failed to generate presigned URL")
+
+
+@router.post("/presigned-urls", response_model=PresignedUrlBatchResponse)
+async def get_presigned_urls(
+    request_data: PresignedUrlBatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generate presigned URLs for many objects in one request
+    Permissions are checked against one snapshot and all audit entries are written in one insert
+    """
+    if len(request_data.items) > settings.PRESIGN_BATCH_MAX_ITEMS:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate presigned URL: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PRESIGN_BATCH_MAX_ITEMS} items per request"
+        )
+    
+    # Snapshot of the user's permissions, grouped by bucket (admins need none)
+    permissions_by_bucket = {}
+    if not current_user.is_admin:
+        for perm in permission_service.get_user_permissions(db, current_user):
+            permissions_by_bucket.setdefault(perm.bucket_name, []).append(perm)
+    
+    results = []
+    signing = []
+    for item in request_data.items:
+        object_key = item.object_key
+        if item.operation == "upload":
+            object_key = sanitize_key(object_key)
+        action = "write" if item.operation == "upload" else "read"
+        result = PresignedUrlBatchResult(
+            bucket_name=item.bucket_name,
+            object_key=object_key,
+            operation=item.operation
         )
+        results.append(result)
+        
+        s3_connection = None
+        if not current_user.is_admin:
+            try:
+                permission = permission_service.match_permission(
+                    permissions_by_bucket.get(item.bucket_name, []),
+                    item.bucket_name,
+                    object_key,
+                    action
+                )
+            except HTTPException as e:
+                result.error = e.detail
+                continue
+            # Loaded together with the permission (lazy="joined")
+            s3_connection = permission.s3_connection
+        signing.append((result, (item.bucket_name, object_key, item.operation, s3_connection)))
+    
+    # Every permitted item is signed in one worker thread hop
+    signed = await async_s3_service.generate_presigned_batch([request for _, request in signing]) if signing else []
+    for (result, _), response in zip(signing, signed):
+        if 'error' in response:
+            result.error = f"Failed to generate presigned URL: {str(response['error'])}"
+        else:
+            result.url = response['url']
+            result.fields = response.get('fields')
+            result.expires_in = settings.PRESIGNED_URL_EXPIRATION
+    
+    audit_entries = []
+    for result in results:
+        if result.error:
+            audit_entries.append({
+                'action': result.operation,
+                'bucket_name': result.bucket_name,
+                'object_key': result.object_key,
+                'status': "failure",
+                'error_message': result.error
+            })
+        else:
+            audit_entries.append({
+                'action': f"{result.operation}_initiated",
+                'bucket_name': result.bucket_name,
+                'object_key': result.object_key,
+                'status': "success"
+            })
+    
+    audit_service.log_actions_bulk(
+        db=db,
+        user=current_user,
+        entries=audit_entries,
+        ip_address=request.client.host
+    )
+    
+    error_count = sum(1 for result in results if result.error)
+    return PresignedUrlBatchResponse(
+        results=results,
+        success_count=len(results) - error_count,
+        error_count=error_count
+    )
+
+
+@router.post("/upload-policy", response_model=UploadPolicyResponse)
+async def get_upload_policy(
+    request_data: UploadPolicyRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generate one presigned POST policy for uploading any number of files under a prefix
+    Clients set the 'key' form field to any key starting with the prefix
+    """
+    prefix = request_data.prefix.lstrip('/')
+    max_size = min(request_data.max_size or settings.MAX_UPLOAD_SIZE, settings.MAX_UPLOAD_SIZE)
+    expires_in = min(
+        request_data.expires_in or settings.PRESIGNED_URL_EXPIRATION,
+        settings.UPLOAD_POLICY_MAX_EXPIRATION
+    )
+    
+    # Write access to the prefix covers every key below it
+    try:
+        permission = permission_service.check_permission(
+            db=db,
+            user=current_user,
+            bucket_name=request_data.bucket_name,
+            object_key=prefix,
+            action="write"
+        )
+    except HTTPException as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="upload_session",
+            bucket_name=request_data.bucket_name,
+            object_key=prefix,
+            status="failure",
+            ip_address=request.client.host,
+            error_message=e.detail
+        )
+        raise
+    
+    s3_connection = permission.s3_connection if permission else None
+    
+    try:
+        response = await async_s3_service.generate_presigned_post_for_prefix(
+            bucket_name=request_data.bucket_name,
+            prefix=prefix,
+            expiration=expires_in,
+            max_size=max_size,
+            connection=s3_connection
+        )
+    except Exception as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="upload_session",
+            bucket_name=request_data.bucket_name,
+            object_key=prefix,
+            status="failure",
+            ip_address=request.client.host,
+            error_message=str(e)
+        )
+        raise s3_error(e, "Failed to generate upload policy")
+    
+    # Individual files are recorded through /upload-complete
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="upload_session_initiated",
+        bucket_name=request_data.bucket_name,
+        object_key=prefix,
+        status="success",
+        ip_address=request.client.host,
+        metadata={"max_size": max_size, "expires_in": expires_in}
+    )
+    
+    return UploadPolicyResponse(
+        url=response['url'],
+        fields=response['fields'],
+        prefix=prefix,
+        max_size=max_size,
+        expires_in=expires_in
+    )
 
 
 @router.get("/list/{bucket_name}", response_model=S3ListResponse)
 async def list_objects(
     bucket_name: str,
     prefix: str = "",
+    continuation_token: Optional[str] = None,
+    start_after: Optional[str] = None,
+    page_size: int = Query(1000, ge=1, le=1000),
+    delimiter: Optional[str] = None,
+    sort: Optional[str] = Query(None, pattern="^(name|size|last_modified)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    extension: Optional[str] = None,
+    search: Optional[str] = None,
+    modified_after: Optional[datetime] = None,
+    modified_before: Optional[datetime] = None,
+    summary: bool = False,
     request: Request = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    List objects in an S3 bucket with optional prefix
+    List one page of objects in an S3 bucket with optional prefix
+
+    Pass the ``next_token`` of a response as ``continuation_token`` to get
+    the following page; ``start_after`` starts the first page after a key.
+    With ``delimiter=/`` (folder mode) only the objects directly under the
+    prefix are returned, and sub-folders come back in ``directories``.
+
+    ``sort``/``order``, the filters (``extension``, a comma-separated list,
+    ``search``, a name substring, and the ``modified_after``/``modified_before``
+    range) and ``summary`` are applied to the whole prefix on the server;
+    the response then also carries the count and total size of the matches.
     """
+    querying = bool(sort or extension or search or modified_after or modified_before or summary)
+    offset = 0
+    if querying:
+        if start_after:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_after cannot be combined with sorting, filtering or a summary"
+            )
+        # Pages of a sorted or filtered listing are addressed by offset
+        if continuation_token:
+            position = continuation_token[len(LISTING_OFFSET_TOKEN):]
+            if not continuation_token.startswith(LISTING_OFFSET_TOKEN) or not position.isdigit():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid continuation token for a sorted or filtered listing"
+                )
+            offset = int(position)
+        # Object dates are timezone-aware; dates given without an offset are UTC
+        if modified_after and modified_after.tzinfo is None:
+            modified_after = modified_after.replace(tzinfo=timezone.utc)
+        if modified_before and modified_before.tzinfo is None:
+            modified_before = modified_before.replace(tzinfo=timezone.utc)
+
     # Check list permission and get the permission object
     try:
         permission = permission_service.check_permission(
@@ -216,7 +489,6 @@ async def list_objects(
         # Check for partial access if forbidden
         if e.status_code == status.HTTP_403_FORBIDDEN:
             from app.models.permission import Permission
-            from datetime import datetime
             
             # Find permissions that are sub-paths of requested prefix
             user_permissions = db.query(Permission).filter(
@@ -237,20 +509,24 @@ async def list_objects(
                         allowed_prefixes.add(parts[0] + '/')
             
             if allowed_prefixes:
-                synthetic_objects = []
-                for p in sorted(allowed_prefixes):
-                    synthetic_objects.append(S3Object(
-                        key=prefix + p,
+                directories = [prefix + p for p in sorted(allowed_prefixes)]
+                # Recursive listings also get them as objects, as clients folding keys into folders expect
+                synthetic_objects = [] if delimiter else [
+                    S3Object(
+                        key=directory,
                         size=0,
                         last_modified=datetime.utcnow(),
                         etag="directory"
-                    ))
+                    )
+                    for directory in directories
+                ]
                 
                 return S3ListResponse(
                     objects=synthetic_objects,
                     prefix=prefix,
                     bucket_name=bucket_name,
-                    has_more=False
+                    has_more=False,
+                    directories=directories
                 )
 
         # Log failed attempt
@@ -276,11 +552,38 @@ async def list_objects(
     
     # List objects
     try:
-        objects = s3_service.list_objects(
-            bucket_name=bucket_name,
-            prefix=prefix,
-            connection=s3_connection
-        )
+        if querying:
+            result = await async_s3_service.query_objects(
+                bucket_name=bucket_name,
+                prefix=prefix,
+                connection=s3_connection,
+                delimiter=delimiter,
+                sort=sort or "name",
+                descending=order == "desc",
+                extensions=[part.strip() for part in (extension or "").split(',') if part.strip()] or None,
+                contains=search,
+                modified_after=modified_after,
+                modified_before=modified_before
+            )
+            end = offset + page_size
+            page = {
+                'objects': result['objects'][offset:end],
+                # Sub-folders come with the first page
+                'prefixes': result['prefixes'] if offset == 0 else [],
+                'next_token': f"{LISTING_OFFSET_TOKEN}{end}" if end < len(result['objects']) else None,
+                'summary': result['summary']
+            }
+        else:
+            page = await async_s3_service.list_objects_cached(
+                bucket_name=bucket_name,
+                prefix=prefix,
+                max_keys=page_size,
+                connection=s3_connection,
+                continuation_token=continuation_token,
+                start_after=start_after,
+                delimiter=delimiter
+            )
+        objects = page['objects']
         
         # Log successful list
         audit_service.log_action(
@@ -291,7 +594,17 @@ async def list_objects(
             object_key=prefix,
             status="success",
             ip_address=request.client.host if request else None,
-            metadata={"object_count": len(objects)}
+            metadata={
+                "object_count": len(objects),
+                "directory_count": len(page['prefixes']),
+                **({"query": {
+                    "sort": sort,
+                    "order": order,
+                    "extension": extension,
+                    "search": search,
+                    "matched": page['summary']['count']
+                }} if querying else {})
+            }
         )
         
         s3_objects = [
@@ -308,7 +621,10 @@ async def list_objects(
             objects=s3_objects,
             prefix=prefix,
             bucket_name=bucket_name,
-            has_more=len(objects) >= 1000
+            has_more=page['next_token'] is not None,
+            next_token=page['next_token'],
+            directories=page['prefixes'],
+            summary=page.get('summary')
         )
     
     except Exception as e:
@@ -323,10 +639,132 @@ async def list_objects(
             ip_address=request.client.host if request else None,
             error_message=str(e)
         )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list objects: {str(e)}"
+        raise s3_error(e, "Failed to list objects")
+
+
+@router.get("/list-stream/{bucket_name}")
+async def stream_objects(
+    bucket_name: str,
+    prefix: str = "",
+    page_size: int = Query(1000, ge=1, le=1000),
+    request: Request = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream every object under a prefix as NDJSON, one object per line
+
+    Pages are fetched from S3 as the client reads, at most one page ahead,
+    so memory stays bounded however many keys the prefix holds. A failure
+    after streaming started ends the stream with an ``{"error": ...}`` line.
+    One audit entry with the object count is written when the stream ends.
+    """
+    try:
+        permission = permission_service.check_permission(
+            db=db,
+            user=current_user,
+            bucket_name=bucket_name,
+            object_key=prefix,
+            action="list"
+        )
+    except HTTPException as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="list",
+            bucket_name=bucket_name,
+            object_key=prefix,
+            status="failure",
+            ip_address=request.client.host if request else None,
+            metadata={"stream": True},
+            error_message=e.detail
         )
+        raise
+    
+    s3_connection = None
+    if permission and permission.s3_connection_id:
+        from app.models.s3_connection import S3Connection
+        s3_connection = db.query(S3Connection).filter(
+            S3Connection.id == permission.s3_connection_id
+        ).first()
+    
+    def fetch(token: Optional[str]):
+        return asyncio.ensure_future(async_s3_service.list_objects(
+            bucket_name=bucket_name,
+            prefix=prefix,
+            max_keys=page_size,
+            connection=s3_connection,
+            continuation_token=token
+        ))
+    
+    # Fail before any byte is sent when the first page cannot be listed
+    try:
+        first_page = await fetch(None)
+    except Exception as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="list",
+            bucket_name=bucket_name,
+            object_key=prefix,
+            status="failure",
+            ip_address=request.client.host if request else None,
+            metadata={"stream": True},
+            error_message=str(e)
+        )
+        raise s3_error(e, "Failed to list objects")
+    
+    ip_address = request.client.host if request else None
+    
+    async def lines() -> AsyncIterator[str]:
+        object_count = 0
+        pages = 0
+        outcome, error = "cancelled", None
+        page, pending = first_page, None
+        try:
+            while True:
+                pages += 1
+                # Fetch the next page while this one is being sent
+                if page['next_token']:
+                    pending = fetch(page['next_token'])
+                yield ''.join(
+                    json.dumps({
+                        "key": obj['key'],
+                        "size": obj['size'],
+                        "last_modified": obj['last_modified'].isoformat(),
+                        "etag": obj['etag']
+                    }) + '\n'
+                    for obj in page['objects']
+                )
+                object_count += len(page['objects'])
+                if pending is None:
+                    break
+                page, pending = await pending, None
+            outcome = "success"
+        except Exception as e:
+            outcome, error = "failure", str(e)
+            yield json.dumps({"error": f"Failed to list objects: {error}"}) + '\n'
+        finally:
+            if pending is not None:
+                pending.cancel()
+            # The request's session may already be closed while the body streams
+            audit_db = SessionLocal()
+            try:
+                audit_service.log_action(
+                    db=audit_db,
+                    user=current_user,
+                    action="list",
+                    bucket_name=bucket_name,
+                    object_key=prefix,
+                    status=outcome,
+                    ip_address=ip_address,
+                    metadata={"stream": True, "object_count": object_count, "pages": pages},
+                    error_message=error
+                )
+            finally:
+                audit_db.close()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.get("/buckets", response_model=List[str])
@@ -341,7 +779,7 @@ async def list_buckets(
     try:
         if current_user.is_admin:
             # Admin can see all buckets
-            return s3_service.list_buckets()
+            return await async_s3_service.list_buckets()
         else:
             # Regular users see only their accessible buckets
             # This would be retrieved from their permissions
@@ -350,10 +788,7 @@ async def list_buckets(
                 detail="Use /api/v1/permissions/my-permissions to see your accessible buckets"
             )
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list buckets: {str(e)}"
-        )
+        raise s3_error(e, "Failed to list buckets")
 
 
 @router.delete("/object/{bucket_name}/{object_key:path}")
@@ -365,7 +800,7 @@ async def delete_object(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Delete an S3 object (generates presigned DELETE URL)
+    Delete an S3 object
     """
     # Check delete permission
     try:
@@ -400,7 +835,7 @@ async def delete_object(
     
     try:
         # Delete object directly
-        s3_service.delete_object(
+        await async_s3_service.delete_object(
             bucket_name=bucket_name,
             object_key=object_key,
             connection=s3_connection
@@ -433,7 +868,4 @@ async def delete_object(
             ip_address=request.client.host,
             error_message=str(e)
         )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate delete URL: {str(e)}"
-        )
+        raise s3_error(e, "Failed to delete object")
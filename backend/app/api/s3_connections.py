@@ -1,33 +1,84 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Any
 from app.core.database import get_db
 from app.core.security import get_current_active_admin
 from app.models.user import User
-from app.models.s3_connection import S3Connection
+from app.models.s3_connection import S3Connection, AuthMethod, decrypted_credentials
 from app.schemas import (
     S3ConnectionCreate,
     S3ConnectionUpdate,
     S3ConnectionResponse,
-    S3ConnectionList
+    S3ConnectionList,
+    ConnectionHealth
 )
-from app.services.s3_service import s3_service
+from app.services.s3_service import s3_service, s3_client_metrics
+from app.services.async_s3_service import async_s3_service
+from app.services.credential_manager import credential_manager
+from app.services.multipart_reaper import multipart_reaper
+from app.services.warmup import warmup_service
+from app.services.connection_health import connection_health
+from app.services.connection_guard import connection_guard
+from app.services.request_hedger import request_hedger
+from app.services.adaptive_limiter import adaptive_limiter
+from app.services.roles_anywhere import RolesAnywhereError, validate_credentials
+from app.services import sigv4
 
 router = APIRouter(
     prefix="/s3-connections",
     tags=["s3-connections"]
 )
 
+# Connection columns an update may not set to null
+NON_NULLABLE_FIELDS = {
+    "name",
+    "account_id",
+    "region",
+    "auth_method",
+    "use_accelerate_endpoint",
+    "use_dualstack_endpoint",
+    "addressing_style",
+    "is_active"
+}
+
+def check_endpoint_settings(endpoint_url, use_accelerate_endpoint) -> None:
+    """Reject endpoint combinations botocore cannot resolve"""
+    if endpoint_url and use_accelerate_endpoint:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A custom endpoint URL cannot be combined with Transfer Acceleration"
+        )
+
+def check_roles_anywhere_settings(auth_method, role_arn, trust_anchor_arn, profile_arn, certificate, private_key) -> None:
+    """Require a usable certificate, key and ARNs for IAM Roles Anywhere connections"""
+    if auth_method != AuthMethod.IAM_ROLES_ANYWHERE:
+        return
+    if not (role_arn and trust_anchor_arn and profile_arn and certificate and private_key):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="IAM Roles Anywhere needs a role ARN, trust anchor ARN, profile ARN, certificate and private key"
+        )
+    try:
+        validate_credentials(certificate, private_key)
+    except RolesAnywhereError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.get("/", response_model=List[S3ConnectionList])
 async def list_s3_connections(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """
-    List all S3 connections
+    List all S3 connections with their cached health (inactive ones are not probed)
     """
     connections = db.query(S3Connection).all()
-    return connections
+    return [
+        S3ConnectionList.model_validate(connection).model_copy(update={
+            "health": ConnectionHealth(**connection_health.get(connection.id)) if connection.is_active else None
+        })
+        for connection in connections
+    ]
 
 @router.post("/", response_model=S3ConnectionResponse)
 async def create_s3_connection(
@@ -38,6 +89,16 @@ async def create_s3_connection(
     """
     Create a new S3 connection
     """
+    check_endpoint_settings(connection_in.endpoint_url, connection_in.use_accelerate_endpoint)
+    check_roles_anywhere_settings(
+        connection_in.auth_method,
+        connection_in.role_arn,
+        connection_in.trust_anchor_arn,
+        connection_in.profile_arn,
+        connection_in.certificate,
+        connection_in.private_key
+    )
+    
     # Check if name exists
     if db.query(S3Connection).filter(S3Connection.name == connection_in.name).first():
         raise HTTPException(
@@ -52,6 +113,19 @@ async def create_s3_connection(
         auth_method=connection_in.auth_method,
         role_arn=connection_in.role_arn,
         external_id=connection_in.external_id,
+        trust_anchor_arn=connection_in.trust_anchor_arn,
+        profile_arn=connection_in.profile_arn,
+        roles_anywhere_endpoint_url=connection_in.roles_anywhere_endpoint_url,
+        endpoint_url=connection_in.endpoint_url,
+        use_accelerate_endpoint=connection_in.use_accelerate_endpoint,
+        use_dualstack_endpoint=connection_in.use_dualstack_endpoint,
+        addressing_style=connection_in.addressing_style,
+        max_pool_connections=connection_in.max_pool_connections,
+        connect_timeout=connection_in.connect_timeout,
+        read_timeout=connection_in.read_timeout,
+        retry_mode=connection_in.retry_mode,
+        max_attempts=connection_in.max_attempts,
+        tcp_keepalive=connection_in.tcp_keepalive,
         is_active=connection_in.is_active
     )
     
@@ -60,12 +134,86 @@ async def create_s3_connection(
         connection.access_key_id = connection_in.access_key_id
     if connection_in.secret_access_key:
         connection.secret_access_key = connection_in.secret_access_key
+    if connection_in.certificate:
+        connection.certificate = connection_in.certificate
+    if connection_in.private_key:
+        connection.private_key = connection_in.private_key
         
     db.add(connection)
     db.commit()
     db.refresh(connection)
     return connection
 
+@router.get("/metrics")
+async def get_s3_connection_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Get S3 client instrumentation (cache hit/miss counters, credential refreshes)
+    """
+    return {
+        "client_cache": s3_service.client_cache.stats(),
+        "bucket_regions": s3_service.bucket_regions.stats(),
+        "listings": s3_service.listings.stats(),
+        "http": s3_client_metrics.stats(),
+        "hedging": request_hedger.stats(),
+        "adaptive_concurrency": adaptive_limiter.stats(),
+        "credentials": credential_manager.stats(),
+        "decrypted_credentials": decrypted_credentials.stats(),
+        "presign": {
+            **s3_service.presign_stats(),
+            "signing_key_cache": sigv4.signing_key_cache_info()
+        },
+        "multipart_reaper": multipart_reaper.stats(),
+        "warmup": warmup_service.stats()
+    }
+
+@router.get("/circuits")
+async def get_s3_connection_circuits(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Get circuit breaker state and bulkhead usage per S3 connection
+    """
+    return connection_guard.stats()
+
+@router.get("/health")
+async def get_s3_connection_health(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Get the cached health of every probed S3 connection
+    """
+    return connection_health.stats()
+
+@router.post("/{connection_id}/health/check", response_model=ConnectionHealth)
+async def check_s3_connection_health(
+    connection_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Probe a connection now instead of waiting for the next background round
+    """
+    connection = db.query(S3Connection).filter(S3Connection.id == connection_id).first()
+    if not connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="S3 connection not found"
+        )
+    return await run_in_threadpool(connection_health.check, connection)
+
+@router.post("/{connection_id}/circuit/reset")
+async def reset_s3_connection_circuit(
+    connection_id: int,
+    current_user: User = Depends(get_current_active_admin)
+):
+    """
+    Close a connection's circuit so calls are sent again immediately
+    """
+    connection_guard.reset(connection_id)
+    return {"message": "Circuit reset"}
+
 @router.get("/{connection_id}", response_model=S3ConnectionResponse)
 async def get_s3_connection(
     connection_id: int,
@@ -108,20 +256,45 @@ async def update_s3_connection(
                 detail="Connection with this name already exists"
             )
             
-    # Update fields
-    update_data = connection_in.model_dump(exclude_unset=True)
+    # Update fields; an explicit null cannot clear a NOT NULL column, so it leaves it unchanged
+    update_data = {
+        field: value for field, value in connection_in.model_dump(exclude_unset=True).items()
+        if value is not None or field not in NON_NULLABLE_FIELDS
+    }
+    check_endpoint_settings(
+        update_data.get('endpoint_url', connection.endpoint_url),
+        update_data.get('use_accelerate_endpoint', connection.use_accelerate_endpoint)
+    )
+    
+    # A blank certificate or key keeps the stored one
+    certificate = update_data.pop('certificate', None) or connection.certificate
+    private_key = update_data.pop('private_key', None) or connection.private_key
+    check_roles_anywhere_settings(
+        update_data.get('auth_method', connection.auth_method),
+        update_data.get('role_arn', connection.role_arn),
+        update_data.get('trust_anchor_arn', connection.trust_anchor_arn),
+        update_data.get('profile_arn', connection.profile_arn),
+        certificate,
+        private_key
+    )
     
     # Handle encrypted fields separately
     if 'access_key_id' in update_data:
         connection.access_key_id = update_data.pop('access_key_id')
     if 'secret_access_key' in update_data:
         connection.secret_access_key = update_data.pop('secret_access_key')
+    if connection_in.certificate:
+        connection.certificate = certificate
+    if connection_in.private_key:
+        connection.private_key = private_key
         
     for field, value in update_data.items():
         setattr(connection, field, value)
         
     db.commit()
     db.refresh(connection)
+    s3_service.invalidate_connection(connection.id)
+    connection_health.invalidate(connection.id)
     return connection
 
 @router.delete("/{connection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -149,6 +322,8 @@ async def delete_s3_connection(
         
     db.delete(connection)
     db.commit()
+    s3_service.invalidate_connection(connection_id)
+    connection_health.invalidate(connection_id)
     return None
 
 @router.post("/test", status_code=status.HTTP_200_OK)
@@ -159,6 +334,16 @@ async def test_s3_connection(
     """
     Test an S3 connection configuration without saving it
     """
+    check_endpoint_settings(connection_in.endpoint_url, connection_in.use_accelerate_endpoint)
+    check_roles_anywhere_settings(
+        connection_in.auth_method,
+        connection_in.role_arn,
+        connection_in.trust_anchor_arn,
+        connection_in.profile_arn,
+        connection_in.certificate,
+        connection_in.private_key
+    )
+    
     # Create a temporary connection object (not saved to DB)
     temp_connection = S3Connection(
         name=connection_in.name,
@@ -166,15 +351,32 @@ async def test_s3_connection(
         region=connection_in.region,
         auth_method=connection_in.auth_method,
         role_arn=connection_in.role_arn,
-        external_id=connection_in.external_id
+        external_id=connection_in.external_id,
+        trust_anchor_arn=connection_in.trust_anchor_arn,
+        profile_arn=connection_in.profile_arn,
+        roles_anywhere_endpoint_url=connection_in.roles_anywhere_endpoint_url,
+        endpoint_url=connection_in.endpoint_url,
+        use_accelerate_endpoint=connection_in.use_accelerate_endpoint,
+        use_dualstack_endpoint=connection_in.use_dualstack_endpoint,
+        addressing_style=connection_in.addressing_style,
+        max_pool_connections=connection_in.max_pool_connections,
+        connect_timeout=connection_in.connect_timeout,
+        read_timeout=connection_in.read_timeout,
+        retry_mode=connection_in.retry_mode,
+        max_attempts=connection_in.max_attempts,
+        tcp_keepalive=connection_in.tcp_keepalive
     )
     
     if connection_in.access_key_id:
         temp_connection.access_key_id = connection_in.access_key_id
     if connection_in.secret_access_key:
         temp_connection.secret_access_key = connection_in.secret_access_key
+    if connection_in.certificate:
+        temp_connection.certificate = connection_in.certificate
+    if connection_in.private_key:
+        temp_connection.private_key = connection_in.private_key
         
-    result = s3_service.test_connection(temp_connection)
+    result = await async_s3_service.test_connection(temp_connection)
     
     if not result["success"]:
         raise HTTPException(
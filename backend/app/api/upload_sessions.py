@@ -0,0 +1,394 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from botocore.exceptions import ClientError
+from typing import List, Optional
+import math
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.models.upload_session import UploadSession
+from app.schemas import (
+    UploadSessionCreate,
+    UploadSessionResponse,
+    UploadSessionStatus,
+    UploadSessionPart,
+    UploadSessionPartUrlsRequest,
+    UploadSessionPartsRequest,
+    MultipartPartUrlsResponse,
+    MultipartPartUrl
+)
+from app.api.s3 import sanitize_key, s3_error
+from app.api.multipart import check_upload_access, get_part_size
+from app.services.async_s3_service import async_s3_service
+from app.services.audit_service import audit_service
+
+router = APIRouter(prefix="/upload-sessions", tags=["Upload Sessions"])
+
+
+def get_owned_session(db: Session, session_id: int, user: User, for_update: bool = False) -> UploadSession:
+    """
+    Get an upload session that belongs to the user (404 otherwise)
+    ``for_update`` locks the row until the transaction ends
+    """
+    query = db.query(UploadSession).filter(
+        UploadSession.id == session_id,
+        UploadSession.user_id == user.id
+    )
+    if for_update:
+        query = query.with_for_update().populate_existing()
+    upload_session = query.first()
+    if not upload_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return upload_session
+
+
+def require_in_progress(upload_session: UploadSession) -> None:
+    if upload_session.status != "in_progress":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {upload_session.status}"
+        )
+
+
+async def get_stored_parts(db: Session, upload_session: UploadSession) -> List[UploadSessionPart]:
+    """
+    Get the parts S3 has stored for an upload session (ListParts)
+    ListParts is strongly consistent, so a part the client recorded but S3
+    does not list was never stored and has to be uploaded again
+    """
+    try:
+        stored = await async_s3_service.list_parts(
+            bucket_name=upload_session.bucket_name,
+            object_key=upload_session.object_key,
+            upload_id=upload_session.upload_id,
+            connection=upload_session.s3_connection
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'NoSuchUpload':
+            # Aborted on S3 (expired or reaped), it can no longer be resumed
+            upload_session.status = "aborted"
+            db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Multipart upload no longer exists, start a new upload session"
+            )
+        raise s3_error(e, "Failed to list uploaded parts")
+    except Exception as e:
+        raise s3_error(e, "Failed to list uploaded parts")
+
+    return sorted(
+        (
+            UploadSessionPart(part_number=part['part_number'], etag=part['etag'], size=part['size'])
+            for part in stored
+        ),
+        key=lambda part: part.part_number
+    )
+
+
+@router.post("/", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    session_in: UploadSessionCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable multipart upload and persist its state
+    """
+    if session_in.file_size > settings.MULTIPART_MAX_OBJECT_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File exceeds the maximum object size of {settings.MULTIPART_MAX_OBJECT_SIZE} bytes"
+        )
+
+    object_key = sanitize_key(session_in.object_key)
+    s3_connection = check_upload_access(
+        db, current_user, session_in.bucket_name, object_key, "multipart_initiated", request
+    )
+
+    try:
+        upload_id = await async_s3_service.create_multipart_upload(
+            bucket_name=session_in.bucket_name,
+            object_key=object_key,
+            content_type=session_in.content_type,
+            connection=s3_connection
+        )
+    except Exception as e:
+        raise s3_error(e, "Failed to create upload session")
+
+    part_size = get_part_size(session_in.file_size)
+    upload_session = UploadSession(
+        user_id=current_user.id,
+        s3_connection_id=s3_connection.id if s3_connection else None,
+        bucket_name=session_in.bucket_name,
+        object_key=object_key,
+        upload_id=upload_id,
+        file_size=session_in.file_size,
+        part_size=part_size,
+        part_count=math.ceil(session_in.file_size / part_size),
+        content_type=session_in.content_type,
+        status="in_progress",
+        completed_parts={}
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="multipart_initiated",
+        bucket_name=session_in.bucket_name,
+        object_key=object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={"upload_session_id": upload_session.id, "file_size": session_in.file_size}
+    )
+
+    return upload_session
+
+
+@router.get("/", response_model=List[UploadSessionResponse])
+async def list_upload_sessions(
+    bucket_name: Optional[str] = None,
+    session_status: Optional[str] = "in_progress",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the current user's upload sessions (in-progress ones by default)
+    """
+    query = db.query(UploadSession).filter(UploadSession.user_id == current_user.id)
+
+    if bucket_name:
+        query = query.filter(UploadSession.bucket_name == bucket_name)
+
+    if session_status:
+        query = query.filter(UploadSession.status == session_status)
+
+    return query.order_by(UploadSession.created_at.desc()).all()
+
+
+@router.get("/{session_id}", response_model=UploadSessionStatus)
+async def get_upload_session(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get an upload session with the parts already stored and the ones still missing
+    """
+    upload_session = get_owned_session(db, session_id, current_user)
+    response = UploadSessionStatus.model_validate(upload_session)
+
+    if upload_session.status == "in_progress":
+        parts = await get_stored_parts(db, upload_session)
+        stored_numbers = {part.part_number for part in parts}
+        response.parts = parts
+        response.missing_parts = [
+            number for number in range(1, upload_session.part_count + 1)
+            if number not in stored_numbers
+        ]
+        response.uploaded_bytes = sum(part.size or 0 for part in parts)
+    elif upload_session.status == "completed":
+        response.uploaded_bytes = upload_session.file_size
+
+    return response
+
+
+@router.post("/{session_id}/part-urls", response_model=MultipartPartUrlsResponse)
+async def get_upload_session_part_urls(
+    session_id: int,
+    request_data: UploadSessionPartUrlsRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Presign upload URLs for parts of an upload session
+    """
+    upload_session = get_owned_session(db, session_id, current_user)
+    require_in_progress(upload_session)
+
+    part_numbers = sorted(set(request_data.part_numbers))
+    if len(part_numbers) > settings.MULTIPART_URL_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.MULTIPART_URL_BATCH_SIZE} part URLs per request"
+        )
+    if part_numbers[0] < 1 or part_numbers[-1] > upload_session.part_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part numbers must be between 1 and {upload_session.part_count}"
+        )
+
+    # Permissions may have changed since the session was created
+    check_upload_access(
+        db, current_user, upload_session.bucket_name, upload_session.object_key, "multipart_part_urls", request
+    )
+
+    try:
+        urls = await async_s3_service.generate_presigned_part_urls(
+            bucket_name=upload_session.bucket_name,
+            object_key=upload_session.object_key,
+            upload_id=upload_session.upload_id,
+            part_numbers=part_numbers,
+            connection=upload_session.s3_connection
+        )
+    except Exception as e:
+        raise s3_error(e, "Failed to generate part URLs")
+
+    return MultipartPartUrlsResponse(
+        upload_id=upload_session.upload_id,
+        parts=[MultipartPartUrl(part_number=number, url=url) for number, url in urls.items()],
+        expires_in=settings.PRESIGNED_URL_EXPIRATION
+    )
+
+
+@router.post("/{session_id}/parts", response_model=UploadSessionResponse)
+async def record_upload_session_parts(
+    session_id: int,
+    request_data: UploadSessionPartsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Record parts the client finished uploading (part number and ETag)
+    """
+    # Locked so parts recorded by parallel requests are merged, not overwritten
+    upload_session = get_owned_session(db, session_id, current_user, for_update=True)
+    require_in_progress(upload_session)
+
+    completed_parts = dict(upload_session.completed_parts or {})
+    for part in request_data.parts:
+        if part.part_number > upload_session.part_count:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Part numbers must be between 1 and {upload_session.part_count}"
+            )
+        completed_parts[str(part.part_number)] = part.etag
+
+    # Assign a new dict so SQLAlchemy detects the change to the JSON column
+    upload_session.completed_parts = completed_parts
+    db.commit()
+    db.refresh(upload_session)
+    return upload_session
+
+
+@router.post("/{session_id}/complete", response_model=UploadSessionResponse)
+async def complete_upload_session(
+    session_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Complete an upload session once every part is stored
+    """
+    upload_session = get_owned_session(db, session_id, current_user)
+    require_in_progress(upload_session)
+    check_upload_access(
+        db, current_user, upload_session.bucket_name, upload_session.object_key, "upload", request
+    )
+
+    parts = await get_stored_parts(db, upload_session)
+    stored_numbers = {part.part_number for part in parts}
+    missing = [number for number in range(1, upload_session.part_count + 1) if number not in stored_numbers]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Upload is missing {len(missing)} part(s), first missing: {missing[:10]}"
+        )
+
+    try:
+        await async_s3_service.complete_multipart_upload(
+            bucket_name=upload_session.bucket_name,
+            object_key=upload_session.object_key,
+            upload_id=upload_session.upload_id,
+            parts=[{'part_number': part.part_number, 'etag': part.etag} for part in parts],
+            connection=upload_session.s3_connection
+        )
+    except Exception as e:
+        audit_service.log_action(
+            db=db,
+            user=current_user,
+            action="upload",
+            bucket_name=upload_session.bucket_name,
+            object_key=upload_session.object_key,
+            status="failure",
+            ip_address=request.client.host,
+            metadata={"upload_session_id": upload_session.id, "multipart": True},
+            error_message=str(e)
+        )
+        raise s3_error(e, "Failed to complete upload session")
+
+    upload_session.status = "completed"
+    upload_session.completed_at = func.now()
+    db.commit()
+    db.refresh(upload_session)
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="upload",
+        bucket_name=upload_session.bucket_name,
+        object_key=upload_session.object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={
+            "upload_session_id": upload_session.id,
+            "multipart": True,
+            "part_count": upload_session.part_count,
+            "file_size": upload_session.file_size
+        }
+    )
+
+    return upload_session
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    session_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Abort an upload session and discard its stored parts
+    """
+    upload_session = get_owned_session(db, session_id, current_user)
+    require_in_progress(upload_session)
+
+    try:
+        await async_s3_service.abort_multipart_upload(
+            bucket_name=upload_session.bucket_name,
+            object_key=upload_session.object_key,
+            upload_id=upload_session.upload_id,
+            connection=upload_session.s3_connection
+        )
+    except ClientError as e:
+        # Already gone on S3 is fine, anything else is an error
+        if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+            raise s3_error(e, "Failed to abort upload session")
+    except Exception as e:
+        raise s3_error(e, "Failed to abort upload session")
+
+    upload_session.status = "aborted"
+    db.commit()
+
+    audit_service.log_action(
+        db=db,
+        user=current_user,
+        action="multipart_abort",
+        bucket_name=upload_session.bucket_name,
+        object_key=upload_session.object_key,
+        status="success",
+        ip_address=request.client.host,
+        metadata={"upload_session_id": upload_session.id}
+    )
+    return None
@@ -26,10 +26,105 @@ class Settings(BaseSettings):
     AWS_ROLE_ARN: Optional[str] = None
     AWS_ACCESS_KEY_ID: Optional[str] = None
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
+    AWS_ENDPOINT_URL: Optional[str] = None  # e.g. a local moto server for testing
     
     # S3 Settings
     PRESIGNED_URL_EXPIRATION: int = 3600  # 1 hour
     MAX_UPLOAD_SIZE: int = 5368709120  # 5GB
+    PRESIGN_BATCH_MAX_ITEMS: int = 2000  # Items per POST /s3/presigned-urls
+    UPLOAD_POLICY_MAX_EXPIRATION: int = 21600  # 6 hours, prefix-scoped upload policies
+    MULTIPART_MIN_PART_SIZE: int = 16777216  # 16MB, S3 requires at least 5MB
+    MULTIPART_MAX_PARTS: int = 10000  # S3 limit
+    MULTIPART_MAX_OBJECT_SIZE: int = 5497558138880  # 5TB, S3 limit
+    MULTIPART_URL_BATCH_SIZE: int = 1000  # Part URLs per request
+    S3_CLIENT_CACHE_SIZE: int = 128  # Cached boto3 clients per worker
+    S3_ASYNC_MAX_THREADS: int = 40  # Worker threads for blocking S3 calls from async routes
+    # botocore client defaults, S3 connections can override each of them
+    S3_MAX_POOL_CONNECTIONS: int = 50  # HTTP connections per client, above S3_ASYNC_MAX_THREADS
+    S3_CONNECT_TIMEOUT: float = 5.0  # seconds
+    S3_READ_TIMEOUT: float = 60.0  # seconds
+    S3_RETRY_MODE: str = "standard"  # legacy, standard or adaptive
+    S3_MAX_ATTEMPTS: int = 3  # Including the first attempt
+    S3_TCP_KEEPALIVE: bool = True
+    
+    # Per-connection isolation
+    S3_BULKHEAD_MAX_CONCURRENT: int = 20  # S3 calls in flight per connection
+    S3_BULKHEAD_ACQUIRE_TIMEOUT: float = 2.0  # Seconds to wait for a free slot before failing
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive connection failures that open the circuit
+    CIRCUIT_RESET_TIMEOUT: int = 30  # Seconds an open circuit fails fast before probing
+    
+    BUCKET_REGION_CACHE_SIZE: int = 10000  # Cached bucket -> region lookups
+    BUCKET_REGION_CACHE_TTL: int = 86400  # 1 day
+    BUCKET_REGION_NEGATIVE_TTL: int = 300  # Missing buckets and failed lookups are retried after 5 minutes
+    
+    # Request deadlines (seconds), S3 and database timeouts are derived from what is left
+    REQUEST_DEADLINE_DEFAULT: float = 30.0  # 0 disables the default deadline
+    REQUEST_DEADLINES: dict = {  # Per route, longest matching path prefix wins
+        "/api/v1/s3/list": 15.0,
+        "/api/v1/s3/list-stream": 0,  # Runs as long as the client reads; each S3 call keeps its own timeouts
+        "/api/v1/s3/presigned-url": 10.0,
+        "/api/v1/s3/presigned-urls": 20.0,  # Batches of up to PRESIGN_BATCH_MAX_ITEMS
+        "/api/v1/s3/upload-policy": 10.0,
+        "/api/v1/s3/multipart/complete": 300.0,
+        "/api/v1/upload-sessions": 120.0,
+    }
+    DB_STATEMENT_TIMEOUT_MIN_MS: int = 500  # Floor so audit writes still get a chance
+    
+    # Hedged S3 reads (ListObjectsV2, HeadObject, HeadBucket)
+    S3_HEDGING_ENABLED: bool = False  # Send a second attempt when a read is slower than usual
+    S3_HEDGE_PERCENTILE: float = 95.0  # Latency percentile after which the second attempt is sent
+    S3_HEDGE_MIN_DELAY: float = 0.02  # Never hedge sooner than this many seconds
+    S3_HEDGE_MIN_SAMPLES: int = 50  # Latencies observed per operation before hedging starts
+    S3_HEDGE_BUDGET_RATIO: float = 0.05  # Hedges allowed per read, caps the extra request volume at 5%
+    S3_HEDGE_BUDGET_BURST: float = 10.0  # Hedges that may be spent at once
+    S3_HEDGE_MAX_WORKERS: int = 32  # Threads running hedged attempts
+    
+    # AIMD concurrency limits per (connection, bucket, key prefix partition)
+    S3_AIMD_ENABLED: bool = True
+    S3_AIMD_PARTITION_DEPTH: int = 1  # Leading key path segments that make up a partition
+    S3_AIMD_INITIAL_LIMIT: int = 16  # Concurrent calls per partition before any feedback
+    S3_AIMD_MIN_LIMIT: int = 1
+    S3_AIMD_MAX_LIMIT: int = 256
+    S3_AIMD_DECREASE_FACTOR: float = 0.5  # Limit multiplier after a throttling response
+    S3_AIMD_ACQUIRE_TIMEOUT: float = 10.0  # Seconds a call waits for a slot before failing
+    S3_AIMD_MAX_PARTITIONS: int = 10000  # Idle partitions beyond this are forgotten
+    
+    # Cache of object listing pages, invalidated by writes made through this service
+    LISTING_CACHE_ENABLED: bool = True
+    LISTING_CACHE_TTL: int = 10  # Seconds a cached page is served without a refresh
+    LISTING_CACHE_STALE_TTL: int = 60  # Further seconds a page is served while it refreshes in the background
+    LISTING_CACHE_MAX_BYTES: int = 67108864  # 64 MiB of estimated page memory
+    LISTING_CACHE_REFRESH_WORKERS: int = 4
+    LISTING_QUERY_MAX_OBJECTS: int = 100000  # Objects a sorted or filtered listing scans at most
+    
+    # Worker warm-up before /ready reports ready
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT: float = 60.0  # Seconds after which the worker becomes ready regardless
+    WARMUP_CONCURRENCY: int = 8  # Parallel S3 client builds and region lookups
+    WARMUP_DB_CONNECTIONS: int = 5  # Pooled connections opened up front (SQLAlchemy default pool size)
+    WARMUP_MAX_BUCKETS: int = 200  # Bucket regions resolved from permissions
+    WARMUP_ACTIVE_USER_HOURS: int = 24  # Users with audit entries this recent get their permissions loaded
+    WARMUP_MAX_USERS: int = 500
+    
+    # Background health probes of active S3 connections
+    CONNECTION_HEALTH_ENABLED: bool = True
+    CONNECTION_HEALTH_INTERVAL: int = 60  # Seconds between probe rounds
+    CONNECTION_HEALTH_TIMEOUT: float = 10.0  # Deadline of one probe (seconds)
+    CONNECTION_HEALTH_CONCURRENCY: int = 4  # Connections probed in parallel
+    
+    # Abandoned multipart upload reaper
+    MULTIPART_REAPER_ENABLED: bool = True
+    MULTIPART_REAPER_INTERVAL: int = 21600  # 6 hours between runs
+    MULTIPART_REAPER_MAX_AGE: int = 604800  # Abort uploads started more than 7 days ago
+    MULTIPART_REAPER_CONCURRENCY: int = 4  # Concurrent S3 calls per connection
+    MULTIPART_REAPER_DRY_RUN: bool = False  # Only report what would be aborted
+    
+    # Assumed-role credentials
+    STS_SESSION_DURATION: int = 3600  # 1 hour
+    CREDENTIAL_REFRESH_WINDOW: int = 900  # Renew 15 minutes before expiry
+    CREDENTIAL_REFRESH_INTERVAL: int = 60  # Background refresher period (seconds)
+    ROLES_ANYWHERE_TIMEOUT: float = 10.0  # Seconds for an IAM Roles Anywhere CreateSession call
+    DECRYPTED_CREDENTIAL_CACHE_SIZE: int = 1024  # Decrypted connection secrets kept in memory
     
     # CORS
     CORS_ORIGINS: list = [
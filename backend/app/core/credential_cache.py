@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class DecryptedCredentialCache:
+    """
+    Bounded, thread-safe LRU cache of decrypted connection secrets.
+
+    Keys are (connection id, ciphertext): a changed secret has a new
+    ciphertext, so stale plaintext is never returned, and ``invalidate``
+    drops what an edited or deleted connection left behind. Values only
+    ever live in process memory.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max_size
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_decrypt(self, key: Tuple, decrypt: Callable[[], Optional[str]]) -> Optional[str]:
+        """Return the cached plaintext for ``key`` or decrypt it; failures (None) are not cached"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = decrypt()
+        if value is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, connection_id: Optional[int]) -> int:
+        """Drop every secret cached for a connection"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == connection_id]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
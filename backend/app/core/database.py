@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core import deadline
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -9,6 +10,27 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(SessionLocal, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """Bound Postgres statements in a request by the request's remaining budget"""
+    if connection.dialect.name != "postgresql":
+        return
+    left = deadline.remaining()
+    if left is None:
+        return
+    timeout_ms = max(int(left * 1000), settings.DB_STATEMENT_TIMEOUT_MIN_MS)
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+@event.listens_for(engine, "handle_error")
+def report_statement_timeout(context):
+    """Surface a statement cancelled by the request budget as DeadlineExceeded"""
+    query_canceled = getattr(context.original_exception, "pgcode", None) == "57014"
+    left = deadline.remaining()
+    if query_canceled and left is not None and left <= 0:
+        return deadline.DeadlineExceeded("database query")
+
+
 def get_db():
     """Dependency for database sessions"""
     db = SessionLocal()
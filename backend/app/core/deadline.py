@@ -0,0 +1,76 @@
+"""
+Per-request time budgets.
+
+The deadline of the current request lives in a context variable, so it
+follows the request into worker threads (async_s3_service copies the
+context) and database event hooks. Code that is about to wait on S3 or the
+database derives its timeout from ``remaining()`` and calls ``check()`` to
+fail fast once the budget is spent.
+"""
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+from app.core.config import settings
+
+# Monotonic time at which the current request's budget runs out
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Client timeouts are rounded up to one of these, so only a handful of
+# differently-configured S3 clients are ever cached per connection
+TIMEOUT_TIERS = (1, 2, 5, 10, 30, 60, 120)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget was spent before an operation could start"""
+
+    def __init__(self, operation: str = "request"):
+        super().__init__(f"Request deadline exceeded before {operation}")
+        self.operation = operation
+
+
+def budget_for_path(path: str) -> Optional[float]:
+    """Time budget of a route: the longest matching REQUEST_DEADLINES prefix, else the default"""
+    budget = settings.REQUEST_DEADLINE_DEFAULT
+    matched = -1
+    for prefix, seconds in settings.REQUEST_DEADLINES.items():
+        if path.startswith(prefix) and len(prefix) > matched:
+            budget, matched = seconds, len(prefix)
+    return budget if budget and budget > 0 else None
+
+
+def start(seconds: Optional[float]) -> Token:
+    """Start a budget for the current context; pass the token to ``clear``"""
+    return _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def clear(token: Token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, None when there is no deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(operation: str = "request") -> None:
+    """Raise DeadlineExceeded when the current budget is spent"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(operation)
+
+
+def timeout_tier(default: float) -> Optional[float]:
+    """
+    Client timeout for the remaining budget
+
+    Returns None when the default already fits, otherwise the smallest tier
+    that covers the remaining budget.
+    """
+    left = remaining()
+    if left is None or left >= default:
+        return None
+    tier = next((tier for tier in TIMEOUT_TIERS if tier >= left), None)
+    return tier if tier is not None and tier < default else None
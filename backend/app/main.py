@@ -5,7 +5,15 @@ from contextlib import asynccontextmanager
 import logging
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api import auth, users, permissions, s3, audit, s3_connections
+from app.core import deadline
+from app.api import auth, users, permissions, s3, audit, s3_connections, multipart, upload_sessions
+from app.services.credential_manager import credential_manager
+from app.services.roles_anywhere import roles_anywhere_client
+from app.services.multipart_reaper import multipart_reaper
+from app.services.request_hedger import request_hedger
+from app.services.warmup import warmup_service
+from app.services.connection_health import connection_health
+from app.services.connection_guard import ConnectionUnavailableError
 
 # Configure logging
 logging.basicConfig(
@@ -30,10 +38,29 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
     
+    # Renew assumed-role credentials ahead of expiry
+    credential_manager.start()
+    
+    # Abort abandoned multipart uploads on a schedule
+    if settings.MULTIPART_REAPER_ENABLED:
+        multipart_reaper.start()
+    
+    # Probe active S3 connections so admins see cached health
+    if settings.CONNECTION_HEALTH_ENABLED:
+        connection_health.start()
+    
+    # Build clients, credentials and DB connections before reporting ready
+    warmup_service.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down S3 Access Manager...")
+    credential_manager.stop()
+    roles_anywhere_client.close()
+    multipart_reaper.stop()
+    connection_health.stop()
+    request_hedger.shutdown()
 
 
 # Create FastAPI app
@@ -61,6 +88,35 @@ app.add_middleware(
 )
 
 
+# Give every request a time budget that S3 and database calls derive their timeouts from
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    token = deadline.start(deadline.budget_for_path(request.url.path))
+    try:
+        return await call_next(request)
+    finally:
+        deadline.clear(token)
+
+
+# Operations refused because the request's budget was already spent
+@app.exception_handler(deadline.DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: deadline.DeadlineExceeded):
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": str(exc)}
+    )
+
+
+# S3 calls rejected by an open circuit or a full bulkhead
+@app.exception_handler(ConnectionUnavailableError)
+async def connection_unavailable_handler(request: Request, exc: ConnectionUnavailableError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -85,6 +141,21 @@ async def health_check():
     }
 
 
+# Readiness endpoint, gated on the startup warm-up
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check endpoint"""
+    if not warmup_service.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"}
+        )
+    return {
+        "status": "ready",
+        "warmup": warmup_service.report
+    }
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -102,6 +173,8 @@ app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(users.router, prefix=settings.API_V1_PREFIX)
 app.include_router(permissions.router, prefix=settings.API_V1_PREFIX)
 app.include_router(s3.router, prefix=settings.API_V1_PREFIX)
+app.include_router(multipart.router, prefix=settings.API_V1_PREFIX)
+app.include_router(upload_sessions.router, prefix=settings.API_V1_PREFIX)
 app.include_router(audit.router, prefix=settings.API_V1_PREFIX)
 app.include_router(s3_connections.router, prefix=settings.API_V1_PREFIX)
 
@@ -2,9 +2,10 @@ from .user import User
 from .s3_connection import S3Connection
 from .permission import Permission
 from .audit_log import AuditLog
+from .upload_session import UploadSession
 
 # Ensure all model classes are imported when package is imported to avoid SQLAlchemy
 # mapping errors due to import order (string lookups for relationships depend on
 # classes being available in the registry).
 
-__all__ = ['User', 'S3Connection', 'Permission', 'AuditLog']
+__all__ = ['User', 'S3Connection', 'Permission', 'AuditLog', 'UploadSession']
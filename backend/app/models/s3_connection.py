@@ -1,15 +1,33 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, Float, String, Text, Boolean, DateTime, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 from app.core.database import Base
 from app.core.config import settings
+from app.core.credential_cache import DecryptedCredentialCache
 from cryptography.fernet import Fernet
 import base64
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Decrypted secrets per (connection id, ciphertext), shared by every session
+decrypted_credentials = DecryptedCredentialCache(max_size=settings.DECRYPTED_CREDENTIAL_CACHE_SIZE)
+
+
+@functools.lru_cache(maxsize=4)
+def _fernet_for(secret_key: str) -> Fernet:
+    """Fernet instance for a SECRET_KEY, built once per process"""
+    # Create a key from the SECRET_KEY (must be 32 url-safe base64-encoded bytes)
+    # We'll use the first 32 chars of SECRET_KEY padded/adjusted if needed
+    # For simplicity in this implementation, we derive a key
+    key = secret_key
+    if len(key) < 32:
+        key = key.ljust(32, '0')
+    key = key[:32].encode('utf-8')
+    return Fernet(base64.urlsafe_b64encode(key))
+
 class AuthMethod(str, enum.Enum):
     ACCESS_KEY = "access_key"
     IAM_ROLE = "iam_role"
@@ -32,6 +50,27 @@ class S3Connection(Base):
     role_arn = Column(String, nullable=True)
     external_id = Column(String, nullable=True)
     
+    # IAM Roles Anywhere fields (role_arn is the role to assume); PEM cert and key are encrypted
+    _certificate = Column("certificate", Text, nullable=True)
+    _private_key = Column("private_key", Text, nullable=True)
+    trust_anchor_arn = Column(String, nullable=True)
+    profile_arn = Column(String, nullable=True)
+    roles_anywhere_endpoint_url = Column(String, nullable=True)  # Override, e.g. a local stand-in
+    
+    # Endpoint strategy
+    endpoint_url = Column(String, nullable=True)  # Custom S3-compatible endpoint (MinIO, Ceph, local)
+    use_accelerate_endpoint = Column(Boolean, default=False, nullable=False)  # S3 Transfer Acceleration
+    use_dualstack_endpoint = Column(Boolean, default=False, nullable=False)  # IPv4/IPv6 endpoint
+    addressing_style = Column(String, default="auto", nullable=False)  # auto, virtual, path
+    
+    # HTTP client tuning, empty means the global default from settings
+    max_pool_connections = Column(Integer, nullable=True)
+    connect_timeout = Column(Float, nullable=True)
+    read_timeout = Column(Float, nullable=True)
+    retry_mode = Column(String, nullable=True)  # legacy, standard, adaptive
+    max_attempts = Column(Integer, nullable=True)
+    tcp_keepalive = Column(Boolean, nullable=True)
+    
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -40,25 +79,27 @@ class S3Connection(Base):
     permissions = relationship("Permission", back_populates="s3_connection")
 
     def _get_fernet(self):
-        # Create a key from the SECRET_KEY (must be 32 url-safe base64-encoded bytes)
-        # We'll use the first 32 chars of SECRET_KEY padded/adjusted if needed
-        # For simplicity in this implementation, we derive a key
-        key = settings.SECRET_KEY
-        if len(key) < 32:
-            key = key.ljust(32, '0')
-        key = key[:32].encode('utf-8')
-        return Fernet(base64.urlsafe_b64encode(key))
+        return _fernet_for(settings.SECRET_KEY)
+
+    def _decrypt(self, ciphertext: str, label: str):
+        """Decrypt a stored secret, through the process-wide cache for saved connections"""
+        def decrypt():
+            try:
+                f = self._get_fernet()
+                return f.decrypt(ciphertext.encode('utf-8')).decode('utf-8')
+            except Exception as e:
+                logger.error(f"Error decrypting {label}: {e}")
+                return None
+
+        if self.id is None:
+            return decrypt()
+        return decrypted_credentials.get_or_decrypt((self.id, ciphertext), decrypt)
 
     @property
     def access_key_id(self):
         if not self._access_key_id:
             return None
-        try:
-            f = self._get_fernet()
-            return f.decrypt(self._access_key_id.encode('utf-8')).decode('utf-8')
-        except Exception as e:
-            logger.error(f"Error decrypting access key: {e}")
-            return None
+        return self._decrypt(self._access_key_id, "access key")
 
     @access_key_id.setter
     def access_key_id(self, value):
@@ -72,12 +113,7 @@ class S3Connection(Base):
     def secret_access_key(self):
         if not self._secret_access_key:
             return None
-        try:
-            f = self._get_fernet()
-            return f.decrypt(self._secret_access_key.encode('utf-8')).decode('utf-8')
-        except Exception as e:
-            logger.error(f"Error decrypting secret key: {e}")
-            return None
+        return self._decrypt(self._secret_access_key, "secret key")
 
     @secret_access_key.setter
     def secret_access_key(self, value):
@@ -86,3 +122,31 @@ class S3Connection(Base):
             self._secret_access_key = f.encrypt(value.encode('utf-8')).decode('utf-8')
         else:
             self._secret_access_key = None
+
+    @property
+    def certificate(self):
+        if not self._certificate:
+            return None
+        return self._decrypt(self._certificate, "certificate")
+
+    @certificate.setter
+    def certificate(self, value):
+        if value:
+            f = self._get_fernet()
+            self._certificate = f.encrypt(value.encode('utf-8')).decode('utf-8')
+        else:
+            self._certificate = None
+
+    @property
+    def private_key(self):
+        if not self._private_key:
+            return None
+        return self._decrypt(self._private_key, "private key")
+
+    @private_key.setter
+    def private_key(self, value):
+        if value:
+            f = self._get_fernet()
+            self._private_key = f.encrypt(value.encode('utf-8')).decode('utf-8')
+        else:
+            self._private_key = None
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    s3_connection_id = Column(Integer, ForeignKey("s3_connections.id"), nullable=True)
+    bucket_name = Column(String, nullable=False)
+    object_key = Column(String, nullable=False)
+    upload_id = Column(String, nullable=False, unique=True)
+    file_size = Column(BigInteger, nullable=False)
+    part_size = Column(BigInteger, nullable=False)
+    part_count = Column(Integer, nullable=False)
+    content_type = Column(String, nullable=True)
+    status = Column(String, default="in_progress", nullable=False, index=True)  # in_progress, completed, aborted
+    # Parts reported by the client: {"<part number>": "<etag>"}
+    completed_parts = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User")
+    s3_connection = relationship("S3Connection", lazy="joined")
@@ -129,6 +129,151 @@ class PresignedUrlResponse(BaseModel):
     fields: Optional[dict] = None  # For multipart uploads
 
 
+class PresignedUrlBatchItem(BaseModel):
+    bucket_name: str
+    object_key: str
+    operation: str = Field(..., pattern="^(upload|download)$")
+
+
+class PresignedUrlBatchRequest(BaseModel):
+    items: List[PresignedUrlBatchItem] = Field(..., min_length=1)
+
+
+class PresignedUrlBatchResult(BaseModel):
+    bucket_name: str
+    object_key: str
+    operation: str
+    url: Optional[str] = None
+    expires_in: Optional[int] = None
+    fields: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class PresignedUrlBatchResponse(BaseModel):
+    results: List[PresignedUrlBatchResult]
+    success_count: int
+    error_count: int
+
+
+class UploadPolicyRequest(BaseModel):
+    bucket_name: str
+    prefix: str = ""
+    max_size: Optional[int] = Field(None, gt=0)  # Per-file limit in bytes
+    expires_in: Optional[int] = Field(None, gt=0)
+
+
+class UploadPolicyResponse(BaseModel):
+    url: str
+    fields: dict
+    prefix: str
+    max_size: int
+    expires_in: int
+
+
+# Multipart Upload Schemas
+class MultipartCreateRequest(BaseModel):
+    bucket_name: str
+    object_key: str
+    file_size: Optional[int] = Field(None, gt=0)  # Used to pick the part size
+    content_type: Optional[str] = None
+
+
+class MultipartCreateResponse(BaseModel):
+    bucket_name: str
+    object_key: str
+    upload_id: str
+    part_size: int
+    part_count: Optional[int] = None
+
+
+class MultipartPartUrlsRequest(BaseModel):
+    bucket_name: str
+    object_key: str
+    upload_id: str
+    part_numbers: List[int] = Field(..., min_length=1)
+
+
+class MultipartPartUrl(BaseModel):
+    part_number: int
+    url: str
+
+
+class MultipartPartUrlsResponse(BaseModel):
+    upload_id: str
+    parts: List[MultipartPartUrl]
+    expires_in: int
+
+
+class MultipartPart(BaseModel):
+    part_number: int = Field(..., ge=1)
+    etag: str
+
+
+class MultipartCompleteRequest(BaseModel):
+    bucket_name: str
+    object_key: str
+    upload_id: str
+    parts: List[MultipartPart] = Field(..., min_length=1)
+
+
+class MultipartCompleteResponse(BaseModel):
+    bucket_name: str
+    object_key: str
+    etag: Optional[str] = None
+    location: Optional[str] = None
+
+
+class MultipartAbortRequest(BaseModel):
+    bucket_name: str
+    object_key: str
+    upload_id: str
+
+
+# Upload Session Schemas
+class UploadSessionCreate(BaseModel):
+    bucket_name: str
+    object_key: str
+    file_size: int = Field(..., gt=0)
+    content_type: Optional[str] = None
+
+
+class UploadSessionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    bucket_name: str
+    object_key: str
+    upload_id: str
+    file_size: int
+    part_size: int
+    part_count: int
+    content_type: Optional[str] = None
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+class UploadSessionPart(BaseModel):
+    part_number: int
+    etag: str
+    size: Optional[int] = None
+
+
+class UploadSessionStatus(UploadSessionResponse):
+    parts: List[UploadSessionPart] = []
+    missing_parts: List[int] = []
+    uploaded_bytes: int = 0
+
+
+class UploadSessionPartUrlsRequest(BaseModel):
+    part_numbers: List[int] = Field(..., min_length=1)
+
+
+class UploadSessionPartsRequest(BaseModel):
+    parts: List[MultipartPart] = Field(..., min_length=1)
+
+
 class S3Object(BaseModel):
     key: str
     size: int
@@ -136,11 +281,22 @@ class S3Object(BaseModel):
     etag: Optional[str] = None
 
 
+class S3ListSummary(BaseModel):
+    count: int  # Matching objects
+    total_bytes: int
+    directory_count: int = 0
+    scanned: int  # Objects listed to compute the result
+    truncated: bool = False  # LISTING_QUERY_MAX_OBJECTS was reached before the end of the prefix
+
+
 class S3ListResponse(BaseModel):
     objects: List[S3Object]
     prefix: str
     bucket_name: str
     has_more: bool = False
+    next_token: Optional[str] = None  # Pass as continuation_token to get the next page
+    directories: List[str] = []  # Full prefixes of the immediate sub-folders (folder mode and partial access)
+    summary: Optional[S3ListSummary] = None  # Set for sorted, filtered or summarised listings
 
 
 # Stats Schemas
@@ -171,6 +327,27 @@ class S3ConnectionBase(BaseModel):
     secret_access_key: Optional[str] = None
     role_arn: Optional[str] = None
     external_id: Optional[str] = None
+    
+    # IAM Roles Anywhere (role_arn is the role to assume)
+    certificate: Optional[str] = Field(None, description="PEM X.509 certificate, optionally followed by its chain")
+    private_key: Optional[str] = Field(None, description="PEM private key of the certificate")
+    trust_anchor_arn: Optional[str] = Field(None, pattern=r"^arn:aws[a-z\-]*:rolesanywhere:")
+    profile_arn: Optional[str] = Field(None, pattern=r"^arn:aws[a-z\-]*:rolesanywhere:")
+    roles_anywhere_endpoint_url: Optional[str] = Field(None, pattern=r"^https?://")
+    
+    # Endpoint strategy
+    endpoint_url: Optional[str] = Field(None, pattern=r"^https?://", description="Custom S3-compatible endpoint")
+    use_accelerate_endpoint: bool = False
+    use_dualstack_endpoint: bool = False
+    addressing_style: str = Field(default="auto", pattern=r"^(auto|virtual|path)$")
+    
+    # HTTP client tuning (None = global default)
+    max_pool_connections: Optional[int] = Field(None, ge=1, le=1000)
+    connect_timeout: Optional[float] = Field(None, gt=0, le=300)
+    read_timeout: Optional[float] = Field(None, gt=0, le=3600)
+    retry_mode: Optional[str] = Field(None, pattern=r"^(legacy|standard|adaptive)$")
+    max_attempts: Optional[int] = Field(None, ge=1, le=20)
+    tcp_keepalive: Optional[bool] = None
     is_active: bool = True
 
 
@@ -187,6 +364,21 @@ class S3ConnectionUpdate(BaseModel):
     secret_access_key: Optional[str] = None
     role_arn: Optional[str] = None
     external_id: Optional[str] = None
+    certificate: Optional[str] = None
+    private_key: Optional[str] = None
+    trust_anchor_arn: Optional[str] = Field(None, pattern=r"^arn:aws[a-z\-]*:rolesanywhere:")
+    profile_arn: Optional[str] = Field(None, pattern=r"^arn:aws[a-z\-]*:rolesanywhere:")
+    roles_anywhere_endpoint_url: Optional[str] = Field(None, pattern=r"^https?://")
+    endpoint_url: Optional[str] = Field(None, pattern=r"^https?://")
+    use_accelerate_endpoint: Optional[bool] = None
+    use_dualstack_endpoint: Optional[bool] = None
+    addressing_style: Optional[str] = Field(None, pattern=r"^(auto|virtual|path)$")
+    max_pool_connections: Optional[int] = Field(None, ge=1, le=1000)
+    connect_timeout: Optional[float] = Field(None, gt=0, le=300)
+    read_timeout: Optional[float] = Field(None, gt=0, le=3600)
+    retry_mode: Optional[str] = Field(None, pattern=r"^(legacy|standard|adaptive)$")
+    max_attempts: Optional[int] = Field(None, ge=1, le=20)
+    tcp_keepalive: Optional[bool] = None
     is_active: Optional[bool] = None
 
 
@@ -200,6 +392,19 @@ class S3ConnectionResponse(S3ConnectionBase):
     # Override secret fields to not return them in response
     access_key_id: Optional[str] = Field(None, exclude=True) 
     secret_access_key: Optional[str] = Field(None, exclude=True)
+    certificate: Optional[str] = Field(None, exclude=True)
+    private_key: Optional[str] = Field(None, exclude=True)
+
+
+class ConnectionHealth(BaseModel):
+    """Cached result of the background health probe of a connection"""
+    status: str  # healthy, unhealthy or unknown (not probed yet)
+    checked_at: Optional[datetime] = None
+    latency_ms: Optional[float] = None
+    last_success_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_error_at: Optional[datetime] = None
+    consecutive_failures: int = 0
 
 
 class S3ConnectionList(BaseModel):
@@ -212,4 +417,5 @@ class S3ConnectionList(BaseModel):
     auth_method: str
     is_active: bool
     created_at: datetime
+    health: Optional[ConnectionHealth] = None
 
@@ -0,0 +1,283 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.core.config import settings
+from app.core import deadline
+from app.models.s3_connection import S3Connection
+from app.services.connection_guard import ConnectionUnavailableError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Error codes S3 answers with when a prefix receives more requests than it can take
+THROTTLING_CODES = {
+    'SlowDown',
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestLimitExceeded',
+    'TooManyRequestsException',
+    'ServiceUnavailable'
+}
+
+
+class _CallRecord:
+    """Throttled attempts seen by the botocore hook during one limited call"""
+
+    __slots__ = ('throttled',)
+
+    def __init__(self):
+        self.throttled = False
+
+
+# The call the current context is making; hedged attempts run in a copy of
+# the context and share the record
+_current_call: ContextVar[Optional[_CallRecord]] = ContextVar("s3_limited_call", default=None)
+
+
+def partition_of(key: Optional[str]) -> str:
+    """The first S3_AIMD_PARTITION_DEPTH path segments of a key or prefix"""
+    if not key:
+        return ""
+    depth = settings.S3_AIMD_PARTITION_DEPTH
+    segments = key.split('/')
+    if len(segments) <= depth:
+        # No complete segment at that depth, e.g. a file at the bucket root
+        return '/'.join(segments[:-1])
+    return '/'.join(segments[:depth])
+
+
+def is_throttling(exc: BaseException) -> bool:
+    """Whether an exception is S3 asking the client to slow down"""
+    response = getattr(exc, 'response', None)
+    if not isinstance(response, dict):
+        return False
+    error_code = response.get('Error', {}).get('Code')
+    status_code = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return error_code in THROTTLING_CODES or status_code == 503
+
+
+class _PartitionLimit:
+    """Concurrency limit of one (connection, bucket, partition)"""
+
+    def __init__(self, key: Tuple):
+        self.key = key
+        self.limit = float(settings.S3_AIMD_INITIAL_LIMIT)
+        self.in_flight = 0
+        # Bumped on every decrease; calls started before it do not decrease again
+        self.epoch = 0
+        self.successes = 0
+        self.throttles = 0
+        self.decreases = 0
+        self.waits = 0
+        self.rejected = 0
+        self.condition = threading.Condition()
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limits for S3 request partitions.
+
+    S3 scales request rates per key prefix, so each (connection, bucket,
+    first S3_AIMD_PARTITION_DEPTH path segments) has its own limit on
+    concurrent calls. Every call that went through without a throttling
+    response adds 1/limit while at least half the limit is in use, so the
+    limit grows by about one per round trip of calls; a call that saw SlowDown (or another throttling answer, on
+    any attempt including botocore's own retries) multiplies it by
+    S3_AIMD_DECREASE_FACTOR. Only calls started after the last decrease
+    can decrease it again, so one burst of throttling halves the limit once.
+
+    Calls over the limit wait for a slot for at most S3_AIMD_ACQUIRE_TIMEOUT
+    seconds (or the remaining request deadline) and are then rejected.
+    """
+
+    def __init__(self):
+        self._partitions: "OrderedDict[Hashable, _PartitionLimit]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Partitions the current thread already holds a slot in, so nested
+        # calls (e.g. a region lookup during a list) do not wait on themselves
+        self._local = threading.local()
+
+    def _partition(self, key: Tuple) -> _PartitionLimit:
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = _PartitionLimit(key)
+                self._partitions[key] = partition
+                self._evict_idle()
+            else:
+                self._partitions.move_to_end(key)
+            return partition
+
+    def _evict_idle(self) -> None:
+        """Forget the least recently used idle partitions over S3_AIMD_MAX_PARTITIONS"""
+        excess = len(self._partitions) - settings.S3_AIMD_MAX_PARTITIONS
+        for key in list(self._partitions):
+            if excess <= 0:
+                break
+            if self._partitions[key].in_flight == 0:
+                del self._partitions[key]
+                excess -= 1
+
+    def _acquire(self, partition: _PartitionLimit) -> int:
+        """Wait for a slot below the partition's limit; returns the epoch the call started in"""
+        timeout = settings.S3_AIMD_ACQUIRE_TIMEOUT
+        left = deadline.remaining()
+        if left is not None:
+            timeout = max(0.0, min(timeout, left))
+        give_up_at = time.monotonic() + timeout
+
+        with partition.condition:
+            if partition.in_flight >= math.floor(partition.limit):
+                partition.waits += 1
+            while partition.in_flight >= math.floor(partition.limit):
+                wait_for = give_up_at - time.monotonic()
+                if wait_for <= 0 or not partition.condition.wait(wait_for):
+                    if partition.in_flight < math.floor(partition.limit):
+                        break
+                    partition.rejected += 1
+                    connection_id, bucket_name, prefix = partition.key
+                    raise ConnectionUnavailableError(
+                        f"S3 is throttling requests to {bucket_name}/{prefix} "
+                        f"(connection {connection_id}), try again shortly",
+                        retry_after=1
+                    )
+            partition.in_flight += 1
+            return partition.epoch
+
+    def _release(self, partition: _PartitionLimit, epoch: int, throttled: bool) -> None:
+        with partition.condition:
+            partition.in_flight -= 1
+            if throttled:
+                partition.throttles += 1
+                if epoch == partition.epoch:
+                    partition.limit = max(
+                        float(settings.S3_AIMD_MIN_LIMIT),
+                        partition.limit * settings.S3_AIMD_DECREASE_FACTOR
+                    )
+                    partition.epoch += 1
+                    partition.decreases += 1
+                    connection_id, bucket_name, prefix = partition.key
+                    logger.info(
+                        f"S3 throttled {bucket_name}/{prefix} (connection {connection_id}), "
+                        f"concurrency limit now {partition.limit:.1f}"
+                    )
+            else:
+                partition.successes += 1
+                # Only probe upward while the limit is actually being used
+                if partition.in_flight + 1 >= partition.limit / 2:
+                    partition.limit = min(
+                        float(settings.S3_AIMD_MAX_LIMIT),
+                        partition.limit + 1 / partition.limit
+                    )
+            partition.condition.notify_all()
+
+    @contextmanager
+    def limit(self, connection: Optional[S3Connection], bucket_name: Optional[str], key: Optional[str] = None):
+        """Run the enclosed S3 call within its partition's concurrency limit"""
+        if not settings.S3_AIMD_ENABLED or (connection is not None and connection.id is None):
+            # Unsaved connections (e.g. connection tests) are not limited
+            yield
+            return
+
+        partition_key = (connection.id if connection else None, bucket_name, partition_of(key))
+        held = getattr(self._local, 'held', None)
+        if held is None:
+            held = self._local.held = set()
+        if partition_key in held:
+            yield
+            return
+
+        partition = self._partition(partition_key)
+        epoch = self._acquire(partition)
+        record = _CallRecord()
+        token = _current_call.set(record)
+        held.add(partition_key)
+        try:
+            yield
+        except BaseException as e:
+            self._release(partition, epoch, record.throttled or is_throttling(e))
+            raise
+        else:
+            self._release(partition, epoch, record.throttled)
+        finally:
+            held.discard(partition_key)
+            _current_call.reset(token)
+
+    def try_acquire(
+        self,
+        connection: Optional[S3Connection],
+        bucket_name: Optional[str],
+        key: Optional[str] = None
+    ) -> Optional[Callable[[], None]]:
+        """
+        Take a slot in the partition for an extra attempt (a hedge) without waiting
+
+        Returns the function that frees the slot, or None when the partition
+        is at its limit. Freeing it leaves the limit unchanged; throttling seen
+        by the attempt is reported to the call it duplicates.
+        """
+        if not settings.S3_AIMD_ENABLED or (connection is not None and connection.id is None):
+            return lambda: None
+
+        partition = self._partition((connection.id if connection else None, bucket_name, partition_of(key)))
+        with partition.condition:
+            if partition.in_flight >= math.floor(partition.limit):
+                return None
+            partition.in_flight += 1
+
+        def release() -> None:
+            with partition.condition:
+                partition.in_flight -= 1
+                partition.condition.notify_all()
+        return release
+
+    @staticmethod
+    def observe_response(response_dict: Optional[Dict] = None, parsed_response: Optional[Dict] = None, **kwargs) -> None:
+        """botocore response-received hook: flag throttled attempts of the current call"""
+        record = _current_call.get()
+        if record is None or not response_dict:
+            return
+        error_code = (parsed_response or {}).get('Error', {}).get('Code')
+        if response_dict.get('status_code') == 503 or error_code in THROTTLING_CODES:
+            record.throttled = True
+
+    def stats(self, top: int = 100) -> Dict[str, Any]:
+        """Return the current limit and throttling counters of the most throttled partitions"""
+        with self._lock:
+            partitions = list(self._partitions.values())
+        tracked = len(partitions)
+        partitions = sorted(partitions, key=lambda p: (p.throttles, p.in_flight), reverse=True)[:top]
+
+        result = []
+        for partition in partitions:
+            with partition.condition:
+                connection_id, bucket_name, prefix = partition.key
+                result.append({
+                    "connection_id": connection_id,
+                    "bucket_name": bucket_name,
+                    "partition": prefix,
+                    "limit": round(partition.limit, 2),
+                    "in_flight": partition.in_flight,
+                    "successes": partition.successes,
+                    "throttles": partition.throttles,
+                    "decreases": partition.decreases,
+                    "waits": partition.waits,
+                    "rejected": partition.rejected
+                })
+        return {
+            "enabled": settings.S3_AIMD_ENABLED,
+            "min_limit": settings.S3_AIMD_MIN_LIMIT,
+            "max_limit": settings.S3_AIMD_MAX_LIMIT,
+            "tracked_partitions": tracked,
+            "partitions": result
+        }
+
+
+# Singleton instance
+adaptive_limiter = AdaptiveConcurrencyLimiter()
@@ -0,0 +1,315 @@
+import contextvars
+import functools
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+from anyio import CapacityLimiter, to_thread
+from app.core.config import settings
+from app.models.s3_connection import S3Connection
+from app.services.s3_service import S3Service, s3_service
+
+
+class AsyncS3Service:
+    """
+    Awaitable S3 operations for the async API routes.
+
+    Each call runs the matching S3Service method on a bounded pool of worker
+    threads, so a slow S3 response only occupies a worker thread instead of
+    the event loop. Clients and credentials are shared with the wrapped
+    S3Service, so per-connection client reuse is unchanged.
+    """
+
+    def __init__(self, service: S3Service, max_threads: int):
+        self._service = service
+        self._max_threads = max_threads
+        self._limiter: Optional[CapacityLimiter] = None
+
+    @property
+    def limiter(self) -> CapacityLimiter:
+        # Created lazily because a CapacityLimiter needs a running event loop
+        if self._limiter is None:
+            self._limiter = CapacityLimiter(self._max_threads)
+        return self._limiter
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking S3Service method in a worker thread"""
+        # Copy the caller's context so context variables follow the call
+        context = contextvars.copy_context()
+        return await to_thread.run_sync(
+            functools.partial(context.run, func, *args, **kwargs),
+            limiter=self.limiter
+        )
+
+    async def list_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        max_keys: int = 1000,
+        connection: Optional[S3Connection] = None,
+        continuation_token: Optional[str] = None,
+        start_after: Optional[str] = None,
+        delimiter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List one page of objects in an S3 bucket with prefix"""
+        return await self._run(
+            self._service.list_objects,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            max_keys=max_keys,
+            connection=connection,
+            continuation_token=continuation_token,
+            start_after=start_after,
+            delimiter=delimiter
+        )
+
+    async def list_objects_cached(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        max_keys: int = 1000,
+        connection: Optional[S3Connection] = None,
+        continuation_token: Optional[str] = None,
+        start_after: Optional[str] = None,
+        delimiter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List one page of objects through the listing cache"""
+        return await self._run(
+            self._service.list_objects_cached,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            max_keys=max_keys,
+            connection=connection,
+            continuation_token=continuation_token,
+            start_after=start_after,
+            delimiter=delimiter
+        )
+
+    async def query_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        connection: Optional[S3Connection] = None,
+        delimiter: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False,
+        extensions: Optional[List[str]] = None,
+        contains: Optional[str] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Filter and sort every object under a prefix"""
+        return await self._run(
+            self._service.query_objects,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            connection=connection,
+            delimiter=delimiter,
+            sort=sort,
+            descending=descending,
+            extensions=extensions,
+            contains=contains,
+            modified_after=modified_after,
+            modified_before=modified_before
+        )
+
+    async def get_object_metadata(
+        self,
+        bucket_name: str,
+        object_key: str,
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """Get metadata for a specific S3 object"""
+        return await self._run(
+            self._service.get_object_metadata,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            connection=connection
+        )
+
+    async def check_bucket_access(self, bucket_name: str, connection: Optional[S3Connection] = None) -> bool:
+        """Check if the application has access to a bucket"""
+        return await self._run(
+            self._service.check_bucket_access,
+            bucket_name=bucket_name,
+            connection=connection
+        )
+
+    async def delete_object(
+        self,
+        bucket_name: str,
+        object_key: str,
+        connection: Optional[S3Connection] = None
+    ) -> None:
+        """Delete an object from S3"""
+        await self._run(
+            self._service.delete_object,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            connection=connection
+        )
+
+    async def list_buckets(self, connection: Optional[S3Connection] = None) -> List[str]:
+        """List all accessible S3 buckets"""
+        return await self._run(self._service.list_buckets, connection=connection)
+
+    async def test_connection(self, connection: S3Connection) -> Dict[str, Any]:
+        """Test if a connection is valid by listing buckets"""
+        return await self._run(self._service.test_connection, connection)
+
+    async def create_multipart_upload(
+        self,
+        bucket_name: str,
+        object_key: str,
+        content_type: Optional[str] = None,
+        connection: Optional[S3Connection] = None
+    ) -> str:
+        """Start a multipart upload and return its upload id"""
+        return await self._run(
+            self._service.create_multipart_upload,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            content_type=content_type,
+            connection=connection
+        )
+
+    async def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        parts: List[Dict],
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """Complete a multipart upload"""
+        return await self._run(
+            self._service.complete_multipart_upload,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            upload_id=upload_id,
+            parts=parts,
+            connection=connection
+        )
+
+    async def abort_multipart_upload(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        connection: Optional[S3Connection] = None
+    ) -> None:
+        """Abort a multipart upload"""
+        await self._run(
+            self._service.abort_multipart_upload,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            upload_id=upload_id,
+            connection=connection
+        )
+
+    async def list_parts(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        connection: Optional[S3Connection] = None
+    ) -> List[Dict]:
+        """List every part already stored for a multipart upload"""
+        return await self._run(
+            self._service.list_parts,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            upload_id=upload_id,
+            connection=connection
+        )
+
+
+    # Presigning is mostly local, but a cold cache can make it resolve the
+    # bucket region (HeadBucket) or refresh credentials (STS, Roles Anywhere)
+
+    async def generate_presigned_url(
+        self,
+        bucket_name: str,
+        object_key: str,
+        operation: str = "get_object",
+        expiration: int = None,
+        connection: Optional[S3Connection] = None
+    ) -> str:
+        """Generate a presigned URL for an S3 operation"""
+        return await self._run(
+            self._service.generate_presigned_url,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            operation=operation,
+            expiration=expiration,
+            connection=connection
+        )
+
+    async def generate_presigned_post(
+        self,
+        bucket_name: str,
+        object_key: str,
+        expiration: int = None,
+        max_size: int = None,
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """Generate a presigned POST for uploading an object"""
+        return await self._run(
+            self._service.generate_presigned_post,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            expiration=expiration,
+            max_size=max_size,
+            connection=connection
+        )
+
+    async def generate_presigned_post_for_prefix(
+        self,
+        bucket_name: str,
+        prefix: str,
+        expiration: int = None,
+        max_size: int = None,
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """Generate one presigned POST valid for any key under a prefix"""
+        return await self._run(
+            self._service.generate_presigned_post_for_prefix,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            expiration=expiration,
+            max_size=max_size,
+            connection=connection
+        )
+
+    async def generate_presigned_batch(
+        self,
+        items: List[Tuple[str, str, str, Optional[S3Connection]]],
+        expiration: int = None
+    ) -> List[Dict]:
+        """Presign uploads and downloads of many objects on one worker thread"""
+        return await self._run(
+            self._service.generate_presigned_batch,
+            items=items,
+            expiration=expiration
+        )
+
+    async def generate_presigned_part_urls(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expiration: int = None,
+        connection: Optional[S3Connection] = None
+    ) -> Dict[int, str]:
+        """Generate presigned UploadPart URLs for a multipart upload"""
+        return await self._run(
+            self._service.generate_presigned_part_urls,
+            bucket_name=bucket_name,
+            object_key=object_key,
+            upload_id=upload_id,
+            part_numbers=part_numbers,
+            expiration=expiration,
+            connection=connection
+        )
+
+# Singleton instance
+async_s3_service = AsyncS3Service(s3_service, max_threads=settings.S3_ASYNC_MAX_THREADS)
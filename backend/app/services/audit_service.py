@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.audit_log import AuditLog
 from app.models.user import User
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -79,6 +79,57 @@ class AuditService:
         
         return audit_log
     
+    @staticmethod
+    def log_actions_bulk(
+        db: Session,
+        user: User,
+        entries: List[Dict],
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> int:
+        """
+        Log many user actions with a single insert and commit
+        
+        Args:
+            db: Database session
+            user: User who performed the actions
+            entries: Dicts with action, bucket_name, object_key, status and
+                optionally metadata and error_message
+            ip_address: User's IP address
+            user_agent: User's browser/client info
+        
+        Returns:
+            Number of entries written
+        """
+        if not entries:
+            return 0
+        
+        audit_logs = [
+            AuditLog(
+                user_id=user.id,
+                action=entry['action'],
+                bucket_name=entry['bucket_name'],
+                object_key=entry['object_key'],
+                status=entry['status'],
+                ip_address=ip_address,
+                user_agent=user_agent,
+                meta=entry.get('metadata'),
+                error_message=entry.get('error_message')
+            )
+            for entry in entries
+        ]
+        
+        db.bulk_save_objects(audit_logs)
+        db.commit()
+        
+        failures = sum(1 for entry in entries if entry['status'] != "success")
+        logger.info(
+            f"AUDIT: user={user.email} bulk entries={len(entries)} failures={failures}",
+            extra={'user_id': user.id, 'action': 'bulk'}
+        )
+        
+        return len(audit_logs)
+    
     @staticmethod
     def get_user_logs(
         db: Session,
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BucketRegionCache:
+    """
+    Bounded, thread-safe TTL cache of bucket regions.
+
+    Keys are tuples whose first element is the S3Connection id (None for the
+    default client). A lookup that finds no region (missing bucket) or
+    fails (open circuit, spent deadline, network error) is cached as well,
+    for a shorter time, so it is not repeated on every call; callers fall
+    back to the configured region meanwhile.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: int = 86400, negative_ttl: int = 300):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.lookup_errors = 0
+
+    def get_or_lookup(self, key: Tuple, lookup: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Return the cached region for ``key`` or find it with ``lookup``
+
+        ``lookup`` returns the region, or None when the bucket has no
+        region (it does not exist). A failed lookup returns None too.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                region, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    if region is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return region
+                del self._entries[key]
+            self.misses += 1
+
+        try:
+            region = lookup()
+        except Exception as e:
+            self.lookup_errors += 1
+            logger.warning(f"Could not determine region of bucket {key[-1]}: {e}")
+            region = None
+
+        ttl = self._ttl if region else self._negative_ttl
+        with self._lock:
+            self._entries[key] = (region, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+        return region
+
+    def invalidate(self, connection_id: Optional[int]) -> int:
+        """Drop every cached region looked up through a connection"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == connection_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached regions"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "ttl_seconds": self._ttl,
+                "negative_ttl_seconds": self._negative_ttl,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "lookup_errors": self.lookup_errors
+            }
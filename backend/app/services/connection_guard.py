@@ -0,0 +1,262 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, Optional
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+from app.core.config import settings
+from app.core import deadline
+from app.models.s3_connection import S3Connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Error codes that say the account or endpoint is unhealthy, not the request.
+# Throttling is left to the per-partition AdaptiveConcurrencyLimiter: one hot
+# prefix must not open the circuit of the whole connection
+CONNECTION_FAILURE_CODES = {
+    'InvalidAccessKeyId',
+    'SignatureDoesNotMatch',
+    'ExpiredToken',
+    'InvalidToken',
+    'TokenRefreshRequired',
+    'InternalError'
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ConnectionUnavailableError(Exception):
+    """An S3 call was rejected without being sent (open circuit or full bulkhead)"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_connection_failure(exc: BaseException) -> bool:
+    """Whether an exception counts against the connection's circuit breaker"""
+    # Imported here, adaptive_limiter imports this module
+    from app.services.adaptive_limiter import is_throttling
+    if is_throttling(exc):
+        return False
+    if isinstance(exc, ClientError):
+        error = exc.response.get('Error', {})
+        status_code = exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return error.get('Code') in CONNECTION_FAILURE_CODES or status_code >= 500
+    return isinstance(exc, (BotoConnectionError, HTTPClientError))
+
+
+class _ConnectionState:
+    """Bulkhead and circuit breaker of one connection"""
+
+    def __init__(self, connection_id: Optional[int], max_concurrent: int):
+        self.connection_id = connection_id
+        self.max_concurrent = max_concurrent
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.in_flight = 0
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.last_failure: Optional[str] = None
+        self.last_state_change: Optional[datetime] = None
+        self.rejected_open = 0
+        self.rejected_full = 0
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit for connection {self.connection_id} is now {state}")
+            self.state = state
+            self.last_state_change = datetime.now(timezone.utc)
+
+
+class ConnectionGuard:
+    """
+    Isolates S3 connections from each other.
+
+    Every connection gets a bulkhead (at most S3_BULKHEAD_MAX_CONCURRENT
+    calls in flight; callers wait S3_BULKHEAD_ACQUIRE_TIMEOUT for a slot)
+    and a circuit breaker that opens after CIRCUIT_FAILURE_THRESHOLD
+    consecutive connection failures. An open circuit rejects calls for
+    CIRCUIT_RESET_TIMEOUT seconds, then lets a single probe call through
+    (half-open); the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self):
+        self._states: Dict[Hashable, _ConnectionState] = {}
+        self._lock = threading.Lock()
+        # Connections the current thread is already inside, so nested calls
+        # (e.g. a region lookup during a list) do not take a second slot
+        self._local = threading.local()
+
+    def _state_for(self, connection_id: Optional[int]) -> _ConnectionState:
+        with self._lock:
+            state = self._states.get(connection_id)
+            if state is None:
+                state = _ConnectionState(connection_id, settings.S3_BULKHEAD_MAX_CONCURRENT)
+                self._states[connection_id] = state
+            return state
+
+    def _admit(self, state: _ConnectionState) -> bool:
+        """Check the circuit; returns True when this call is the half-open probe"""
+        with state.lock:
+            if state.state == CLOSED:
+                return False
+            elapsed = time.monotonic() - state.opened_at
+            if state.state == OPEN and elapsed >= settings.CIRCUIT_RESET_TIMEOUT:
+                state._set_state(HALF_OPEN)
+            if state.state == HALF_OPEN and not state.probe_in_flight:
+                state.probe_in_flight = True
+                return True
+
+            state.rejected_open += 1
+            retry_after = max(1, math.ceil(settings.CIRCUIT_RESET_TIMEOUT - elapsed))
+        raise ConnectionUnavailableError(
+            f"S3 connection {state.connection_id} is unavailable after repeated errors "
+            f"(last error: {state.last_failure})",
+            retry_after=retry_after
+        )
+
+    def _record(self, state: _ConnectionState, probe: bool, failure: Optional[BaseException]) -> None:
+        with state.lock:
+            if probe:
+                state.probe_in_flight = False
+            if failure is None:
+                state.consecutive_failures = 0
+                state._set_state(CLOSED)
+                return
+
+            state.consecutive_failures += 1
+            state.last_failure = str(failure)
+            if probe or state.consecutive_failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+                if state.state != OPEN:
+                    state.times_opened += 1
+                state.opened_at = time.monotonic()
+                state._set_state(OPEN)
+
+    @contextmanager
+    def guard(self, connection: Optional[S3Connection]):
+        """Run the enclosed S3 call under the connection's bulkhead and circuit breaker"""
+        if connection is not None and connection.id is None:
+            # Unsaved connections (e.g. connection tests) are not guarded
+            yield
+            return
+
+        connection_id = connection.id if connection else None
+        active = getattr(self._local, 'active', None)
+        if active is None:
+            active = self._local.active = set()
+        if connection_id in active:
+            yield
+            return
+
+        state = self._state_for(connection_id)
+        probe = self._admit(state)
+
+        acquire_timeout = settings.S3_BULKHEAD_ACQUIRE_TIMEOUT
+        left = deadline.remaining()
+        if left is not None:
+            acquire_timeout = max(0.0, min(acquire_timeout, left))
+        if not state.semaphore.acquire(timeout=acquire_timeout):
+            with state.lock:
+                state.rejected_full += 1
+                if probe:
+                    state.probe_in_flight = False
+            raise ConnectionUnavailableError(
+                f"Too many concurrent requests for S3 connection {connection_id}",
+                retry_after=1
+            )
+
+        active.add(connection_id)
+        with state.lock:
+            state.in_flight += 1
+        try:
+            yield
+        except BaseException as e:
+            # Request-level errors (missing key, access denied) say nothing
+            # about the connection's health
+            self._record(state, probe, e if is_connection_failure(e) else None)
+            raise
+        else:
+            self._record(state, probe, None)
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+            active.discard(connection_id)
+            state.semaphore.release()
+
+    def try_acquire(self, connection: Optional[S3Connection]) -> Optional[Callable[[], None]]:
+        """
+        Take a bulkhead slot for an extra attempt (a hedge) without waiting
+
+        Returns the function that frees the slot, or None when the bulkhead is
+        full or the circuit is not closed. Extra attempts do not count towards
+        the circuit breaker; the call they duplicate already does.
+        """
+        if connection is not None and connection.id is None:
+            return lambda: None
+
+        state = self._state_for(connection.id if connection else None)
+        with state.lock:
+            if state.state != CLOSED:
+                return None
+        if not state.semaphore.acquire(blocking=False):
+            return None
+        with state.lock:
+            state.in_flight += 1
+
+        def release() -> None:
+            with state.lock:
+                state.in_flight -= 1
+            state.semaphore.release()
+        return release
+
+    def reset(self, connection_id: Optional[int]) -> None:
+        """Close a connection's circuit, e.g. after its credentials were fixed"""
+        with self._lock:
+            state = self._states.get(connection_id)
+        if state is not None:
+            with state.lock:
+                state.consecutive_failures = 0
+                state.probe_in_flight = False
+                state._set_state(CLOSED)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return bulkhead usage and circuit state per connection (None is the default client)"""
+        with self._lock:
+            states = list(self._states.values())
+
+        now = time.monotonic()
+        connections = []
+        for state in states:
+            with state.lock:
+                connections.append({
+                    "connection_id": state.connection_id,
+                    "state": state.state,
+                    "consecutive_failures": state.consecutive_failures,
+                    "last_failure": state.last_failure,
+                    "last_state_change": state.last_state_change,
+                    "open_for_seconds": (
+                        round(now - state.opened_at, 1) if state.state != CLOSED and state.opened_at else None
+                    ),
+                    "times_opened": state.times_opened,
+                    "in_flight": state.in_flight,
+                    "max_concurrent": state.max_concurrent,
+                    "rejected_open": state.rejected_open,
+                    "rejected_full": state.rejected_full
+                })
+        return {
+            "failure_threshold": settings.CIRCUIT_FAILURE_THRESHOLD,
+            "reset_timeout_seconds": settings.CIRCUIT_RESET_TIMEOUT,
+            "connections": connections
+        }
+
+
+# Singleton instance
+connection_guard = ConnectionGuard()
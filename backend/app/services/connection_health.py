@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from app.core import deadline
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.s3_connection import S3Connection
+from app.services.s3_service import S3Service, s3_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+
+class ConnectionHealthProber:
+    """
+    Periodically checks every active S3 connection and caches the outcome.
+
+    Each probe is a ListBuckets call through the connection's cached client,
+    so it also exercises credential decryption and role assumption. Results
+    are kept per connection id and read by the connections list endpoint,
+    which therefore never calls AWS itself.
+    """
+
+    def __init__(self, service: S3Service):
+        self._service = service
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._results: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.last_run_at: Optional[datetime] = None
+
+    def get(self, connection_id: int) -> Dict[str, Any]:
+        """Return the cached health of a connection, ``unknown`` until it is probed"""
+        with self._lock:
+            result = self._results.get(connection_id)
+            return dict(result) if result else {"status": UNKNOWN}
+
+    def invalidate(self, connection_id: int) -> None:
+        """Forget the health of an edited or deleted connection"""
+        with self._lock:
+            self._results.pop(connection_id, None)
+
+    def check(self, connection: S3Connection) -> Dict[str, Any]:
+        """Probe one connection now and record the result"""
+        checked_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        error = None
+        token = deadline.start(settings.CONNECTION_HEALTH_TIMEOUT)
+        try:
+            self._service.list_buckets(connection)
+        except Exception as e:
+            error = str(e)
+        finally:
+            deadline.clear(token)
+        latency_ms = round((time.monotonic() - started) * 1000, 2)
+
+        with self._lock:
+            previous = self._results.get(connection.id, {})
+            result = {
+                "status": UNHEALTHY if error else HEALTHY,
+                "checked_at": checked_at,
+                "latency_ms": latency_ms,
+                "last_success_at": previous.get("last_success_at") if error else checked_at,
+                "last_error": error or previous.get("last_error"),
+                "last_error_at": checked_at if error else previous.get("last_error_at"),
+                "consecutive_failures": previous.get("consecutive_failures", 0) + 1 if error else 0
+            }
+            self._results[connection.id] = result
+
+        if error:
+            logger.warning(f"Health probe of S3 connection {connection.id} failed: {error}")
+        return dict(result)
+
+    def run(self) -> List[Dict[str, Any]]:
+        """Probe every active connection once"""
+        db = SessionLocal()
+        try:
+            connections = db.query(S3Connection).filter(S3Connection.is_active == True).all()
+            # Detach so worker threads can read the attributes after the session closes
+            for connection in connections:
+                db.expunge(connection)
+        finally:
+            db.close()
+
+        active_ids = {connection.id for connection in connections}
+        with self._lock:
+            # Deactivated or deleted connections have no current health
+            for connection_id in [key for key in self._results if key not in active_ids]:
+                del self._results[connection_id]
+
+        with ThreadPoolExecutor(
+            max_workers=settings.CONNECTION_HEALTH_CONCURRENCY,
+            thread_name_prefix="connection-health"
+        ) as executor:
+            results = list(executor.map(self.check, connections))
+        self.last_run_at = datetime.now(timezone.utc)
+        return results
+
+    def _run(self) -> None:
+        # Probe straight away so the first page load already has results
+        interval = 0
+        while not self._stop_event.wait(interval):
+            interval = settings.CONNECTION_HEALTH_INTERVAL
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Connection health run failed: {e}")
+
+    def start(self) -> None:
+        """Start the background prober thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="connection-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background prober thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the schedule and the cached health of every probed connection"""
+        with self._lock:
+            connections = {connection_id: dict(result) for connection_id, result in self._results.items()}
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": settings.CONNECTION_HEALTH_INTERVAL,
+            "last_run_at": self.last_run_at,
+            "connections": connections
+        }
+
+
+# Singleton instance
+connection_health = ConnectionHealthProber(s3_service)
@@ -0,0 +1,250 @@
+import boto3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Optional
+from app.core.config import settings
+from app.models.s3_connection import S3Connection, AuthMethod
+from app.services.roles_anywhere import RolesAnywhereProfile, roles_anywhere_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Credentials this close to expiry are refreshed on the request path
+CREDENTIAL_EXPIRY_MARGIN = timedelta(minutes=5)
+
+
+class _CachedCredentials:
+    """Temporary credentials for one connection plus what is needed to renew them"""
+
+    def __init__(
+        self,
+        connection_id: Optional[int],
+        role_arn: str,
+        external_id: Optional[str],
+        region: str,
+        roles_anywhere: Optional[RolesAnywhereProfile] = None
+    ):
+        self.connection_id = connection_id
+        self.role_arn = role_arn
+        self.external_id = external_id
+        self.region = region
+        # Set for IAM Roles Anywhere connections, which call CreateSession instead of AssumeRole
+        self.roles_anywhere = roles_anywhere
+        self.credentials: Optional[Dict[str, Any]] = None
+        self.last_refresh_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        # Held for the duration of a refresh so concurrent callers share it
+        self.lock = threading.Lock()
+
+    @property
+    def expiration(self) -> Optional[datetime]:
+        return self.credentials['Expiration'] if self.credentials else None
+
+    def expires_within(self, window: timedelta) -> bool:
+        if self.credentials is None:
+            return True
+        return self.expiration - datetime.now(timezone.utc) <= window
+
+
+class CredentialManager:
+    """
+    Keeps temporary credentials per S3Connection (sts:AssumeRole for
+    IAM_ROLE, Roles Anywhere CreateSession for IAM_ROLES_ANYWHERE) and
+    renews them in a background thread before they expire.
+    """
+
+    def __init__(self):
+        self._session = boto3.session.Session()
+        self._session_lock = threading.Lock()
+        self._sts_clients: Dict[str, Any] = {}
+        self._entries: Dict[Hashable, _CachedCredentials] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+        # Metrics
+        self.refresh_attempts = 0
+        self.failure_count = 0
+        self.last_refresh_latency_ms: Optional[float] = None
+        self.max_refresh_latency_ms = 0.0
+        self._total_refresh_latency_ms = 0.0
+
+    def _sts_client(self, region: str):
+        """STS clients are cached per region on a private session"""
+        with self._session_lock:
+            client = self._sts_clients.get(region)
+            if client is None:
+                client = self._session.client('sts', region_name=region)
+                self._sts_clients[region] = client
+            return client
+
+    @staticmethod
+    def _new_entry(connection: S3Connection, connection_id: Optional[int]) -> _CachedCredentials:
+        roles_anywhere = None
+        if connection.auth_method == AuthMethod.IAM_ROLES_ANYWHERE:
+            # Decrypted once per entry; edits to the connection invalidate it
+            roles_anywhere = RolesAnywhereProfile(
+                certificate=connection.certificate,
+                private_key=connection.private_key,
+                trust_anchor_arn=connection.trust_anchor_arn,
+                profile_arn=connection.profile_arn,
+                role_arn=connection.role_arn,
+                region=connection.region,
+                endpoint_url=connection.roles_anywhere_endpoint_url
+            )
+        return _CachedCredentials(
+            connection_id, connection.role_arn, connection.external_id, connection.region, roles_anywhere
+        )
+
+    def _entry_for(self, connection: S3Connection) -> _CachedCredentials:
+        key = (
+            connection.id,
+            connection.auth_method,
+            connection.role_arn,
+            connection.external_id,
+            connection.region,
+            connection.trust_anchor_arn,
+            connection.profile_arn,
+            connection.roles_anywhere_endpoint_url
+        )
+        if connection.id is None:
+            # Unsaved connections (e.g. connection tests) are never cached
+            return self._new_entry(connection, None)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                # Drop entries left over from a previous role/region for this connection
+                for stale in [k for k in self._entries if k[0] == connection.id]:
+                    del self._entries[stale]
+                entry = self._new_entry(connection, connection.id)
+                self._entries[key] = entry
+            return entry
+
+    def _fetch(self, entry: _CachedCredentials) -> Dict[str, Any]:
+        """Get new credentials for an entry from STS or IAM Roles Anywhere"""
+        if entry.roles_anywhere is not None:
+            return roles_anywhere_client.create_session(entry.roles_anywhere, settings.STS_SESSION_DURATION)
+
+        assume_role_kwargs = {
+            'RoleArn': entry.role_arn,
+            'RoleSessionName': 'S3AccessManagerSession',
+            'DurationSeconds': settings.STS_SESSION_DURATION
+        }
+        if entry.external_id:
+            assume_role_kwargs['ExternalId'] = entry.external_id
+        return self._sts_client(entry.region).assume_role(**assume_role_kwargs)['Credentials']
+
+    def _refresh(self, entry: _CachedCredentials) -> None:
+        """Renew the credentials of an entry. Caller must hold entry.lock"""
+        started = time.monotonic()
+        try:
+            credentials = self._fetch(entry)
+        except Exception as e:
+            self.failure_count += 1
+            entry.last_error = str(e)
+            logger.error(f"Error refreshing credentials for connection {entry.connection_id}: {e}")
+            raise
+        finally:
+            latency_ms = (time.monotonic() - started) * 1000
+            self.last_refresh_latency_ms = round(latency_ms, 2)
+            self.max_refresh_latency_ms = max(self.max_refresh_latency_ms, self.last_refresh_latency_ms)
+            self._total_refresh_latency_ms += latency_ms
+            self.refresh_attempts += 1
+
+        entry.credentials = credentials
+        entry.last_refresh_at = datetime.now(timezone.utc)
+        entry.last_error = None
+
+    def get_credentials(self, connection: S3Connection) -> Dict[str, Any]:
+        """
+        Get temporary credentials for an IAM_ROLE or IAM_ROLES_ANYWHERE connection
+
+        Returns a dict shaped like STS ``Credentials``. Only the first caller for an
+        expired entry calls STS; concurrent callers wait for its result.
+        """
+        entry = self._entry_for(connection)
+        with entry.lock:
+            if entry.expires_within(CREDENTIAL_EXPIRY_MARGIN):
+                self._refresh(entry)
+            return entry.credentials
+
+    def refresh_expiring(self) -> None:
+        """Renew every cached entry that expires within the refresh window"""
+        window = timedelta(seconds=settings.CREDENTIAL_REFRESH_WINDOW)
+        with self._lock:
+            entries = list(self._entries.values())
+
+        for entry in entries:
+            if not entry.expires_within(window):
+                continue
+            # Skip entries a request is already refreshing
+            if not entry.lock.acquire(blocking=False):
+                continue
+            try:
+                if entry.expires_within(window):
+                    self._refresh(entry)
+            except Exception:
+                # Already counted and logged; the old credentials stay in use
+                pass
+            finally:
+                entry.lock.release()
+
+    def invalidate(self, connection_id: int) -> None:
+        """Forget credentials after a connection is edited or deleted"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == connection_id]:
+                del self._entries[key]
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(settings.CREDENTIAL_REFRESH_INTERVAL):
+            self.refresh_expiring()
+
+    def start(self) -> None:
+        """Start the background refresher thread"""
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresher = threading.Thread(target=self._run, name="credential-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self) -> None:
+        """Stop the background refresher thread"""
+        self._stop_event.set()
+        if self._refresher:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return refresh latency/failure metrics and per-connection expiry"""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entries = list(self._entries.values())
+
+        return {
+            "refresher_running": bool(self._refresher and self._refresher.is_alive()),
+            "refresh_attempts": self.refresh_attempts,
+            "failure_count": self.failure_count,
+            "last_refresh_latency_ms": self.last_refresh_latency_ms,
+            "max_refresh_latency_ms": round(self.max_refresh_latency_ms, 2),
+            "avg_refresh_latency_ms": (
+                round(self._total_refresh_latency_ms / self.refresh_attempts, 2) if self.refresh_attempts else None
+            ),
+            "connections": [
+                {
+                    "connection_id": entry.connection_id,
+                    "source": "roles_anywhere" if entry.roles_anywhere is not None else "assume_role",
+                    "expires_in_seconds": (
+                        int((entry.expiration - now).total_seconds()) if entry.expiration else None
+                    ),
+                    "last_refresh_at": entry.last_refresh_at,
+                    "last_error": entry.last_error
+                }
+                for entry in entries
+            ]
+        }
+
+
+# Singleton instance
+credential_manager = CredentialManager()
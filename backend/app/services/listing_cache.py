@@ -0,0 +1,179 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rough per-object overhead of the dicts, datetimes and strings of a listed object
+OBJECT_OVERHEAD_BYTES = 600
+
+
+def page_size_bytes(page: Dict[str, Any]) -> int:
+    """Estimate the memory a cached listing page occupies"""
+    size = sys.getsizeof(page)
+    for obj in page['objects']:
+        size += OBJECT_OVERHEAD_BYTES + len(obj['key']) + len(obj['etag'])
+    for prefix in page['prefixes']:
+        size += sys.getsizeof(prefix)
+    return size
+
+
+class ListingCache:
+    """
+    Bounded, thread-safe cache of ListObjectsV2 pages with stale-while-revalidate.
+
+    Keys are tuples of (connection id, bucket, prefix, delimiter, continuation
+    token, start after, page size); the connection id is None for the default
+    client. A page younger than ``ttl`` is served as is. An older page is still
+    served for ``stale_ttl`` more seconds while it is refreshed in the
+    background, so a revisited folder answers instantly. Memory is capped by
+    the estimated size of the cached pages, evicting the least recently used.
+
+    Writes made through this service invalidate every page whose prefix
+    covers the written key. An invalidation also discards listings that were
+    in flight when it happened, so they cannot put back a pre-write page.
+    """
+
+    def __init__(self, max_bytes: int = 67108864, ttl: int = 10, stale_ttl: int = 60, refresh_workers: int = 4):
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._refresh_workers = refresh_workers
+        self._entries: "OrderedDict[Hashable, Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._refreshing: Set[Hashable] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _refresher(self) -> ThreadPoolExecutor:
+        # Created on first use so idle workers do not start threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._refresh_workers, thread_name_prefix="listing-refresh")
+        return self._executor
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _store(self, key: Hashable, page: Dict[str, Any], generation: int) -> None:
+        size = page_size_bytes(page)
+        with self._lock:
+            # Written to since the listing started, or too big to ever fit
+            if generation != self._generation or size > self._max_bytes:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (page, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _refresh(self, key: Hashable, lister: Callable[[], Dict[str, Any]], generation: int) -> None:
+        try:
+            self._store(key, lister(), generation)
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Could not refresh cached listing of {key[1]}/{key[2]}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_list(
+        self,
+        key: Tuple,
+        lister: Callable[[], Dict[str, Any]],
+        refresher: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached page for ``key`` or list it with ``lister``
+
+        A stale page is returned right away and ``refresher``, which must not
+        depend on the calling request, lists it again in the background.
+        Exceptions are not cached.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                page, _, stored_at = entry
+                age = now - stored_at
+                if age < self._ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return page
+                if age < self._ttl + self._stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._refresher().submit(self._refresh, key, refresher, self._generation)
+                    return page
+                self._remove(key)
+            self.misses += 1
+            generation = self._generation
+
+        page = lister()
+        self._store(key, page, generation)
+        return page
+
+    def invalidate(self, bucket_name: str, object_key: str) -> int:
+        """Drop every cached page of a bucket whose prefix covers ``object_key``"""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if key[1] == bucket_name and object_key.startswith(key[2])]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_connection(self, connection_id: Optional[int]) -> int:
+        """Drop every page listed through a connection"""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if key[0] == connection_id]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached pages"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size in entries and bytes and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "stale_ttl_seconds": self._stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "refreshing": len(self._refreshing)
+            }
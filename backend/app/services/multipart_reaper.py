@@ -0,0 +1,216 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from botocore.exceptions import ClientError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.permission import Permission
+from app.models.s3_connection import S3Connection
+from app.models.upload_session import UploadSession
+from app.services.s3_service import S3Service, s3_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MultipartReaper:
+    """
+    Aborts multipart uploads that were started long ago and never completed.
+
+    Every bucket referenced in ``permissions`` is scanned with the connection
+    the permission uses (or the default client). Uploads older than the
+    configured age are aborted, which frees the storage their parts occupy.
+    """
+
+    def __init__(self, service: S3Service):
+        self._service = service
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def _targets(self, db: Session) -> List[Tuple[Optional[S3Connection], Set[str]]]:
+        """Group the buckets referenced in permissions by connection"""
+        buckets: Dict[Optional[int], Set[str]] = {}
+        for connection_id, bucket_name in db.query(Permission.s3_connection_id, Permission.bucket_name).distinct():
+            buckets.setdefault(connection_id, set()).add(bucket_name)
+
+        connections = {
+            connection.id: connection
+            for connection in db.query(S3Connection).filter(S3Connection.is_active == True)
+        }
+
+        targets = []
+        for connection_id, bucket_names in buckets.items():
+            if connection_id is None:
+                targets.append((None, bucket_names))
+            elif connection_id in connections:
+                targets.append((connections[connection_id], bucket_names))
+        return targets
+
+    def _reap_upload(
+        self,
+        bucket_name: str,
+        upload: Dict,
+        connection: Optional[S3Connection],
+        dry_run: bool
+    ) -> int:
+        """Abort one upload and return the bytes its parts occupied"""
+        parts = self._service.list_parts(
+            bucket_name=bucket_name,
+            object_key=upload['object_key'],
+            upload_id=upload['upload_id'],
+            connection=connection
+        )
+        if not dry_run:
+            self._service.abort_multipart_upload(
+                bucket_name=bucket_name,
+                object_key=upload['object_key'],
+                upload_id=upload['upload_id'],
+                connection=connection
+            )
+        return sum(part['size'] for part in parts)
+
+    def _reap_connection(
+        self,
+        connection: Optional[S3Connection],
+        bucket_names: Set[str],
+        cutoff: datetime,
+        dry_run: bool
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Reap every bucket of one connection with a bounded number of S3 calls in flight"""
+        connection_id = connection.id if connection else None
+        buckets = []
+        aborted_upload_ids = []
+
+        with ThreadPoolExecutor(max_workers=settings.MULTIPART_REAPER_CONCURRENCY) as executor:
+            for bucket_name in sorted(bucket_names):
+                result = {
+                    "connection_id": connection_id,
+                    "bucket_name": bucket_name,
+                    "uploads_found": 0,
+                    "uploads_aborted": 0,
+                    "bytes_reclaimed": 0,
+                    "errors": 0
+                }
+                buckets.append(result)
+
+                try:
+                    uploads = self._service.list_multipart_uploads(bucket_name, connection=connection)
+                except Exception as e:
+                    result["errors"] += 1
+                    logger.error(f"Reaper could not list uploads in {bucket_name} (connection {connection_id}): {e}")
+                    continue
+
+                result["uploads_found"] = len(uploads)
+                expired = [upload for upload in uploads if upload['initiated'] < cutoff]
+                futures = [
+                    (upload, executor.submit(self._reap_upload, bucket_name, upload, connection, dry_run))
+                    for upload in expired
+                ]
+                for upload, future in futures:
+                    try:
+                        result["bytes_reclaimed"] += future.result()
+                    except ClientError as e:
+                        # Completed or aborted since it was listed
+                        if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                            result["errors"] += 1
+                        continue
+                    except Exception as e:
+                        result["errors"] += 1
+                        logger.error(f"Reaper could not abort upload {upload['upload_id']} in {bucket_name}: {e}")
+                        continue
+                    result["uploads_aborted"] += 1
+                    # A dry run leaves the upload, and so its resumable session, alive
+                    if not dry_run:
+                        aborted_upload_ids.append(upload['upload_id'])
+
+        return buckets, aborted_upload_ids
+
+    def run(self, dry_run: Optional[bool] = None, max_age: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run one reaper pass and return a report with the bytes reclaimed per bucket
+
+        In dry-run mode nothing is aborted; the report shows what would be.
+        """
+        dry_run = settings.MULTIPART_REAPER_DRY_RUN if dry_run is None else dry_run
+        max_age = settings.MULTIPART_REAPER_MAX_AGE if max_age is None else max_age
+        started_at = datetime.now(timezone.utc)
+        cutoff = started_at - timedelta(seconds=max_age)
+        started = time.monotonic()
+
+        buckets = []
+        db = SessionLocal()
+        try:
+            for connection, bucket_names in self._targets(db):
+                connection_buckets, aborted_upload_ids = self._reap_connection(
+                    connection, bucket_names, cutoff, dry_run
+                )
+                buckets.extend(connection_buckets)
+
+                if aborted_upload_ids:
+                    # Resumable sessions of aborted uploads can no longer be resumed
+                    db.query(UploadSession).filter(
+                        UploadSession.upload_id.in_(aborted_upload_ids),
+                        UploadSession.status == "in_progress"
+                    ).update({UploadSession.status: "aborted"}, synchronize_session=False)
+                    db.commit()
+        finally:
+            db.close()
+
+        report = {
+            "started_at": started_at,
+            "duration_ms": round((time.monotonic() - started) * 1000, 2),
+            "dry_run": dry_run,
+            "max_age_seconds": max_age,
+            "uploads_aborted": sum(bucket["uploads_aborted"] for bucket in buckets),
+            "bytes_reclaimed": sum(bucket["bytes_reclaimed"] for bucket in buckets),
+            "errors": sum(bucket["errors"] for bucket in buckets),
+            "buckets": buckets
+        }
+        self.last_report = report
+
+        for bucket in buckets:
+            if bucket["uploads_aborted"]:
+                logger.info(
+                    f"Reaper {'would abort' if dry_run else 'aborted'} {bucket['uploads_aborted']} upload(s) "
+                    f"in {bucket['bucket_name']}, {bucket['bytes_reclaimed']} bytes"
+                )
+        return report
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(settings.MULTIPART_REAPER_INTERVAL):
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Multipart reaper run failed: {e}")
+
+    def start(self) -> None:
+        """Start the background reaper thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="multipart-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background reaper thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the schedule and the report of the last run"""
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": settings.MULTIPART_REAPER_INTERVAL,
+            "max_age_seconds": settings.MULTIPART_REAPER_MAX_AGE,
+            "last_report": self.last_report
+        }
+
+
+# Singleton instance
+multipart_reaper = MultipartReaper(s3_service)
@@ -37,6 +37,27 @@ class PermissionService:
             Permission.bucket_name == bucket_name
         ).all()
         
+        return PermissionService.match_permission(permissions, bucket_name, object_key, action)
+    
+    @staticmethod
+    def match_permission(
+        permissions: List[Permission],
+        bucket_name: str,
+        object_key: str,
+        action: str
+    ) -> Permission:
+        """
+        Find the permission that allows an action, without querying the database
+        
+        Args:
+            permissions: The user's permissions for the bucket
+            bucket_name: S3 bucket name
+            object_key: S3 object key
+            action: Action to check (read, write, delete, list)
+        
+        Returns:
+            Matching Permission object, raises HTTPException otherwise
+        """
         if not permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,256 @@
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Latencies kept per operation for the percentile
+LATENCY_WINDOW = 1000
+# The hedge delay is recomputed after this many new samples
+DELAY_REFRESH_SAMPLES = 20
+
+
+class _OperationStats:
+    """Latency window, hedge delay and counters of one (connection, operation)"""
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.new_samples = 0
+        self.delay: Optional[float] = None
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.no_capacity = 0
+        self.no_slot = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            self.new_samples += 1
+            if len(self.latencies) < settings.S3_HEDGE_MIN_SAMPLES:
+                return
+            if self.delay is None or self.new_samples >= DELAY_REFRESH_SAMPLES:
+                ordered = sorted(self.latencies)
+                index = min(len(ordered) - 1, math.ceil(len(ordered) * settings.S3_HEDGE_PERCENTILE / 100) - 1)
+                self.delay = max(ordered[index], settings.S3_HEDGE_MIN_DELAY)
+                self.new_samples = 0
+
+
+class RequestHedger:
+    """
+    Hedged execution of idempotent S3 reads.
+
+    The first attempt runs on a worker thread. If it has not answered after
+    the S3_HEDGE_PERCENTILE latency of recent calls to the same operation,
+    a second, identical attempt is sent and whichever succeeds first wins;
+    the loser is left to finish in the background. Hedging starts once
+    S3_HEDGE_MIN_SAMPLES latencies are known.
+
+    Extra requests are capped by a token budget: every call earns
+    S3_HEDGE_BUDGET_RATIO tokens (up to S3_HEDGE_BUDGET_BURST) and every
+    hedge spends one, so hedges stay a fixed share of the read volume even
+    when S3 slows down as a whole. Attempts only use a worker when one is
+    free; otherwise the call runs unhedged on the caller's thread.
+
+    The caller holds the connection's bulkhead and partition slots for the
+    first attempt. A hedge is only sent when ``acquire_slot`` gets slots for
+    it without waiting, and keeps them until both attempts have finished, so
+    a losing attempt still running in the background stays counted.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Hashable, _OperationStats] = {}
+        self._lock = threading.Lock()
+        self._tokens = settings.S3_HEDGE_BUDGET_BURST
+        self._workers = threading.BoundedSemaphore(settings.S3_HEDGE_MAX_WORKERS)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _stats_for(self, key: Hashable) -> _OperationStats:
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = _OperationStats()
+                self._stats[key] = stats
+            return stats
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _refund_token(self) -> None:
+        with self._lock:
+            self._tokens = min(settings.S3_HEDGE_BUDGET_BURST, self._tokens + 1)
+
+    def _earn_tokens(self) -> None:
+        with self._lock:
+            self._tokens = min(settings.S3_HEDGE_BUDGET_BURST, self._tokens + settings.S3_HEDGE_BUDGET_RATIO)
+
+    def _submit(self, func: Callable[[], Any], stats: Optional[_OperationStats] = None) -> Optional[Future]:
+        """Run ``func`` on a free worker; returns None when every worker is busy"""
+        if not self._workers.acquire(blocking=False):
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.S3_HEDGE_MAX_WORKERS,
+                        thread_name_prefix="s3-hedge"
+                    )
+        # The request deadline lives in a context variable
+        context = contextvars.copy_context()
+
+        def attempt():
+            started = time.monotonic()
+            try:
+                return context.run(func)
+            finally:
+                if stats is not None:
+                    stats.record(time.monotonic() - started)
+                self._workers.release()
+
+        try:
+            return self._executor.submit(attempt)
+        except RuntimeError:
+            # Executor shut down
+            self._workers.release()
+            return None
+
+    @staticmethod
+    def _release_when_done(futures, release: Callable[[], None]) -> None:
+        """Call ``release`` once every future has finished"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_future: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                release()
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def call(
+        self,
+        connection_id: Optional[int],
+        operation: str,
+        func: Callable[[], Any],
+        acquire_slot: Optional[Callable[[], Optional[Callable[[], None]]]] = None
+    ) -> Any:
+        """
+        Run an idempotent S3 read, hedging it when it is slower than usual
+
+        ``acquire_slot`` takes the concurrency slots of the hedge without
+        waiting and returns the function that frees them, or None to skip it.
+        """
+        if not settings.S3_HEDGING_ENABLED:
+            return func()
+
+        stats = self._stats_for((connection_id, operation))
+        with stats.lock:
+            stats.calls += 1
+            delay = stats.delay
+        self._earn_tokens()
+
+        # Only first attempts feed the latency window
+        primary = self._submit(func, stats)
+        if primary is None:
+            with stats.lock:
+                stats.no_capacity += 1
+            return func()
+
+        if delay is None:
+            return primary.result()
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        if not self._take_token():
+            with stats.lock:
+                stats.budget_denied += 1
+            return primary.result()
+        release_slot = acquire_slot() if acquire_slot else None
+        if acquire_slot and release_slot is None:
+            self._refund_token()
+            with stats.lock:
+                stats.no_slot += 1
+            return primary.result()
+        hedge = self._submit(func)
+        if hedge is None:
+            if release_slot:
+                release_slot()
+            self._refund_token()
+            with stats.lock:
+                stats.no_capacity += 1
+            return primary.result()
+        if release_slot:
+            self._release_when_done((primary, hedge), release_slot)
+
+        with stats.lock:
+            stats.hedged += 1
+        pending = {primary, hedge}
+        failure: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is hedge:
+                        with stats.lock:
+                            stats.hedge_wins += 1
+                    return future.result()
+                # The other attempt may still succeed
+                failure = failure or error
+        raise failure
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, letting running attempts finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge delays and rates per (connection, operation)"""
+        with self._lock:
+            items = list(self._stats.items())
+            tokens = self._tokens
+
+        operations = []
+        for (connection_id, operation), stats in items:
+            with stats.lock:
+                operations.append({
+                    "connection_id": connection_id,
+                    "operation": operation,
+                    "samples": len(stats.latencies),
+                    "hedge_delay_ms": round(stats.delay * 1000, 1) if stats.delay is not None else None,
+                    "calls": stats.calls,
+                    "hedged": stats.hedged,
+                    "hedge_rate": round(stats.hedged / stats.calls, 4) if stats.calls else 0.0,
+                    "hedge_wins": stats.hedge_wins,
+                    "budget_denied": stats.budget_denied,
+                    "no_capacity": stats.no_capacity,
+                    "no_slot": stats.no_slot
+                })
+        return {
+            "enabled": settings.S3_HEDGING_ENABLED,
+            "percentile": settings.S3_HEDGE_PERCENTILE,
+            "budget_tokens": round(tokens, 2),
+            "operations": operations
+        }
+
+
+# Singleton instance
+request_hedger = RequestHedger()
@@ -0,0 +1,255 @@
+"""
+IAM Roles Anywhere CreateSession client.
+
+Exchanges an X.509 certificate and its private key for temporary AWS
+credentials. The request is signed locally with the AWS4-X509 variant of
+Signature Version 4, where the certificate's private key signs the string
+to sign instead of a derived HMAC key, and is sent with httpx; no AWS
+credentials are needed to make it.
+"""
+import base64
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SERVICE = 'rolesanywhere'
+RSA_ALGORITHM = 'AWS4-X509-RSA-SHA256'
+ECDSA_ALGORITHM = 'AWS4-X509-ECDSA-SHA256'
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+class RolesAnywhereError(Exception):
+    """CreateSession failed or the certificate/key could not be used"""
+
+
+class RolesAnywhereProfile(NamedTuple):
+    """Everything needed to call CreateSession for one connection"""
+    certificate: str  # PEM, leaf certificate first, optionally followed by intermediates
+    private_key: str  # PEM, RSA or EC
+    trust_anchor_arn: str
+    profile_arn: str
+    role_arn: str
+    region: str
+    endpoint_url: Optional[str] = None
+
+
+def _load_certificates(pem: str) -> List[x509.Certificate]:
+    try:
+        certificates = x509.load_pem_x509_certificates(pem.encode('utf-8'))
+    except ValueError as e:
+        raise RolesAnywhereError(f"Invalid certificate: {e}")
+    return certificates
+
+
+def _load_private_key(pem: str):
+    try:
+        key = serialization.load_pem_private_key(pem.encode('utf-8'), password=None)
+    except (ValueError, TypeError) as e:
+        raise RolesAnywhereError(f"Invalid private key: {e}")
+    if not isinstance(key, (rsa.RSAPrivateKey, ec.EllipticCurvePrivateKey)):
+        raise RolesAnywhereError("Only RSA and EC private keys are supported")
+    return key
+
+
+def validate_credentials(certificate: str, private_key: str) -> None:
+    """Check that the PEM certificate and key parse and belong together"""
+    leaf = _load_certificates(certificate)[0]
+    key = _load_private_key(private_key)
+    public_format = serialization.PublicFormat.SubjectPublicKeyInfo
+    if (
+        leaf.public_key().public_bytes(serialization.Encoding.DER, public_format)
+        != key.public_key().public_bytes(serialization.Encoding.DER, public_format)
+    ):
+        raise RolesAnywhereError("The private key does not belong to the certificate")
+
+
+def _der_base64(certificate: x509.Certificate) -> str:
+    return base64.b64encode(certificate.public_bytes(serialization.Encoding.DER)).decode('ascii')
+
+
+def _endpoint(profile: RolesAnywhereProfile) -> str:
+    return profile.endpoint_url or f"https://{SERVICE}.{profile.region}.amazonaws.com"
+
+
+def string_to_sign(
+    method: str,
+    path: str,
+    headers: Dict[str, str],
+    signed_headers: List[str],
+    body: bytes,
+    algorithm: str,
+    amz_date: str,
+    scope: str
+) -> str:
+    """The SigV4 string to sign, shared by the signer and the stand-in endpoint"""
+    lowered = {name.lower(): value for name, value in headers.items()}
+    canonical_headers = ''.join(f"{name}:{' '.join(lowered[name].split())}\n" for name in signed_headers)
+    canonical_request = '\n'.join([
+        method,
+        path,
+        '',
+        canonical_headers,
+        ';'.join(signed_headers),
+        hashlib.sha256(body).hexdigest()
+    ])
+    return '\n'.join([
+        algorithm,
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+    ])
+
+
+def sign_create_session(
+    profile: RolesAnywhereProfile,
+    duration_seconds: int,
+    now: Optional[datetime] = None
+) -> Tuple[str, Dict[str, str], bytes]:
+    """
+    Build a signed CreateSession request
+    Returns the URL, the headers to send and the JSON body
+    """
+    certificates = _load_certificates(profile.certificate)
+    key = _load_private_key(profile.private_key)
+    leaf, chain = certificates[0], certificates[1:]
+    algorithm = RSA_ALGORITHM if isinstance(key, rsa.RSAPrivateKey) else ECDSA_ALGORITHM
+
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime(TIMESTAMP_FORMAT)
+    scope = f"{amz_date[:8]}/{profile.region}/{SERVICE}/aws4_request"
+
+    endpoint = _endpoint(profile)
+    url = f"{endpoint.rstrip('/')}/sessions"
+    parts = urlsplit(url)
+    body = json.dumps({
+        'durationSeconds': duration_seconds,
+        'profileArn': profile.profile_arn,
+        'roleArn': profile.role_arn,
+        'trustAnchorArn': profile.trust_anchor_arn
+    }).encode('utf-8')
+
+    headers = {
+        'Content-Type': 'application/json',
+        'Host': parts.netloc,
+        'X-Amz-Date': amz_date,
+        'X-Amz-X509': _der_base64(leaf)
+    }
+    if chain:
+        headers['X-Amz-X509-Chain'] = ','.join(_der_base64(certificate) for certificate in chain)
+    signed_headers = sorted(name.lower() for name in headers)
+
+    payload = string_to_sign('POST', parts.path, headers, signed_headers, body, algorithm, amz_date, scope).encode('utf-8')
+    if isinstance(key, rsa.RSAPrivateKey):
+        signature = key.sign(payload, padding.PKCS1v15(), hashes.SHA256())
+    else:
+        signature = key.sign(payload, ec.ECDSA(hashes.SHA256()))
+
+    headers['Authorization'] = (
+        f"{algorithm} Credential={leaf.serial_number}/{scope}, "
+        f"SignedHeaders={';'.join(signed_headers)}, Signature={signature.hex()}"
+    )
+    return url, headers, body
+
+
+def verify_create_session(method: str, path: str, headers: Dict[str, str], body: bytes) -> x509.Certificate:
+    """
+    Check the signature of a CreateSession request against its X-Amz-X509 certificate
+
+    Only the signature is checked, not the certificate's trust chain; this is
+    what a local stand-in endpoint needs. Returns the signing certificate.
+    """
+    lowered = {name.lower(): value for name, value in headers.items()}
+    try:
+        algorithm, fields = lowered['authorization'].split(' ', 1)
+        values = dict(field.strip().split('=', 1) for field in fields.split(','))
+        serial, scope = values['Credential'].split('/', 1)
+        signed_headers = values['SignedHeaders'].split(';')
+        signature = bytes.fromhex(values['Signature'])
+        certificate = x509.load_der_x509_certificate(base64.b64decode(lowered['x-amz-x509']))
+    except (KeyError, ValueError) as e:
+        raise RolesAnywhereError(f"Malformed CreateSession request: {e}")
+
+    if str(certificate.serial_number) != serial:
+        raise RolesAnywhereError("Credential serial number does not match the certificate")
+    if 'x-amz-x509' not in signed_headers or any(name not in lowered for name in signed_headers):
+        raise RolesAnywhereError("Signed headers are missing from the request")
+    payload = string_to_sign(
+        method, path, lowered, signed_headers, body, algorithm, lowered.get('x-amz-date', ''), scope
+    ).encode('utf-8')
+    public_key = certificate.public_key()
+    try:
+        if algorithm == RSA_ALGORITHM and isinstance(public_key, rsa.RSAPublicKey):
+            public_key.verify(signature, payload, padding.PKCS1v15(), hashes.SHA256())
+        elif algorithm == ECDSA_ALGORITHM and isinstance(public_key, ec.EllipticCurvePublicKey):
+            public_key.verify(signature, payload, ec.ECDSA(hashes.SHA256()))
+        else:
+            raise RolesAnywhereError(f"Algorithm {algorithm} does not match the certificate key")
+    except InvalidSignature:
+        raise RolesAnywhereError("Signature does not match")
+    return certificate
+
+
+class RolesAnywhereClient:
+    """Sends CreateSession requests over a shared, keep-alive httpx client"""
+
+    def __init__(self):
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    def _http(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=settings.ROLES_ANYWHERE_TIMEOUT)
+            return self._client
+
+    def create_session(self, profile: RolesAnywhereProfile, duration_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Exchange the profile's certificate for temporary credentials
+
+        Returns a dict shaped like STS ``Credentials`` (AccessKeyId,
+        SecretAccessKey, SessionToken and Expiration as a datetime).
+        """
+        if duration_seconds is None:
+            duration_seconds = settings.STS_SESSION_DURATION
+        url, headers, body = sign_create_session(profile, duration_seconds)
+
+        try:
+            response = self._http().post(url, headers=headers, content=body)
+        except httpx.HTTPError as e:
+            raise RolesAnywhereError(f"CreateSession request to {url} failed: {e}")
+        if response.status_code not in (200, 201):
+            raise RolesAnywhereError(f"CreateSession returned {response.status_code}: {response.text[:500]}")
+
+        try:
+            credentials = response.json()['credentialSet'][0]['credentials']
+            expiration = datetime.fromisoformat(credentials['expiration'].replace('Z', '+00:00'))
+            return {
+                'AccessKeyId': credentials['accessKeyId'],
+                'SecretAccessKey': credentials['secretAccessKey'],
+                'SessionToken': credentials['sessionToken'],
+                'Expiration': expiration
+            }
+        except (KeyError, IndexError, ValueError) as e:
+            raise RolesAnywhereError(f"Unexpected CreateSession response: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+# Singleton instance
+roles_anywhere_client = RolesAnywhereClient()
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class S3ClientCache:
+    """
+    Bounded, thread-safe LRU cache of boto3 clients.
+
+    Keys are tuples whose first element is the S3Connection id, so every
+    client built for a connection can be dropped with ``invalidate``.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self._max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[datetime]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_create(
+        self,
+        key: Tuple,
+        factory: Callable[[], Tuple[Any, Optional[datetime]]]
+    ) -> Any:
+        """
+        Return the cached client for ``key`` or build one with ``factory``
+
+        The factory returns ``(client, expires_at)``; entries with an
+        ``expires_at`` in the past are rebuilt on the next lookup.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                client, expires_at = entry
+                if expires_at is None or expires_at > datetime.now(timezone.utc):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return client
+                del self._entries[key]
+            self.misses += 1
+
+        # Build outside the lock so a slow client construction does not
+        # block lookups for other connections
+        client, expires_at = factory()
+
+        with self._lock:
+            self._entries[key] = (client, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return client
+
+    def invalidate(self, connection_id: int) -> int:
+        """Drop every cached client that belongs to a connection"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == connection_id]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+        if stale:
+            logger.info(f"Evicted {len(stale)} cached S3 client(s) for connection {connection_id}")
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached clients"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
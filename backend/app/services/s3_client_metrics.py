@@ -0,0 +1,115 @@
+import threading
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolMetrics:
+    """HTTP counters for the clients of one connection"""
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.attempts = 0
+        self.saturated_attempts = 0
+        self.calls = 0
+        self.failed_calls = 0
+        self.retried_calls = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+
+class S3ClientMetrics:
+    """
+    Connection pool and retry instrumentation for boto3 S3 clients.
+
+    ``instrument`` registers botocore event hooks on a client. Every HTTP
+    attempt is counted between ``before-send`` and ``response-received``;
+    an attempt that starts while every pooled connection is busy counts as
+    saturated (urllib3 then opens a throwaway connection). Retries come from
+    the ``RetryAttempts`` botocore reports once a call finishes.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Optional[int], _PoolMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, connection_id: Optional[int], pool_size: int) -> _PoolMetrics:
+        with self._lock:
+            pool = self._pools.get(connection_id)
+            if pool is None:
+                pool = _PoolMetrics(pool_size)
+                self._pools[connection_id] = pool
+            return pool
+
+    def instrument(self, client: Any, connection_id: Optional[int], pool_size: int) -> Any:
+        """Attach the counting hooks to a client and return it"""
+        pool = self._pool(connection_id, pool_size)
+        # Clients for several regions share the per-connection counters; the
+        # pool size reported is the one of the most recently built client
+        pool.pool_size = pool_size
+        # An earlier before-send hook may raise (e.g. a spent request
+        # deadline), in which case this attempt was never counted
+        sending = threading.local()
+
+        def before_send(**kwargs):
+            sending.counted = True
+            with pool.lock:
+                if pool.in_flight >= pool.pool_size:
+                    pool.saturated_attempts += 1
+                pool.in_flight += 1
+                pool.attempts += 1
+                pool.max_in_flight = max(pool.max_in_flight, pool.in_flight)
+
+        def response_received(**kwargs):
+            if not getattr(sending, 'counted', False):
+                return
+            sending.counted = False
+            with pool.lock:
+                pool.in_flight -= 1
+
+        def after_call(http_response, parsed, **kwargs):
+            retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            with pool.lock:
+                pool.calls += 1
+                pool.retries += retries
+                if retries:
+                    pool.retried_calls += 1
+                if http_response.status_code >= 300:
+                    pool.failed_calls += 1
+
+        def after_call_error(**kwargs):
+            with pool.lock:
+                pool.calls += 1
+                pool.failed_calls += 1
+
+        events = client.meta.events
+        events.register('before-send.s3', before_send)
+        events.register('response-received.s3', response_received)
+        events.register('after-call.s3', after_call)
+        events.register('after-call-error.s3', after_call_error)
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool usage and retry counters per connection (None is the default client)"""
+        with self._lock:
+            pools = list(self._pools.items())
+
+        result = []
+        for connection_id, pool in pools:
+            with pool.lock:
+                result.append({
+                    "connection_id": connection_id,
+                    "pool_size": pool.pool_size,
+                    "in_flight": pool.in_flight,
+                    "max_in_flight": pool.max_in_flight,
+                    "attempts": pool.attempts,
+                    "saturated_attempts": pool.saturated_attempts,
+                    "calls": pool.calls,
+                    "failed_calls": pool.failed_calls,
+                    "retried_calls": pool.retried_calls,
+                    "retries": pool.retries
+                })
+        return {"connections": result}
@@ -1,72 +1,368 @@
 import boto3
+import functools
+import inspect
+import threading
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from app.core.config import settings
-from app.models.s3_connection import S3Connection, AuthMethod
+from app.core import deadline
+from app.core.database import SessionLocal
+from app.models.s3_connection import S3Connection, AuthMethod, decrypted_credentials
+from app.services.s3_client_cache import S3ClientCache
+from app.services.bucket_region_cache import BucketRegionCache
+from app.services.listing_cache import ListingCache
+from app.services.s3_client_metrics import S3ClientMetrics
+from app.services.credential_manager import credential_manager, CREDENTIAL_EXPIRY_MARGIN
+from app.services.connection_guard import connection_guard
+from app.services.request_hedger import request_hedger
+from app.services.adaptive_limiter import adaptive_limiter
+from app.services import sigv4
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Presign with SigV4 everywhere so botocore and the local signer agree
+S3_CLIENT_CONFIG = Config(signature_version='s3v4')
+
+# Pool and retry instrumentation shared by every S3 client
+s3_client_metrics = S3ClientMetrics()
+
+def guarded(method=None, *, resolve_region: bool = True):
+    """
+    Run an S3Service method within its partition's adaptive concurrency limit
+    and under its connection's bulkhead and circuit breaker
+
+    The bucket's region is resolved (and cached) before any slot is taken, so
+    the method's _bucket_client never waits for the lookup's own slots while
+    holding these. The lookup itself is guarded with ``resolve_region=False``.
+    """
+    if method is None:
+        return functools.partial(guarded, resolve_region=resolve_region)
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        deadline.check(f"S3 {method.__name__}")
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        connection = arguments.get('connection')
+        if resolve_region and arguments.get('bucket_name') is not None:
+            self.bucket_region(arguments['bucket_name'], connection)
+        key = arguments.get('object_key', arguments.get('prefix'))
+        # Waiting for the partition limit must not hold a bulkhead slot
+        with adaptive_limiter.limit(connection, arguments.get('bucket_name'), key):
+            with connection_guard.guard(connection):
+                return method(self, *args, **kwargs)
+    return wrapper
+
+
+# HTTP method used by each presignable client method
+PRESIGN_METHODS = {
+    'get_object': 'GET',
+    'put_object': 'PUT',
+    'head_object': 'HEAD',
+    'delete_object': 'DELETE'
+}
+
 
 class S3Service:
     def __init__(self):
         """Initialize default S3 client from env vars"""
+        # boto3 sessions are not thread-safe, so client construction on the
+        # shared session (and its loader cache) is serialised
+        self._session = boto3.session.Session()
+        self._session_lock = threading.Lock()
+        self.client_cache = S3ClientCache(max_size=settings.S3_CLIENT_CACHE_SIZE)
+        self.bucket_regions = BucketRegionCache(
+            max_size=settings.BUCKET_REGION_CACHE_SIZE,
+            ttl=settings.BUCKET_REGION_CACHE_TTL,
+            negative_ttl=settings.BUCKET_REGION_NEGATIVE_TTL
+        )
+        self.listings = ListingCache(
+            max_bytes=settings.LISTING_CACHE_MAX_BYTES,
+            ttl=settings.LISTING_CACHE_TTL,
+            stale_ttl=settings.LISTING_CACHE_STALE_TTL,
+            refresh_workers=settings.LISTING_CACHE_REFRESH_WORKERS
+        )
         self._default_client = self._create_client_from_env()
+        # Incremented from many worker threads
+        self.presign_counts = {"local": 0, "botocore": 0}
+        self._presign_counts_lock = threading.Lock()
+
+    def _count_presigns(self, signer: str, count: int = 1) -> None:
+        """Count URLs or POST policies signed locally or by botocore"""
+        with self._presign_counts_lock:
+            self.presign_counts[signer] += count
 
-    def _create_client_from_env(self):
+    def presign_stats(self) -> Dict[str, int]:
+        """Return the local and botocore presign counters"""
+        with self._presign_counts_lock:
+            return dict(self.presign_counts)
+
+    def _new_client(self, service_name: str, **client_kwargs):
+        """Create a boto3 client on the shared session"""
+        with self._session_lock:
+            client = self._session.client(service_name, **client_kwargs)
+        # Retries and follow-up requests stop once the request's budget is spent
+        client.meta.events.register(
+            f'before-send.{service_name}',
+            lambda **kwargs: deadline.check("S3 request")
+        )
+        # Throttled attempts, including botocore's own retries, lower the
+        # partition's concurrency limit
+        client.meta.events.register(f'response-received.{service_name}', adaptive_limiter.observe_response)
+        return client
+
+    def _create_client_from_env(self, region: Optional[str] = None, read_timeout: Optional[float] = None):
         """Create S3 client using environment variables"""
         session_kwargs = {
-            'region_name': settings.AWS_REGION
+            'region_name': region or settings.AWS_REGION
         }
         
         if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
             session_kwargs['aws_access_key_id'] = settings.AWS_ACCESS_KEY_ID
             session_kwargs['aws_secret_access_key'] = settings.AWS_SECRET_ACCESS_KEY
+        
+        if settings.AWS_ENDPOINT_URL:
+            session_kwargs['endpoint_url'] = settings.AWS_ENDPOINT_URL
+            
+        config = self._client_config(read_timeout=read_timeout)
+        return s3_client_metrics.instrument(
+            self._new_client('s3', config=config, **session_kwargs),
+            None,
+            config.max_pool_connections
+        )
+
+    @staticmethod
+    def _client_config(connection: Optional[S3Connection] = None, read_timeout: Optional[float] = None) -> Config:
+        """
+        Client config with the connection's pool, timeout, retry and endpoint settings
+        Settings a connection leaves empty use the global defaults; ``read_timeout``
+        overrides the configured timeouts for requests with a short deadline
+        """
+        def option(name: str, default):
+            value = getattr(connection, name, None) if connection else None
+            return default if value is None else value
+        
+        connect_timeout = option('connect_timeout', settings.S3_CONNECT_TIMEOUT)
+        if read_timeout is None:
+            read_timeout = option('read_timeout', settings.S3_READ_TIMEOUT)
+        else:
+            connect_timeout = min(connect_timeout, read_timeout)
+        
+        s3_options = {}
+        if connection:
+            if connection.addressing_style and connection.addressing_style != 'auto':
+                s3_options['addressing_style'] = connection.addressing_style
+            if connection.use_accelerate_endpoint:
+                s3_options['use_accelerate_endpoint'] = True
+            if connection.use_dualstack_endpoint:
+                s3_options['use_dualstack_endpoint'] = True
+        
+        return S3_CLIENT_CONFIG.merge(Config(
+            max_pool_connections=option('max_pool_connections', settings.S3_MAX_POOL_CONNECTIONS),
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={
+                'mode': option('retry_mode', settings.S3_RETRY_MODE),
+                'total_max_attempts': option('max_attempts', settings.S3_MAX_ATTEMPTS)
+            },
+            tcp_keepalive=option('tcp_keepalive', settings.S3_TCP_KEEPALIVE),
+            s3=s3_options or None
+        ))
+
+    @staticmethod
+    def _endpoint_options(connection: Optional[S3Connection] = None) -> sigv4.EndpointOptions:
+        """Endpoint variants used by the local signer"""
+        if not connection:
+            return sigv4.DEFAULT_ENDPOINT
+        return sigv4.EndpointOptions(
+            addressing_style=connection.addressing_style or 'auto',
+            use_accelerate_endpoint=bool(connection.use_accelerate_endpoint),
+            use_dualstack_endpoint=bool(connection.use_dualstack_endpoint)
+        )
+
+    def _create_client_for_connection(
+        self,
+        connection: S3Connection,
+        region: Optional[str] = None,
+        read_timeout: Optional[float] = None
+    ) -> Tuple[Any, Optional[datetime]]:
+        """
+        Build an S3 client for a connection, optionally for another region
+        Returns the client and the time it stops being usable (None if never)
+        """
+        session_kwargs = {
+            'region_name': region or connection.region
+        }
+        if connection.endpoint_url:
+            session_kwargs['endpoint_url'] = connection.endpoint_url
+        expires_at = None
+        
+        if connection.auth_method == AuthMethod.ACCESS_KEY:
+            session_kwargs['aws_access_key_id'] = connection.access_key_id
+            session_kwargs['aws_secret_access_key'] = connection.secret_access_key
+            
+        elif connection.auth_method in (AuthMethod.IAM_ROLE, AuthMethod.IAM_ROLES_ANYWHERE):
+            # Assumed-role and Roles Anywhere session credentials are cached
+            # and renewed by the credential manager
+            credentials = credential_manager.get_credentials(connection)
+            
+            session_kwargs['aws_access_key_id'] = credentials['AccessKeyId']
+            session_kwargs['aws_secret_access_key'] = credentials['SecretAccessKey']
+            session_kwargs['aws_session_token'] = credentials['SessionToken']
+            expires_at = credentials['Expiration'] - CREDENTIAL_EXPIRY_MARGIN
             
-        return boto3.client('s3', **session_kwargs)
+        
+        config = self._client_config(connection, read_timeout)
+        client = self._new_client('s3', config=config, **session_kwargs)
+        return s3_client_metrics.instrument(client, connection.id, config.max_pool_connections), expires_at
 
-    def get_client(self, connection: Optional[S3Connection] = None):
+    def get_client(self, connection: Optional[S3Connection] = None, region: Optional[str] = None):
         """
         Get S3 client, either default or from specific connection
+        Clients for saved connections are cached per (id, updated_at, region, timeout);
+        ``region`` only needs to be given when it differs from the configured one.
+        When the request's deadline is shorter than the read timeout, a client
+        with the matching timeout tier is returned instead.
         """
+        if region == (connection.region if connection else settings.AWS_REGION):
+            region = None
+        default_timeout = (connection.read_timeout if connection else None) or settings.S3_READ_TIMEOUT
+        timeout = deadline.timeout_tier(default_timeout)
+        
         if not connection:
-            return self._default_client
+            if region is None and timeout is None:
+                return self._default_client
+            return self.client_cache.get_or_create(
+                (None, region, timeout),
+                lambda: (self._create_client_from_env(region, timeout), None)
+            )
             
         try:
-            session_kwargs = {
-                'region_name': connection.region
-            }
+            if connection.id is None:
+                # Unsaved connections (e.g. connection tests) are never cached
+                client, _ = self._create_client_for_connection(connection, region, timeout)
+                return client
             
-            if connection.auth_method == AuthMethod.ACCESS_KEY:
-                session_kwargs['aws_access_key_id'] = connection.access_key_id
-                session_kwargs['aws_secret_access_key'] = connection.secret_access_key
-                
-            elif connection.auth_method == AuthMethod.IAM_ROLE:
-                # Assume role logic
-                sts_client = boto3.client('sts', region_name=connection.region)
-                assume_role_kwargs = {
-                    'RoleArn': connection.role_arn,
-                    'RoleSessionName': 'S3AccessManagerSession'
-                }
-                if connection.external_id:
-                    assume_role_kwargs['ExternalId'] = connection.external_id
-                    
-                assumed_role = sts_client.assume_role(**assume_role_kwargs)
-                credentials = assumed_role['Credentials']
-                
-                session_kwargs['aws_access_key_id'] = credentials['AccessKeyId']
-                session_kwargs['aws_secret_access_key'] = credentials['SecretAccessKey']
-                session_kwargs['aws_session_token'] = credentials['SessionToken']
-                
-            # TODO: Implement IAM_ROLES_ANYWHERE support if needed
-            
-            return boto3.client('s3', **session_kwargs)
+            return self.client_cache.get_or_create(
+                (connection.id, connection.updated_at, region, timeout),
+                lambda: self._create_client_for_connection(connection, region, timeout)
+            )
             
         except Exception as e:
             logger.error(f"Error creating S3 client for connection {connection.name}: {e}")
             raise
 
+    @guarded(resolve_region=False)
+    def _lookup_bucket_region(self, bucket_name: str, connection: Optional[S3Connection] = None) -> Optional[str]:
+        """Find a bucket's region from the x-amz-bucket-region header of HeadBucket"""
+        client = self.get_client(connection)
+        try:
+            response = self._hedged_read(connection, 'HeadBucket', lambda: client.head_bucket(Bucket=bucket_name), bucket_name)
+            headers = response['ResponseMetadata']['HTTPHeaders']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchBucket'):
+                return None
+            # Redirects and access denied responses still carry the region
+            headers = e.response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+            if 'x-amz-bucket-region' not in headers:
+                raise
+        return headers.get('x-amz-bucket-region')
+
+    @staticmethod
+    def _hedged_read(
+        connection: Optional[S3Connection],
+        operation: str,
+        request,
+        bucket_name: str,
+        key: Optional[str] = None
+    ):
+        """
+        Send an idempotent read, with a second attempt if it is slow (S3_HEDGING_ENABLED)
+        The second attempt needs its own bulkhead and partition slots; without them it is not sent
+        """
+        def acquire_slot():
+            release_guard = connection_guard.try_acquire(connection)
+            if release_guard is None:
+                return None
+            release_limit = adaptive_limiter.try_acquire(connection, bucket_name, key)
+            if release_limit is None:
+                release_guard()
+                return None
+
+            def release() -> None:
+                release_limit()
+                release_guard()
+            return release
+
+        return request_hedger.call(connection.id if connection else None, operation, request, acquire_slot)
+
+    def bucket_region(self, bucket_name: str, connection: Optional[S3Connection] = None) -> str:
+        """
+        Get the region a bucket lives in
+        Falls back to the configured region when it cannot be determined
+        """
+        configured_region = connection.region if connection else settings.AWS_REGION
+        if connection and connection.id is None:
+            return configured_region
+        
+        region = self.bucket_regions.get_or_lookup(
+            (connection.id if connection else None, bucket_name),
+            lambda: self._lookup_bucket_region(bucket_name, connection)
+        )
+        return region or configured_region
+
+    def _bucket_client(self, bucket_name: str, connection: Optional[S3Connection] = None):
+        """Get a client for the bucket's own region, avoiding cross-region redirects"""
+        return self.get_client(connection, self.bucket_region(bucket_name, connection))
+
+    def invalidate_connection(self, connection_id: int) -> None:
+        """Drop cached clients, bucket regions, listings and credentials after a connection is edited or deleted"""
+        self.client_cache.invalidate(connection_id)
+        decrypted_credentials.invalidate(connection_id)
+        self.bucket_regions.invalidate(connection_id)
+        self.listings.invalidate_connection(connection_id)
+        credential_manager.invalidate(connection_id)
+        # New settings or credentials deserve a fresh start
+        connection_guard.reset(connection_id)
+
+    def _signing_credentials(self, connection: Optional[S3Connection] = None) -> Optional[sigv4.SigningCredentials]:
+        """
+        Get static credentials for local presigning
+        Returns None when only botocore can sign (custom endpoint, unsupported auth)
+        """
+        if not connection:
+            if settings.AWS_ENDPOINT_URL:
+                return None
+            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+                return sigv4.SigningCredentials(settings.AWS_ACCESS_KEY_ID, settings.AWS_SECRET_ACCESS_KEY)
+            credentials = self._session.get_credentials()
+            if credentials is None:
+                return None
+            frozen = credentials.get_frozen_credentials()
+            return sigv4.SigningCredentials(frozen.access_key, frozen.secret_key, frozen.token)
+        
+        if connection.endpoint_url:
+            return None
+        
+        if connection.auth_method == AuthMethod.ACCESS_KEY:
+            access_key_id = connection.access_key_id
+            secret_access_key = connection.secret_access_key
+            if access_key_id and secret_access_key:
+                return sigv4.SigningCredentials(access_key_id, secret_access_key)
+            
+        elif connection.auth_method in (AuthMethod.IAM_ROLE, AuthMethod.IAM_ROLES_ANYWHERE):
+            credentials = credential_manager.get_credentials(connection)
+            return sigv4.SigningCredentials(
+                credentials['AccessKeyId'],
+                credentials['SecretAccessKey'],
+                credentials['SessionToken']
+            )
+            
+        return None
+
     def generate_presigned_url(
         self,
         bucket_name: str,
@@ -80,20 +376,48 @@ class S3Service:
             expiration = settings.PRESIGNED_URL_EXPIRATION
         
         try:
-            client = self.get_client(connection)
-            url = client.generate_presigned_url(
-                ClientMethod=operation,
-                Params={
-                    'Bucket': bucket_name,
-                    'Key': object_key
-                },
-                ExpiresIn=expiration
-            )
-            return url
+            # Sign locally when possible, it skips the botocore request pipeline
+            credentials = self._signing_credentials(connection) if operation in PRESIGN_METHODS else None
+            region = self.bucket_region(bucket_name, connection)
+            return self._presign_url(credentials, region, bucket_name, object_key, operation, expiration, connection)
         except ClientError as e:
             logger.error(f"Error generating presigned URL: {e}")
             raise
     
+    def _presign_url(
+        self,
+        credentials: Optional[sigv4.SigningCredentials],
+        region: str,
+        bucket_name: str,
+        object_key: str,
+        operation: str,
+        expiration: int,
+        connection: Optional[S3Connection] = None
+    ) -> str:
+        """Presign a URL with resolved credentials and region; without credentials botocore signs it"""
+        if credentials:
+            self._count_presigns("local")
+            return sigv4.presign_url(
+                credentials,
+                region,
+                bucket_name,
+                object_key,
+                method=PRESIGN_METHODS[operation],
+                expires_in=expiration,
+                endpoint=self._endpoint_options(connection)
+            )
+        
+        self._count_presigns("botocore")
+        client = self.get_client(connection, region)
+        return client.generate_presigned_url(
+            ClientMethod=operation,
+            Params={
+                'Bucket': bucket_name,
+                'Key': object_key
+            },
+            ExpiresIn=expiration
+        )
+    
     def generate_presigned_post(
         self,
         bucket_name: str,
@@ -109,39 +433,175 @@ class S3Service:
         if max_size is None:
             max_size = settings.MAX_UPLOAD_SIZE
         
-        conditions = [
+        conditions = self._object_post_conditions(bucket_name, object_key, max_size)
+        return self._sign_post(bucket_name, object_key, conditions, expiration, connection)
+    
+    @staticmethod
+    def _object_post_conditions(bucket_name: str, object_key: str, max_size: int) -> List:
+        """POST policy conditions for uploading one object"""
+        return [
             {"bucket": bucket_name},
             ["starts-with", "$key", object_key],
             ["content-length-range", 0, max_size]
         ]
+    
+    def generate_presigned_post_for_prefix(
+        self,
+        bucket_name: str,
+        prefix: str,
+        expiration: int = None,
+        max_size: int = None,
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """
+        Generate one presigned POST valid for any key under a prefix
+        The returned key field is prefix + '${filename}'; clients may replace it
+        with any key that starts with the prefix
+        """
+        if expiration is None:
+            expiration = settings.PRESIGNED_URL_EXPIRATION
         
+        if max_size is None:
+            max_size = settings.MAX_UPLOAD_SIZE
+        
+        # The signer adds ["starts-with", "$key", prefix] for '${filename}' keys
+        conditions = [
+            {"bucket": bucket_name},
+            ["content-length-range", 0, max_size]
+        ]
+        
+        return self._sign_post(bucket_name, prefix + '${filename}', conditions, expiration, connection)
+    
+    def _sign_post(
+        self,
+        bucket_name: str,
+        object_key: str,
+        conditions: List,
+        expiration: int,
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """Sign a POST policy locally, or through botocore if that is not possible"""
         try:
-            client = self.get_client(connection)
-            response = client.generate_presigned_post(
-                Bucket=bucket_name,
-                Key=object_key,
-                Conditions=conditions,
-                ExpiresIn=expiration
-            )
-            return response
+            credentials = self._signing_credentials(connection)
+            region = self.bucket_region(bucket_name, connection)
+            return self._presign_post(credentials, region, bucket_name, object_key, conditions, expiration, connection)
         except ClientError as e:
             logger.error(f"Error generating presigned POST: {e}")
             raise
     
+    def _presign_post(
+        self,
+        credentials: Optional[sigv4.SigningCredentials],
+        region: str,
+        bucket_name: str,
+        object_key: str,
+        conditions: List,
+        expiration: int,
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """Sign a POST policy with resolved credentials and region; without credentials botocore signs it"""
+        if credentials:
+            self._count_presigns("local")
+            return sigv4.presign_post(
+                credentials,
+                region,
+                bucket_name,
+                object_key,
+                conditions=conditions,
+                expires_in=expiration,
+                endpoint=self._endpoint_options(connection)
+            )
+        
+        self._count_presigns("botocore")
+        client = self.get_client(connection, region)
+        return client.generate_presigned_post(
+            Bucket=bucket_name,
+            Key=object_key,
+            Conditions=conditions,
+            ExpiresIn=expiration
+        )
+    
+    def generate_presigned_batch(
+        self,
+        items: List[Tuple[str, str, str, Optional[S3Connection]]],
+        expiration: int = None
+    ) -> List[Dict]:
+        """
+        Presign uploads (POST) and downloads (GET URL) of many objects in one call
+        Items are (bucket name, object key, 'upload' or 'download', connection).
+        Signing credentials are resolved once per connection and regions once
+        per bucket. Each result holds ``url`` (and ``fields`` for uploads), or
+        ``error`` with the exception the item failed with.
+        """
+        if expiration is None:
+            expiration = settings.PRESIGNED_URL_EXPIRATION
+        
+        credentials_by_connection: Dict[Optional[int], Any] = {}
+        regions: Dict[Tuple[Optional[int], str], Any] = {}
+        
+        def resolved(cache: Dict, key, resolve):
+            # Failures are remembered too, so one bad connection is not retried per item
+            if key not in cache:
+                try:
+                    cache[key] = resolve()
+                except Exception as e:
+                    cache[key] = e
+            if isinstance(cache[key], Exception):
+                raise cache[key]
+            return cache[key]
+        
+        results = []
+        for bucket_name, object_key, operation, connection in items:
+            connection_id = connection.id if connection else None
+            try:
+                credentials = resolved(
+                    credentials_by_connection, connection_id, lambda: self._signing_credentials(connection)
+                )
+                region = resolved(
+                    regions, (connection_id, bucket_name), lambda: self.bucket_region(bucket_name, connection)
+                )
+                if operation == "upload":
+                    conditions = self._object_post_conditions(bucket_name, object_key, settings.MAX_UPLOAD_SIZE)
+                    results.append(self._presign_post(
+                        credentials, region, bucket_name, object_key, conditions, expiration, connection
+                    ))
+                else:
+                    results.append({'url': self._presign_url(
+                        credentials, region, bucket_name, object_key, 'get_object', expiration, connection
+                    )})
+            except Exception as e:
+                logger.error(f"Error presigning {bucket_name}/{object_key}: {e}")
+                results.append({'error': e})
+        return results
+    
+    @guarded
     def list_objects(
         self,
         bucket_name: str,
         prefix: str = "",
         max_keys: int = 1000,
-        connection: Optional[S3Connection] = None
-    ) -> List[Dict]:
-        """List objects in an S3 bucket with prefix"""
+        connection: Optional[S3Connection] = None,
+        continuation_token: Optional[str] = None,
+        start_after: Optional[str] = None,
+        delimiter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List one page of objects in an S3 bucket with prefix
+        Returns the objects, the common prefixes rolled up at ``delimiter``
+        and the token of the next page (None on the last page)
+        """
+        params = {'Bucket': bucket_name, 'Prefix': prefix, 'MaxKeys': max_keys}
+        if delimiter:
+            params['Delimiter'] = delimiter
+        # S3 ignores StartAfter once a continuation token is given
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+        elif start_after:
+            params['StartAfter'] = start_after
         try:
-            client = self.get_client(connection)
-            response = client.list_objects_v2(
-                Bucket=bucket_name,
-                Prefix=prefix,
-                MaxKeys=max_keys
+            client = self._bucket_client(bucket_name, connection)
+            response = self._hedged_read(
+                connection, 'ListObjectsV2', lambda: client.list_objects_v2(**params), bucket_name, prefix
             )
             
             objects = []
@@ -154,11 +614,149 @@ class S3Service:
                         'etag': obj['ETag'].strip('"')
                     })
             
-            return objects
+            return {
+                'objects': objects,
+                'prefixes': [common['Prefix'] for common in response.get('CommonPrefixes', [])],
+                'next_token': response.get('NextContinuationToken') if response.get('IsTruncated') else None
+            }
         except ClientError as e:
             logger.error(f"Error listing objects: {e}")
             raise
     
+    def list_objects_cached(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        max_keys: int = 1000,
+        connection: Optional[S3Connection] = None,
+        continuation_token: Optional[str] = None,
+        start_after: Optional[str] = None,
+        delimiter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List one page of objects through the listing cache
+        A stale cached page is returned at once and refreshed in the background
+        """
+        params = dict(
+            bucket_name=bucket_name,
+            prefix=prefix,
+            max_keys=max_keys,
+            continuation_token=continuation_token,
+            start_after=start_after,
+            delimiter=delimiter
+        )
+        if not settings.LISTING_CACHE_ENABLED:
+            return self.list_objects(connection=connection, **params)
+
+        connection_id = connection.id if connection else None
+
+        def refresh() -> Dict[str, Any]:
+            # Runs after the request is gone, so it loads its own copy of the connection
+            refreshed = None
+            if connection_id is not None:
+                db = SessionLocal()
+                try:
+                    refreshed = db.query(S3Connection).filter(S3Connection.id == connection_id).first()
+                    if refreshed is None:
+                        raise ValueError(f"S3 connection {connection_id} no longer exists")
+                    db.expunge(refreshed)
+                finally:
+                    db.close()
+            return self.list_objects(connection=refreshed, **params)
+
+        key = (connection_id, bucket_name, prefix, delimiter, continuation_token, start_after, max_keys)
+        return self.listings.get_or_list(
+            key,
+            lambda: self.list_objects(connection=connection, **params),
+            refresh
+        )
+    
+    def query_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        connection: Optional[S3Connection] = None,
+        delimiter: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False,
+        extensions: Optional[List[str]] = None,
+        contains: Optional[str] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Filter and sort every object under a prefix
+
+        Walks the prefix one cached 1000-key page at a time, keeping only
+        matching objects, and stops after LISTING_QUERY_MAX_OBJECTS scanned
+        objects (reported as ``truncated``). Names are matched after the
+        prefix and case-insensitively; ``extensions`` are given without dots.
+        Returns the sorted objects, the matching sub-folders and a summary.
+        """
+        contains = contains.lower() if contains else None
+        suffixes = tuple(
+            f".{extension}" for extension in (part.strip().lower().lstrip('.') for part in extensions or []) if extension
+        )
+        # Sub-folders have no extension or date to match
+        keep_directories = not suffixes and modified_after is None and modified_before is None
+
+        objects: List[Dict] = []
+        directories: List[str] = []
+        scanned = 0
+        token = None
+        while True:
+            page = self.list_objects_cached(
+                bucket_name=bucket_name,
+                prefix=prefix,
+                max_keys=1000,
+                connection=connection,
+                continuation_token=token,
+                delimiter=delimiter
+            )
+            scanned += len(page['objects'])
+            for obj in page['objects']:
+                name = obj['key'][len(prefix):].lower()
+                if not name:
+                    continue
+                if suffixes and not name.endswith(suffixes):
+                    continue
+                if contains and contains not in name:
+                    continue
+                if modified_after and obj['last_modified'] < modified_after:
+                    continue
+                if modified_before and obj['last_modified'] >= modified_before:
+                    continue
+                objects.append(obj)
+            if keep_directories:
+                directories.extend(
+                    directory for directory in page['prefixes']
+                    if not contains or contains in directory[len(prefix):].lower()
+                )
+            token = page['next_token']
+            if token is None or scanned >= settings.LISTING_QUERY_MAX_OBJECTS:
+                break
+
+        sort_key = {
+            'name': lambda obj: obj['key'],
+            'size': lambda obj: (obj['size'], obj['key']),
+            'last_modified': lambda obj: (obj['last_modified'], obj['key'])
+        }[sort]
+        objects.sort(key=sort_key, reverse=descending)
+        directories.sort(reverse=descending and sort == 'name')
+
+        return {
+            'objects': objects,
+            'prefixes': directories,
+            'summary': {
+                'count': len(objects),
+                'total_bytes': sum(obj['size'] for obj in objects),
+                'directory_count': len(directories),
+                'scanned': scanned,
+                'truncated': token is not None
+            }
+        }
+    
+    @guarded
     def get_object_metadata(
         self,
         bucket_name: str,
@@ -167,11 +765,11 @@ class S3Service:
     ) -> Dict:
         """Get metadata for a specific S3 object"""
         try:
-            client = self.get_client(connection)
-            response = client.head_object(
+            client = self._bucket_client(bucket_name, connection)
+            response = self._hedged_read(connection, 'HeadObject', lambda: client.head_object(
                 Bucket=bucket_name,
                 Key=object_key
-            )
+            ), bucket_name, object_key)
             
             return {
                 'size': response['ContentLength'],
@@ -184,15 +782,17 @@ class S3Service:
             logger.error(f"Error getting object metadata: {e}")
             raise
     
+    @guarded
     def check_bucket_access(self, bucket_name: str, connection: Optional[S3Connection] = None) -> bool:
         """Check if the application has access to a bucket"""
         try:
-            client = self.get_client(connection)
-            client.head_bucket(Bucket=bucket_name)
+            client = self._bucket_client(bucket_name, connection)
+            self._hedged_read(connection, 'HeadBucket', lambda: client.head_bucket(Bucket=bucket_name), bucket_name)
             return True
         except ClientError:
             return False
     
+    @guarded
     def list_buckets(self, connection: Optional[S3Connection] = None) -> List[str]:
         """List all accessible S3 buckets"""
         try:
@@ -222,6 +822,7 @@ class S3Service:
                 "message": str(e)
             }
 
+    @guarded
     def delete_object(
         self,
         bucket_name: str,
@@ -230,7 +831,7 @@ class S3Service:
     ) -> None:
         """Delete an object from S3"""
         try:
-            client = self.get_client(connection)
+            client = self._bucket_client(bucket_name, connection)
             client.delete_object(
                 Bucket=bucket_name,
                 Key=object_key
@@ -238,6 +839,190 @@ class S3Service:
         except ClientError as e:
             logger.error(f"Error deleting object: {e}")
             raise
+        finally:
+            # Also when the call failed, it may have deleted the object anyway
+            self.listings.invalidate(bucket_name, object_key)
+
+    @guarded
+    def create_multipart_upload(
+        self,
+        bucket_name: str,
+        object_key: str,
+        content_type: Optional[str] = None,
+        connection: Optional[S3Connection] = None
+    ) -> str:
+        """Start a multipart upload and return its upload id"""
+        params = {
+            'Bucket': bucket_name,
+            'Key': object_key
+        }
+        if content_type:
+            params['ContentType'] = content_type
+        
+        try:
+            client = self._bucket_client(bucket_name, connection)
+            response = client.create_multipart_upload(**params)
+            return response['UploadId']
+        except ClientError as e:
+            logger.error(f"Error creating multipart upload: {e}")
+            raise
+    
+    def generate_presigned_part_urls(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expiration: int = None,
+        connection: Optional[S3Connection] = None
+    ) -> Dict[int, str]:
+        """Generate presigned PUT URLs for parts of a multipart upload"""
+        if expiration is None:
+            expiration = settings.PRESIGNED_URL_EXPIRATION
+        
+        try:
+            credentials = self._signing_credentials(connection)
+            if credentials:
+                region = self.bucket_region(bucket_name, connection)
+                endpoint = self._endpoint_options(connection)
+                self._count_presigns("local", len(part_numbers))
+                return {
+                    part_number: sigv4.presign_url(
+                        credentials,
+                        region,
+                        bucket_name,
+                        object_key,
+                        method='PUT',
+                        expires_in=expiration,
+                        query_params=[('uploadId', upload_id), ('partNumber', str(part_number))],
+                        endpoint=endpoint
+                    )
+                    for part_number in part_numbers
+                }
+            
+            self._count_presigns("botocore", len(part_numbers))
+            client = self._bucket_client(bucket_name, connection)
+            return {
+                part_number: client.generate_presigned_url(
+                    ClientMethod='upload_part',
+                    Params={
+                        'Bucket': bucket_name,
+                        'Key': object_key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number
+                    },
+                    ExpiresIn=expiration
+                )
+                for part_number in part_numbers
+            }
+        except ClientError as e:
+            logger.error(f"Error generating presigned part URLs: {e}")
+            raise
+    
+    @guarded
+    def complete_multipart_upload(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        parts: List[Dict],
+        connection: Optional[S3Connection] = None
+    ) -> Dict:
+        """
+        Complete a multipart upload
+        parts: dicts with part_number and etag, in any order
+        """
+        try:
+            client = self._bucket_client(bucket_name, connection)
+            response = client.complete_multipart_upload(
+                Bucket=bucket_name,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': part['part_number'], 'ETag': part['etag']}
+                        for part in sorted(parts, key=lambda part: part['part_number'])
+                    ]
+                }
+            )
+            self.listings.invalidate(bucket_name, object_key)
+            return {
+                'location': response.get('Location'),
+                'etag': response.get('ETag', '').strip('"')
+            }
+        except ClientError as e:
+            logger.error(f"Error completing multipart upload: {e}")
+            raise
+    
+    @guarded
+    def abort_multipart_upload(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        connection: Optional[S3Connection] = None
+    ) -> None:
+        """Abort a multipart upload and free its stored parts"""
+        try:
+            client = self._bucket_client(bucket_name, connection)
+            client.abort_multipart_upload(
+                Bucket=bucket_name,
+                Key=object_key,
+                UploadId=upload_id
+            )
+        except ClientError as e:
+            logger.error(f"Error aborting multipart upload: {e}")
+            raise
+
+    
+    @guarded
+    def list_parts(
+        self,
+        bucket_name: str,
+        object_key: str,
+        upload_id: str,
+        connection: Optional[S3Connection] = None
+    ) -> List[Dict]:
+        """List every part already stored for a multipart upload"""
+        try:
+            client = self._bucket_client(bucket_name, connection)
+            paginator = client.get_paginator('list_parts')
+            parts = []
+            for page in paginator.paginate(Bucket=bucket_name, Key=object_key, UploadId=upload_id):
+                for part in page.get('Parts', []):
+                    parts.append({
+                        'part_number': part['PartNumber'],
+                        'etag': part['ETag'],
+                        'size': part['Size'],
+                        'last_modified': part['LastModified']
+                    })
+            return parts
+        except ClientError as e:
+            logger.error(f"Error listing multipart upload parts: {e}")
+            raise
+
+    @guarded
+    def list_multipart_uploads(
+        self,
+        bucket_name: str,
+        connection: Optional[S3Connection] = None
+    ) -> List[Dict]:
+        """List every in-progress multipart upload in a bucket"""
+        try:
+            client = self._bucket_client(bucket_name, connection)
+            paginator = client.get_paginator('list_multipart_uploads')
+            uploads = []
+            for page in paginator.paginate(Bucket=bucket_name):
+                for upload in page.get('Uploads', []):
+                    uploads.append({
+                        'object_key': upload['Key'],
+                        'upload_id': upload['UploadId'],
+                        'initiated': upload['Initiated']
+                    })
+            return uploads
+        except ClientError as e:
+            logger.error(f"Error listing multipart uploads: {e}")
+            raise
 
 
 # Singleton instance
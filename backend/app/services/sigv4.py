@@ -0,0 +1,228 @@
+"""
+Local AWS Signature Version 4 presigning for S3.
+
+Produces the same presigned URLs and POST policies as a botocore S3 client
+configured with ``signature_version='s3v4'``, without going through the
+botocore request/event pipeline. Derived signing keys are cached per
+(secret key, date, region).
+"""
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+SERVICE = 's3'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+POLICY_EXPIRATION_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Bucket names that can be used as a virtual host label (same rule as botocore)
+_DNS_LABEL_RE = re.compile(r'^[a-z0-9][a-z0-9\-]*[a-z0-9]$')
+
+
+class SigningCredentials(NamedTuple):
+    access_key: str
+    secret_key: str
+    token: Optional[str] = None
+
+
+class EndpointOptions(NamedTuple):
+    """AWS endpoint variants, same meaning as botocore's ``Config(s3=...)`` options"""
+    addressing_style: str = 'auto'
+    use_accelerate_endpoint: bool = False
+    use_dualstack_endpoint: bool = False
+
+
+DEFAULT_ENDPOINT = EndpointOptions()
+
+
+@functools.lru_cache(maxsize=1024)
+def _signing_key(secret_key: str, datestamp: str, region: str) -> bytes:
+    """Derive the SigV4 signing key (cached, it only changes once a day)"""
+    k_date = hmac.new(('AWS4' + secret_key).encode('utf-8'), datestamp.encode('utf-8'), hashlib.sha256).digest()
+    k_region = hmac.new(k_date, region.encode('utf-8'), hashlib.sha256).digest()
+    k_service = hmac.new(k_region, SERVICE.encode('utf-8'), hashlib.sha256).digest()
+    return hmac.new(k_service, b'aws4_request', hashlib.sha256).digest()
+
+
+def signing_key_cache_info() -> Dict[str, int]:
+    """Return hit/miss counters of the signing key cache"""
+    info = _signing_key.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
+
+
+def _percent_encode(value: str) -> str:
+    return quote(value, safe='-_.~')
+
+
+def _is_dns_compatible(bucket_name: str) -> bool:
+    return 3 <= len(bucket_name) <= 63 and _DNS_LABEL_RE.match(bucket_name) is not None
+
+
+def _bucket_location(
+    bucket_name: str,
+    region: str,
+    endpoint: EndpointOptions = DEFAULT_ENDPOINT
+) -> Tuple[str, str]:
+    """
+    Return (host, path prefix) for a bucket
+
+    Mirrors botocore's presign addressing: DNS-compatible buckets use the
+    global virtual-hosted endpoint, anything else falls back to path style
+    on the regional endpoint. Acceleration always uses the virtual host and
+    dual-stack always uses the regional dual-stack endpoint.
+    """
+    virtual = _is_dns_compatible(bucket_name)
+
+    if endpoint.use_accelerate_endpoint:
+        if not virtual:
+            raise ValueError(f"Transfer Acceleration requires a DNS-compatible bucket name: {bucket_name}")
+        dualstack = '.dualstack' if endpoint.use_dualstack_endpoint else ''
+        return f"{bucket_name}.s3-accelerate{dualstack}.amazonaws.com", ""
+
+    if endpoint.use_dualstack_endpoint:
+        host = f"s3.dualstack.{region}.amazonaws.com"
+    elif region == 'us-east-1':
+        host = "s3.amazonaws.com"
+    else:
+        host = f"s3.{region}.amazonaws.com"
+
+    if endpoint.addressing_style == 'path' or not virtual:
+        return host, f"/{bucket_name}"
+    if endpoint.addressing_style == 'auto' and not endpoint.use_dualstack_endpoint:
+        return f"{bucket_name}.s3.amazonaws.com", ""
+    return f"{bucket_name}.{host}", ""
+
+
+def _credential_scope(datestamp: str, region: str) -> str:
+    return f"{datestamp}/{region}/{SERVICE}/aws4_request"
+
+
+def presign_url(
+    credentials: SigningCredentials,
+    region: str,
+    bucket_name: str,
+    object_key: str,
+    method: str = 'GET',
+    expires_in: int = 3600,
+    query_params: Optional[List[Tuple[str, str]]] = None,
+    now: Optional[datetime] = None,
+    endpoint: EndpointOptions = DEFAULT_ENDPOINT
+) -> str:
+    """
+    Build a SigV4 query-string presigned URL for an object
+    ``query_params`` are operation parameters such as uploadId/partNumber
+    """
+    now = now or datetime.utcnow()
+    timestamp = now.strftime(TIMESTAMP_FORMAT)
+    datestamp = timestamp[:8]
+
+    host, path_prefix = _bucket_location(bucket_name, region, endpoint)
+    path = f"{path_prefix}/{quote(object_key, safe='/~')}"
+
+    params = list(query_params or [])
+    params += [
+        ('X-Amz-Algorithm', ALGORITHM),
+        ('X-Amz-Credential', f"{credentials.access_key}/{_credential_scope(datestamp, region)}"),
+        ('X-Amz-Date', timestamp),
+        ('X-Amz-Expires', str(expires_in)),
+        ('X-Amz-SignedHeaders', 'host'),
+    ]
+    if credentials.token:
+        params.append(('X-Amz-Security-Token', credentials.token))
+
+    encoded = [(_percent_encode(k), _percent_encode(v)) for k, v in params]
+    canonical_query = '&'.join(f"{k}={v}" for k, v in sorted(encoded))
+
+    canonical_request = '\n'.join([
+        method,
+        path,
+        canonical_query,
+        f"host:{host}\n",
+        'host',
+        UNSIGNED_PAYLOAD
+    ])
+    string_to_sign = '\n'.join([
+        ALGORITHM,
+        timestamp,
+        _credential_scope(datestamp, region),
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+    ])
+    signature = hmac.new(
+        _signing_key(credentials.secret_key, datestamp, region),
+        string_to_sign.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+    query = '&'.join(f"{k}={v}" for k, v in encoded)
+    return f"https://{host}{path}?{query}&X-Amz-Signature={signature}"
+
+
+def presign_post(
+    credentials: SigningCredentials,
+    region: str,
+    bucket_name: str,
+    object_key: str,
+    conditions: Optional[List] = None,
+    expires_in: int = 3600,
+    now: Optional[datetime] = None,
+    endpoint: EndpointOptions = DEFAULT_ENDPOINT
+) -> Dict:
+    """
+    Build a SigV4 presigned POST (url + form fields)
+
+    Like botocore, a key ending in ``${filename}`` is matched with a
+    starts-with condition, any other key must match exactly.
+    """
+    now = now or datetime.utcnow()
+    timestamp = now.strftime(TIMESTAMP_FORMAT)
+    datestamp = timestamp[:8]
+    credential = f"{credentials.access_key}/{_credential_scope(datestamp, region)}"
+
+    conditions = list(conditions or [])
+    conditions.append({'bucket': bucket_name})
+    if object_key.endswith('${filename}'):
+        conditions.append(['starts-with', '$key', object_key[:-len('${filename}')]])
+    else:
+        conditions.append({'key': object_key})
+    conditions.append({'x-amz-algorithm': ALGORITHM})
+    conditions.append({'x-amz-credential': credential})
+    conditions.append({'x-amz-date': timestamp})
+
+    fields = {
+        'key': object_key,
+        'x-amz-algorithm': ALGORITHM,
+        'x-amz-credential': credential,
+        'x-amz-date': timestamp
+    }
+    if credentials.token:
+        fields['x-amz-security-token'] = credentials.token
+        conditions.append({'x-amz-security-token': credentials.token})
+
+    policy = {
+        'expiration': (now + timedelta(seconds=expires_in)).strftime(POLICY_EXPIRATION_FORMAT),
+        'conditions': conditions
+    }
+    fields['policy'] = base64.b64encode(json.dumps(policy).encode('utf-8')).decode('utf-8')
+    fields['x-amz-signature'] = hmac.new(
+        _signing_key(credentials.secret_key, datestamp, region),
+        fields['policy'].encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+    host, path_prefix = _bucket_location(bucket_name, region, endpoint)
+    return {
+        'url': f"https://{host}{path_prefix or '/'}",
+        'fields': fields
+    }
@@ -0,0 +1,195 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.audit_log import AuditLog
+from app.models.permission import Permission
+from app.models.s3_connection import S3Connection
+from app.models.user import User
+from app.services.s3_service import s3_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """
+    Pays the first-request costs of a worker before it reports ready.
+
+    Stages, each timed and reported:
+    - db_pool: open WARMUP_DB_CONNECTIONS pooled database connections
+    - s3_clients: build the S3 client of every active connection, which
+      decrypts its credentials and assumes its role (or opens its Roles
+      Anywhere session), and resolve the regions of the buckets its
+      permissions refer to
+    - permissions: load the user and permission rows of users active in
+      the last WARMUP_ACTIVE_USER_HOURS, priming the compiled-statement
+      cache and the database's buffer cache
+
+    A failing stage is logged and reported but does not keep the worker
+    from becoming ready; neither does a warm-up running past WARMUP_TIMEOUT.
+    Stages not started by then are skipped, and a timer marks the worker
+    ready even while a stage is still hanging on the database.
+    """
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer: Optional[threading.Timer] = None
+        self.report: Optional[Dict[str, Any]] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def _warm_db_pool(self) -> Dict[str, Any]:
+        connections = []
+        try:
+            # Hold them all at once so the pool really opens that many
+            for _ in range(settings.WARMUP_DB_CONNECTIONS):
+                connection = engine.connect()
+                connections.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+        return {"connections": len(connections)}
+
+    def _warm_s3_clients(self, executor: ThreadPoolExecutor, give_up_at: float) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            connections = db.query(S3Connection).filter(S3Connection.is_active == True).all()
+            buckets = db.query(Permission.s3_connection_id, Permission.bucket_name).distinct().all()
+            # Detach so worker threads can read the attributes after the session closes
+            for connection in connections:
+                db.expunge(connection)
+        finally:
+            db.close()
+
+        by_id = {connection.id: connection for connection in connections}
+        bucket_names = [
+            (connection_id, bucket_name) for connection_id, bucket_name in buckets
+            if connection_id is None or connection_id in by_id
+        ][:settings.WARMUP_MAX_BUCKETS]
+
+        # Clients first, so the region lookups reuse them instead of racing to build them
+        phases: List[List[Callable[[], Any]]] = [
+            [(lambda connection=connection: s3_service.get_client(connection)) for connection in connections],
+            [
+                (lambda bucket_name=bucket_name, connection=by_id.get(connection_id):
+                    s3_service.bucket_region(bucket_name, connection))
+                for connection_id, bucket_name in bucket_names
+            ]
+        ]
+        errors: List[str] = []
+        unfinished = 0
+        for tasks in phases:
+            futures = [executor.submit(task) for task in tasks]
+            done, not_done = wait(futures, timeout=max(0.0, give_up_at - time.monotonic()))
+            errors += [str(future.exception()) for future in done if future.exception() is not None]
+            unfinished += len(not_done)
+        for error in errors:
+            logger.warning(f"Warm-up S3 task failed: {error}")
+        return {
+            "connections": len(connections),
+            "buckets": len(bucket_names),
+            "failed": len(errors),
+            "unfinished": unfinished
+        }
+
+    def _warm_permissions(self) -> Dict[str, Any]:
+        since = datetime.now(timezone.utc) - timedelta(hours=settings.WARMUP_ACTIVE_USER_HOURS)
+        db = SessionLocal()
+        try:
+            user_ids = [
+                user_id for (user_id,) in db.query(AuditLog.user_id)
+                .filter(AuditLog.created_at >= since)
+                .distinct()
+                .limit(settings.WARMUP_MAX_USERS)
+                .all()
+            ]
+            permissions = 0
+            for user_id in user_ids:
+                # The same queries authentication and permission checks run
+                db.query(User).filter(User.id == user_id).first()
+                permissions += len(db.query(Permission).filter(Permission.user_id == user_id).all())
+        finally:
+            db.close()
+        return {"users": len(user_ids), "permissions": permissions}
+
+    def run(self) -> Dict[str, Any]:
+        """Run every warm-up stage once and return the report"""
+        started = time.monotonic()
+        give_up_at = started + settings.WARMUP_TIMEOUT
+        stages: Dict[str, Any] = {}
+
+        def stage(name: str, func: Callable[[], Dict[str, Any]]) -> None:
+            if time.monotonic() >= give_up_at:
+                logger.warning(f"Warm-up stage {name} skipped, WARMUP_TIMEOUT reached")
+                stages[name] = {"status": "skipped"}
+                return
+            stage_started = time.monotonic()
+            try:
+                result = func()
+                result["status"] = "ok"
+            except Exception as e:
+                logger.error(f"Warm-up stage {name} failed: {e}")
+                result = {"status": "failed", "error": str(e)}
+            result["duration_ms"] = round((time.monotonic() - stage_started) * 1000, 2)
+            stages[name] = result
+
+        executor = ThreadPoolExecutor(max_workers=settings.WARMUP_CONCURRENCY, thread_name_prefix="warmup")
+        try:
+            stage("db_pool", self._warm_db_pool)
+            stage("s3_clients", lambda: self._warm_s3_clients(executor, give_up_at))
+            stage("permissions", self._warm_permissions)
+        finally:
+            # Tasks still running past the timeout finish in the background
+            executor.shutdown(wait=False)
+
+        report = {
+            "completed_at": datetime.now(timezone.utc),
+            "duration_ms": round((time.monotonic() - started) * 1000, 2),
+            "stages": stages
+        }
+        logger.info(f"Warm-up finished in {report['duration_ms']} ms")
+        return report
+
+    def _run_and_mark_ready(self) -> None:
+        try:
+            self.report = self.run()
+        finally:
+            self._ready.set()
+            if self._timer:
+                self._timer.cancel()
+
+    def start(self) -> None:
+        """Warm up in a background thread; the worker is ready once it finishes or times out"""
+        if not settings.WARMUP_ENABLED:
+            self._ready.set()
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        # A stage blocked on the database cannot hold readiness past the timeout
+        self._timer = threading.Timer(settings.WARMUP_TIMEOUT, self._ready.set)
+        self._timer.daemon = True
+        self._timer.start()
+        self._thread = threading.Thread(target=self._run_and_mark_ready, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return readiness and the last warm-up report"""
+        return {
+            "enabled": settings.WARMUP_ENABLED,
+            "ready": self.ready,
+            "report": self.report
+        }
+
+
+# Singleton instance
+warmup_service = WarmupService()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading a connection's access keys with and without the Fernet and decrypted-credential caches
+
+Usage: python scripts/benchmark_credentials.py [iterations]
+"""
+import base64
+import sys
+import time
+from cryptography.fernet import Fernet
+from app.core.config import settings
+from app.models.s3_connection import S3Connection, decrypted_credentials
+
+
+def _uncached_fernet() -> Fernet:
+    """The key derivation every access used to repeat"""
+    key = settings.SECRET_KEY
+    if len(key) < 32:
+        key = key.ljust(32, '0')
+    return Fernet(base64.urlsafe_b64encode(key[:32].encode('utf-8')))
+
+
+def _read_uncached(connection: S3Connection):
+    access_key_id = _uncached_fernet().decrypt(connection._access_key_id.encode('utf-8')).decode('utf-8')
+    secret_access_key = _uncached_fernet().decrypt(connection._secret_access_key.encode('utf-8')).decode('utf-8')
+    return access_key_id, secret_access_key
+
+
+def _read_cached(connection: S3Connection):
+    return connection.access_key_id, connection.secret_access_key
+
+
+def _measure(label: str, read, connection: S3Connection, iterations: int, baseline: float = None) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        read(connection)
+    per_call_us = (time.perf_counter() - started) / iterations * 1e6
+    speedup = f" ({baseline / per_call_us:.1f}x)" if baseline else ""
+    print(f"{label:<38} {per_call_us:8.2f} us per request{speedup}")
+    return per_call_us
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    saved = S3Connection(id=1, name='benchmark', account_id='123456789012')
+    saved.access_key_id = 'AKIDEXAMPLE'
+    saved.secret_access_key = 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY'
+    # Unsaved connections skip the plaintext cache but share the Fernet instance
+    unsaved = S3Connection(name='benchmark-unsaved', account_id='123456789012')
+    unsaved._access_key_id = saved._access_key_id
+    unsaved._secret_access_key = saved._secret_access_key
+
+    assert _read_uncached(saved) == _read_cached(saved) == _read_cached(unsaved)
+
+    baseline = _measure("uncached (new Fernet, decrypt x2)", _read_uncached, saved, iterations)
+    _measure("cached Fernet, decrypt x2", _read_cached, unsaved, iterations, baseline)
+    _measure("cached Fernet and plaintext", _read_cached, saved, iterations, baseline)
+    print(f"decrypted credential cache: {decrypted_credentials.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Check the local SigV4 presigner against botocore and benchmark both
+
+Usage: python scripts/benchmark_presign.py [iterations]
+"""
+import sys
+import time
+import types
+import datetime
+from unittest import mock
+import boto3
+from botocore.config import Config
+from app.services import sigv4
+
+FIXED_NOW = datetime.datetime(2024, 3, 1, 12, 30, 45)
+
+CASES = [
+    # region, bucket, key, token
+    ('us-east-1', 'my-bucket', 'photos/2024/img 001.jpg', None),
+    ('eu-west-1', 'my-bucket', 'a b/ü~+x.txt', 'TOKEN/+=value'),
+    ('eu-west-1', 'my.dotted.bucket', 'reports/q1.pdf', None),
+    ('us-east-1', 'UpperCaseBucket', 'k', 'token'),
+    ('ap-southeast-2', 'bucket-two', 'deep/nested/path/file.tar.gz', None),
+]
+
+ENDPOINTS = [
+    sigv4.DEFAULT_ENDPOINT,
+    sigv4.EndpointOptions(addressing_style='path'),
+    sigv4.EndpointOptions(addressing_style='virtual'),
+    sigv4.EndpointOptions(use_dualstack_endpoint=True),
+    sigv4.EndpointOptions(use_accelerate_endpoint=True),
+    sigv4.EndpointOptions(use_accelerate_endpoint=True, use_dualstack_endpoint=True),
+]
+
+
+class _FrozenDatetime(datetime.datetime):
+    @classmethod
+    def utcnow(cls):
+        return FIXED_NOW
+
+
+def _frozen_botocore_time():
+    frozen = types.SimpleNamespace(datetime=_FrozenDatetime, timedelta=datetime.timedelta)
+    return mock.patch('botocore.auth.datetime', frozen), mock.patch('botocore.signers.datetime', frozen)
+
+
+def _client(region, token, endpoint=sigv4.DEFAULT_ENDPOINT):
+    s3_options = {
+        'use_accelerate_endpoint': endpoint.use_accelerate_endpoint,
+        'use_dualstack_endpoint': endpoint.use_dualstack_endpoint
+    }
+    if endpoint.addressing_style != 'auto':
+        s3_options['addressing_style'] = endpoint.addressing_style
+    return boto3.client(
+        's3',
+        region_name=region,
+        aws_access_key_id='AKIDEXAMPLE',
+        aws_secret_access_key='wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY',
+        aws_session_token=token,
+        config=Config(signature_version='s3v4', s3=s3_options)
+    )
+
+
+def check_conformance():
+    """Compare presigned URLs and POST policies with botocore output"""
+    failures = 0
+    total = 0
+    auth_patch, signers_patch = _frozen_botocore_time()
+    with auth_patch, signers_patch:
+        for endpoint in ENDPOINTS:
+            for region, bucket, key, token in CASES:
+                if endpoint.use_accelerate_endpoint and not sigv4._is_dns_compatible(bucket):
+                    # Neither signer can address this bucket through acceleration
+                    continue
+                client = _client(region, token, endpoint)
+                credentials = sigv4.SigningCredentials(
+                    'AKIDEXAMPLE', 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY', token
+                )
+                label = f"{endpoint} {region} {bucket}/{key}"
+                for operation, method in (('get_object', 'GET'), ('put_object', 'PUT')):
+                    expected = client.generate_presigned_url(
+                        ClientMethod=operation,
+                        Params={'Bucket': bucket, 'Key': key},
+                        ExpiresIn=900
+                    )
+                    actual = sigv4.presign_url(
+                        credentials, region, bucket, key, method, 900, now=FIXED_NOW, endpoint=endpoint
+                    )
+                    total += 1
+                    if actual != expected:
+                        failures += 1
+                        print(f"MISMATCH {method} {label}\n  botocore: {expected}\n  local:    {actual}")
+
+                expected = client.generate_presigned_url(
+                    ClientMethod='upload_part',
+                    Params={'Bucket': bucket, 'Key': key, 'UploadId': 'upload/+=id', 'PartNumber': 7},
+                    ExpiresIn=900
+                )
+                actual = sigv4.presign_url(
+                    credentials, region, bucket, key, 'PUT', 900,
+                    query_params=[('uploadId', 'upload/+=id'), ('partNumber', '7')],
+                    now=FIXED_NOW,
+                    endpoint=endpoint
+                )
+                total += 1
+                if actual != expected:
+                    failures += 1
+                    print(f"MISMATCH upload_part {label}\n  botocore: {expected}\n  local:    {actual}")
+
+                conditions = [
+                    {"bucket": bucket},
+                    ["starts-with", "$key", key],
+                    ["content-length-range", 0, 1024]
+                ]
+                # botocore appends to the list it is given
+                expected = client.generate_presigned_post(
+                    Bucket=bucket, Key=key, Conditions=list(conditions), ExpiresIn=900
+                )
+                actual = sigv4.presign_post(
+                    credentials, region, bucket, key, conditions, 900, now=FIXED_NOW, endpoint=endpoint
+                )
+                total += 1
+                if actual != expected:
+                    failures += 1
+                    print(f"MISMATCH POST {label}\n  botocore: {expected}\n  local:    {actual}")
+
+    print(f"Conformance: {total - failures}/{total} presigned requests identical to botocore")
+    return failures == 0
+
+
+def benchmark(iterations: int):
+    """Measure presigns per second for botocore and the local signer"""
+    region, bucket, key, token = CASES[1]
+    client = _client(region, token)
+    credentials = sigv4.SigningCredentials('AKIDEXAMPLE', 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY', token)
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        client.generate_presigned_url(
+            ClientMethod='get_object', Params={'Bucket': bucket, 'Key': f"{key}{i}"}, ExpiresIn=3600
+        )
+    botocore_rate = iterations / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        sigv4.presign_url(credentials, region, bucket, f"{key}{i}", 'GET', 3600)
+    local_rate = iterations / (time.perf_counter() - started)
+
+    print(f"botocore presign: {botocore_rate:,.0f}/s")
+    print(f"local presign:    {local_rate:,.0f}/s ({local_rate / botocore_rate:.1f}x)")
+    print(f"signing key cache: {sigv4.signing_key_cache_info()}")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    ok = check_conformance()
+    benchmark(iterations)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Abort abandoned multipart uploads in every bucket referenced by a permission
+
+Usage: python scripts/reap_multipart_uploads.py [--dry-run] [--max-age-hours N]
+"""
+import argparse
+from app.core.config import settings
+from app.services.multipart_reaper import multipart_reaper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true', help="report what would be aborted without aborting")
+    parser.add_argument(
+        '--max-age-hours',
+        type=float,
+        default=settings.MULTIPART_REAPER_MAX_AGE / 3600,
+        help="abort uploads started more than this many hours ago"
+    )
+    args = parser.parse_args()
+
+    report = multipart_reaper.run(dry_run=args.dry_run, max_age=int(args.max_age_hours * 3600))
+
+    verb = "Would abort" if report["dry_run"] else "Aborted"
+    for bucket in report["buckets"]:
+        print(
+            f"[connection {bucket['connection_id']}] {bucket['bucket_name']}: "
+            f"{bucket['uploads_found']} upload(s) found, {verb.lower()} {bucket['uploads_aborted']}, "
+            f"{bucket['bytes_reclaimed']:,} bytes reclaimed, {bucket['errors']} error(s)"
+        )
+    print(
+        f"{verb} {report['uploads_aborted']} upload(s), {report['bytes_reclaimed']:,} bytes "
+        f"in {report['duration_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
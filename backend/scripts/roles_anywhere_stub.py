@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the IAM Roles Anywhere CreateSession endpoint
+
+Verifies the AWS4-X509 signature of each request against the certificate it
+carries and answers with fixed session credentials (for example the ones a
+moto server accepts). Point a connection's Roles Anywhere endpoint URL at it.
+
+Usage: python scripts/roles_anywhere_stub.py [--port 8443] [--access-key testing] [--secret-key testing]
+"""
+import argparse
+import json
+import secrets
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.roles_anywhere import RolesAnywhereError, verify_create_session
+
+
+def make_handler(access_key: str, secret_key: str):
+    class CreateSessionHandler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path != '/sessions':
+                self._reply(404, {"message": f"Unknown path {self.path}"})
+                return
+            try:
+                certificate = verify_create_session('POST', self.path, dict(self.headers), body)
+                request = json.loads(body)
+            except (RolesAnywhereError, ValueError) as e:
+                self._reply(403, {"message": str(e)})
+                return
+
+            duration = int(request.get('durationSeconds', 3600))
+            expiration = datetime.now(timezone.utc) + timedelta(seconds=duration)
+            self._reply(201, {
+                "credentialSet": [{
+                    "assumedRoleUser": {"arn": f"{request.get('roleArn')}/{certificate.serial_number}"},
+                    "credentials": {
+                        "accessKeyId": access_key,
+                        "secretAccessKey": secret_key,
+                        "sessionToken": secrets.token_urlsafe(32),
+                        "expiration": expiration.strftime('%Y-%m-%dT%H:%M:%SZ')
+                    },
+                    "roleArn": request.get('roleArn'),
+                    "sourceIdentity": certificate.subject.rfc4514_string()
+                }],
+                "subjectArn": request.get('profileArn')
+            })
+
+    return CreateSessionHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--access-key', default='testing', help="access key id returned in every session")
+    parser.add_argument('--secret-key', default='testing', help="secret access key returned in every session")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.access_key, args.secret_key))
+    print(f"Roles Anywhere stand-in listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
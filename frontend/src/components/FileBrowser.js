@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Table,
@@ -15,6 +15,11 @@ import {
   Breadcrumbs,
   Link,
   Chip,
+  Button,
+  TextField,
+  Select,
+  MenuItem,
+  InputAdornment,
 } from '@mui/material';
 import {
   Download as DownloadIcon,
@@ -24,6 +29,9 @@ import {
   FolderOpen as FolderOpenIcon,
   Refresh as RefreshIcon,
   Home as HomeIcon,
+  Search as SearchIcon,
+  ArrowUpward as ArrowUpwardIcon,
+  ArrowDownward as ArrowDownwardIcon,
 } from '@mui/icons-material';
 import { s3API } from '../services/api';
 
@@ -32,22 +40,48 @@ export default function FileBrowser({ bucketName, prefix, canWrite, canDelete, o
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [currentPath, setCurrentPath] = useState('');
+  const [nextToken, setNextToken] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [summary, setSummary] = useState(null);
+  const [sort, setSort] = useState('name');
+  const [order, setOrder] = useState('asc');
+  const [searchInput, setSearchInput] = useState('');
+  const [search, setSearch] = useState('');
+  const mounted = useRef(false);
 
   useEffect(() => {
     setCurrentPath('');
     loadFiles('');
   }, [bucketName, prefix]);
 
+  useEffect(() => {
+    // The first load is done by the effect above
+    if (!mounted.current) {
+      mounted.current = true;
+      return;
+    }
+    loadFiles(currentPath);
+  }, [sort, order, search]);
+
+  // Folder mode, sorted, filtered and summarised by the server over the whole folder
+  const listOptions = (continuationToken = null) => ({
+    continuationToken,
+    delimiter: '/',
+    sort,
+    order,
+    search,
+    summary: true
+  });
+
   const loadFiles = async (subPath = '') => {
     setLoading(true);
     setError('');
     try {
       const fullPrefix = prefix + subPath;
-      const response = await s3API.listObjects(bucketName, fullPrefix);
-
-      // Process objects to separate folders and files
-      const processedItems = processS3Objects(response.data.objects, fullPrefix);
-      setItems(processedItems);
+      const response = await s3API.listObjects(bucketName, fullPrefix, listOptions());
+      setItems(toItems(response.data, fullPrefix));
+      setNextToken(response.data.next_token);
+      setSummary(response.data.summary);
 
       // Notify parent of path change
       if (onPathChange) {
@@ -61,41 +95,39 @@ export default function FileBrowser({ bucketName, prefix, canWrite, canDelete, o
     }
   };
 
-  const processS3Objects = (objects, currentPrefix) => {
-    const folders = new Set();
-    const files = [];
-
-    objects.forEach(obj => {
-      const relativePath = obj.key.substring(currentPrefix.length);
-
-      if (relativePath) {
-        const parts = relativePath.split('/');
-
-        if (parts.length > 1 && parts[0]) {
-          // It's in a subfolder
-          folders.add(parts[0]);
-        } else if (parts[0]) {
-          // It's a file in current directory
-          files.push({
-            ...obj,
-            name: parts[0],
-            isFolder: false
-          });
-        }
-      }
-    });
+  const loadMore = async () => {
+    setLoadingMore(true);
+    setError('');
+    try {
+      const fullPrefix = prefix + currentPath;
+      const response = await s3API.listObjects(bucketName, fullPrefix, listOptions(nextToken));
+      setItems([...items, ...toItems(response.data, fullPrefix)]);
+      setNextToken(response.data.next_token);
+    } catch (err) {
+      setError('Failed to load more files');
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-    // Convert folders to array and add metadata
-    const folderItems = Array.from(folders).map(folderName => ({
-      name: folderName,
+  const toItems = (page, currentPrefix) => {
+    const folderItems = page.directories.map(directory => ({
+      name: directory.substring(currentPrefix.length).replace(/\/$/, ''),
       isFolder: true,
-      key: currentPrefix + folderName + '/'
+      key: directory
     }));
 
-    // Sort: folders first, then files (both alphabetically)
-    folderItems.sort((a, b) => a.name.localeCompare(b.name));
-    files.sort((a, b) => a.name.localeCompare(b.name));
+    const files = page.objects
+      // Skip the zero-byte marker object of the folder itself
+      .filter(obj => obj.key.length > currentPrefix.length)
+      .map(obj => ({
+        ...obj,
+        name: obj.key.substring(currentPrefix.length),
+        isFolder: false
+      }));
 
+    // Folders first, each in the order the server sorted them
     return [...folderItems, ...files];
   };
 
@@ -164,8 +196,9 @@ export default function FileBrowser({ bucketName, prefix, canWrite, canDelete, o
     return currentPath.split('/').filter(p => p);
   };
 
-  const folderCount = items.filter(item => item.isFolder).length;
-  const fileCount = items.filter(item => !item.isFolder).length;
+  // The summary covers the whole folder, not just the pages loaded so far
+  const folderCount = summary ? summary.directory_count : items.filter(item => item.isFolder).length;
+  const fileCount = summary ? summary.count : items.filter(item => !item.isFolder).length;
 
   if (loading) {
     return (
@@ -230,12 +263,47 @@ export default function FileBrowser({ bucketName, prefix, canWrite, canDelete, o
               icon={<FileIcon />}
               label={`${fileCount} file(s)`}
               size="small"
+              sx={{ mr: 1 }}
             />
+            {summary && (
+              <Chip
+                label={`${formatFileSize(summary.total_bytes)} total${summary.truncated ? ' (partial)' : ''}`}
+                size="small"
+                variant="outlined"
+              />
+            )}
           </Box>
         </Box>
-        <IconButton size="small" onClick={() => loadFiles(currentPath)}>
-          <RefreshIcon />
-        </IconButton>
+        <Box sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
+          <TextField
+            size="small"
+            placeholder="Search this folder"
+            value={searchInput}
+            onChange={(e) => setSearchInput(e.target.value)}
+            onKeyDown={(e) => e.key === 'Enter' && setSearch(searchInput.trim())}
+            onBlur={() => setSearch(searchInput.trim())}
+            InputProps={{
+              startAdornment: (
+                <InputAdornment position="start">
+                  <SearchIcon fontSize="small" />
+                </InputAdornment>
+              ),
+            }}
+          />
+          <Select size="small" value={sort} onChange={(e) => setSort(e.target.value)}>
+            <MenuItem value="name">Name</MenuItem>
+            <MenuItem value="size">Size</MenuItem>
+            <MenuItem value="last_modified">Last Modified</MenuItem>
+          </Select>
+          <Tooltip title={order === 'asc' ? 'Ascending' : 'Descending'}>
+            <IconButton size="small" onClick={() => setOrder(order === 'asc' ? 'desc' : 'asc')}>
+              {order === 'asc' ? <ArrowUpwardIcon /> : <ArrowDownwardIcon />}
+            </IconButton>
+          </Tooltip>
+          <IconButton size="small" onClick={() => loadFiles(currentPath)}>
+            <RefreshIcon />
+          </IconButton>
+        </Box>
       </Box>
 
       {error && (
@@ -332,6 +400,14 @@ export default function FileBrowser({ bucketName, prefix, canWrite, canDelete, o
           </Table>
         </TableContainer>
       )}
+
+      {nextToken && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 }
@@ -23,9 +23,17 @@ import {
   FolderOpen as FolderOpenIcon,
 } from '@mui/icons-material';
 import { useDropzone } from 'react-dropzone';
-import { s3API } from '../services/api';
+import { s3API, uploadSessionsAPI } from '../services/api';
 import axios from 'axios';
 
+// Same rule the backend applies to single-file upload keys
+const sanitizeFileName = (name) => name.replace(/[^a-zA-Z0-9._-]/g, '_');
+
+// Files at least this large are uploaded in parts through a resumable upload session
+const RESUMABLE_UPLOAD_THRESHOLD = 100 * 1024 * 1024;
+const PART_URL_BATCH_SIZE = 50;
+const PART_UPLOAD_CONCURRENCY = 4;
+
 export default function FileUploadDialog({ open, onClose, bucketName, prefix, currentPath = '', onUploadComplete }) {
   const [files, setFiles] = useState([]);
   const [uploading, setUploading] = useState(false);
@@ -48,6 +56,54 @@ export default function FileUploadDialog({ open, onClose, bucketName, prefix, cu
     setFiles((prev) => prev.filter((_, i) => i !== index));
   };
 
+  const uploadResumable = async (file, objectKey) => {
+    // Resume an interrupted session for the same file instead of starting over
+    const { data: sessions } = await uploadSessionsAPI.list(bucketName);
+    let session = sessions.find((s) => s.object_key === objectKey && s.file_size === file.size);
+    if (!session) {
+      ({ data: session } = await uploadSessionsAPI.create(bucketName, objectKey, file.size, file.type || null));
+    }
+
+    const { data: state } = await uploadSessionsAPI.get(session.id);
+    let uploadedBytes = state.uploaded_bytes;
+    const reportProgress = () => {
+      setProgress((prev) => ({
+        ...prev,
+        [file.name]: Math.round((uploadedBytes * 100) / file.size),
+      }));
+    };
+    reportProgress();
+
+    const uploadPart = async ({ part_number: partNumber, url }) => {
+      const start = (partNumber - 1) * session.part_size;
+      const blob = file.slice(start, Math.min(start + session.part_size, file.size));
+      const response = await axios.put(url, blob);
+      uploadedBytes += blob.size;
+      reportProgress();
+
+      // Record the part so a later attempt skips it (needs ETag exposed by the bucket CORS rules)
+      const etag = response.headers.etag;
+      if (etag) {
+        await uploadSessionsAPI.recordParts(session.id, [{ part_number: partNumber, etag }]);
+      }
+    };
+
+    // Only the parts that are not stored yet are uploaded, a few at a time
+    const missing = state.missing_parts;
+    for (let i = 0; i < missing.length; i += PART_URL_BATCH_SIZE) {
+      const { data } = await uploadSessionsAPI.getPartUrls(session.id, missing.slice(i, i + PART_URL_BATCH_SIZE));
+      const queue = [...data.parts];
+      const worker = async () => {
+        while (queue.length > 0) {
+          await uploadPart(queue.shift());
+        }
+      };
+      await Promise.all(Array.from({ length: PART_UPLOAD_CONCURRENCY }, worker));
+    }
+
+    await uploadSessionsAPI.complete(session.id);
+  };
+
   const uploadFiles = async () => {
     if (files.length === 0) return;
 
@@ -60,19 +116,41 @@ export default function FileUploadDialog({ open, onClose, bucketName, prefix, cu
     let failCount = 0;
 
     try {
+      // One prefix-scoped policy covers every file of a multi-file upload
+      let uploadPolicy = null;
+      if (files.length > 1) {
+        const policyResponse = await s3API.getUploadPolicy(bucketName, fullPath);
+        uploadPolicy = policyResponse.data;
+      }
+
       for (let i = 0; i < files.length; i++) {
         const file = files[i];
-        const objectKey = fullPath ? `${fullPath}${file.name}` : file.name;
+        const fileName = uploadPolicy ? sanitizeFileName(file.name) : file.name;
+        const objectKey = fullPath ? `${fullPath}${fileName}` : fileName;
 
         try {
-          // Get presigned URL
-          const urlResponse = await s3API.getPresignedUrl(
-            bucketName,
-            objectKey,
-            'upload'
-          );
+          if (file.size >= RESUMABLE_UPLOAD_THRESHOLD) {
+            // Completing the session records the upload in the audit log
+            await uploadResumable(file, fullPath ? `${fullPath}${sanitizeFileName(file.name)}` : sanitizeFileName(file.name));
+            successCount++;
+            uploadResults.push({ file: file.name, status: 'success' });
+            continue;
+          }
 
-          const { url, fields } = urlResponse.data;
+          let url;
+          let fields;
+          if (uploadPolicy) {
+            url = uploadPolicy.url;
+            fields = { ...uploadPolicy.fields, key: objectKey };
+          } else {
+            // Get presigned URL
+            const urlResponse = await s3API.getPresignedUrl(
+              bucketName,
+              objectKey,
+              'upload'
+            );
+            ({ url, fields } = urlResponse.data);
+          }
 
           // Create form data for upload
           const formData = new FormData();
@@ -110,7 +188,7 @@ export default function FileUploadDialog({ open, onClose, bucketName, prefix, cu
 
             // Notify backend of successful upload
             try {
-              await s3API.notifyUploadComplete(bucketName, objectKey, 'success');
+              await s3API.notifyUploadComplete(bucketName, objectKey, 'success', null, uploadPolicy?.prefix);
             } catch (notifyErr) {
               console.error('Failed to notify backend:', notifyErr);
             }
@@ -130,7 +208,7 @@ export default function FileUploadDialog({ open, onClose, bucketName, prefix, cu
 
           // Notify backend of failed upload
           try {
-            await s3API.notifyUploadComplete(bucketName, objectKey, 'failure', errorMsg);
+            await s3API.notifyUploadComplete(bucketName, objectKey, 'failure', errorMsg, uploadPolicy?.prefix);
           } catch (notifyErr) {
             console.error('Failed to notify backend:', notifyErr);
           }
@@ -14,18 +14,40 @@ import {
     Chip,
     Box,
     CircularProgress,
-    Alert
+    Alert,
+    Tooltip
 } from '@mui/material';
 import {
     Add as AddIcon,
     Edit as EditIcon,
     Delete as DeleteIcon,
     CheckCircle as CheckCircleIcon,
-    Cancel as CancelIcon
+    Cancel as CancelIcon,
+    Refresh as RefreshIcon
 } from '@mui/icons-material';
 import { s3ConnectionsAPI } from '../services/api';
 import S3ConnectionForm from '../components/S3ConnectionForm';
 
+const healthColors = {
+    healthy: 'success',
+    unhealthy: 'error',
+    unknown: 'default'
+};
+
+function healthTooltip(health) {
+    if (!health.checked_at) {
+        return 'Not checked yet';
+    }
+    const lines = [`Checked ${new Date(health.checked_at).toLocaleString()} (${health.latency_ms} ms)`];
+    if (health.last_success_at) {
+        lines.push(`Last success ${new Date(health.last_success_at).toLocaleString()}`);
+    }
+    if (health.last_error) {
+        lines.push(`Last error ${new Date(health.last_error_at).toLocaleString()}: ${health.last_error}`);
+    }
+    return lines.join('\n');
+}
+
 function S3ConnectionsPage() {
     const [connections, setConnections] = useState([]);
     const [loading, setLoading] = useState(true);
@@ -72,6 +94,17 @@ function S3ConnectionsPage() {
         }
     };
 
+    const handleCheckHealth = async (id) => {
+        try {
+            const response = await s3ConnectionsAPI.checkHealth(id);
+            setConnections((current) => current.map((conn) => (
+                conn.id === id ? { ...conn, health: response.data } : conn
+            )));
+        } catch (err) {
+            setError(err.response?.data?.detail || 'Failed to check connection health');
+        }
+    };
+
     const handleFormSuccess = () => {
         fetchConnections();
     };
@@ -114,13 +147,14 @@ function S3ConnectionsPage() {
                             <TableCell>Region</TableCell>
                             <TableCell>Auth Method</TableCell>
                             <TableCell>Status</TableCell>
+                            <TableCell>Health</TableCell>
                             <TableCell align="right">Actions</TableCell>
                         </TableRow>
                     </TableHead>
                     <TableBody>
                         {connections.length === 0 ? (
                             <TableRow>
-                                <TableCell colSpan={6} align="center">
+                                <TableCell colSpan={7} align="center">
                                     No connections found. Create one to get started.
                                 </TableCell>
                             </TableRow>
@@ -144,7 +178,27 @@ function S3ConnectionsPage() {
                                             <Chip icon={<CancelIcon />} label="Inactive" color="default" size="small" />
                                         )}
                                     </TableCell>
+                                    <TableCell>
+                                        {conn.health ? (
+                                            <Tooltip title={<span style={{ whiteSpace: 'pre-line' }}>{healthTooltip(conn.health)}</span>}>
+                                                <Chip
+                                                    label={conn.health.status.toUpperCase()}
+                                                    color={healthColors[conn.health.status] || 'default'}
+                                                    size="small"
+                                                />
+                                            </Tooltip>
+                                        ) : (
+                                            <Chip label="NOT PROBED" size="small" variant="outlined" />
+                                        )}
+                                    </TableCell>
                                     <TableCell align="right">
+                                        {conn.is_active && (
+                                            <Tooltip title="Check health now">
+                                                <IconButton onClick={() => handleCheckHealth(conn.id)}>
+                                                    <RefreshIcon />
+                                                </IconButton>
+                                            </Tooltip>
+                                        )}
                                         <IconButton onClick={() => handleEdit(conn)} color="primary">
                                             <EditIcon />
                                         </IconButton>
@@ -95,16 +95,35 @@ export const s3API = {
       operation: operation,
     }),
 
-  notifyUploadComplete: (bucketName, objectKey, status, errorMessage = null) =>
+  // items: [{ bucket_name, object_key, operation }]
+  getPresignedUrls: (items) =>
+    api.post('/s3/presigned-urls', { items }),
+
+  getUploadPolicy: (bucketName, prefix, maxSize = null) =>
+    api.post('/s3/upload-policy', {
+      bucket_name: bucketName,
+      prefix: prefix,
+      max_size: maxSize,
+    }),
+
+  notifyUploadComplete: (bucketName, objectKey, status, errorMessage = null, uploadPrefix = null) =>
     api.post('/s3/upload-complete', {
       bucket_name: bucketName,
       object_key: objectKey,
       status: status,
       error_message: errorMessage,
+      upload_prefix: uploadPrefix,
     }),
 
-  listObjects: (bucketName, prefix = '') =>
-    api.get(`/s3/list/${bucketName}`, { params: { prefix } }),
+  // options: continuationToken, delimiter, sort, order, search, extension, summary
+  listObjects: (bucketName, prefix = '', options = {}) => {
+    const { continuationToken, ...query } = options;
+    const params = { prefix, ...(continuationToken && { continuation_token: continuationToken }) };
+    Object.entries(query).forEach(([name, value]) => {
+      if (value) params[name] = value;
+    });
+    return api.get(`/s3/list/${bucketName}`, { params });
+  },
 
   listBuckets: () =>
     api.get('/s3/buckets'),
@@ -113,6 +132,68 @@ export const s3API = {
     api.delete(`/s3/object/${bucketName}/${objectKey}`),
 };
 
+// Multipart Upload API
+export const multipartAPI = {
+  create: (bucketName, objectKey, fileSize, contentType = null) =>
+    api.post('/s3/multipart/create', {
+      bucket_name: bucketName,
+      object_key: objectKey,
+      file_size: fileSize,
+      content_type: contentType,
+    }),
+
+  getPartUrls: (bucketName, objectKey, uploadId, partNumbers) =>
+    api.post('/s3/multipart/part-urls', {
+      bucket_name: bucketName,
+      object_key: objectKey,
+      upload_id: uploadId,
+      part_numbers: partNumbers,
+    }),
+
+  // parts: [{ part_number, etag }]
+  complete: (bucketName, objectKey, uploadId, parts) =>
+    api.post('/s3/multipart/complete', {
+      bucket_name: bucketName,
+      object_key: objectKey,
+      upload_id: uploadId,
+      parts: parts,
+    }),
+
+  abort: (bucketName, objectKey, uploadId) =>
+    api.post('/s3/multipart/abort', {
+      bucket_name: bucketName,
+      object_key: objectKey,
+      upload_id: uploadId,
+    }),
+};
+
+// Resumable upload sessions
+export const uploadSessionsAPI = {
+  create: (bucketName, objectKey, fileSize, contentType = null) =>
+    api.post('/upload-sessions/', {
+      bucket_name: bucketName,
+      object_key: objectKey,
+      file_size: fileSize,
+      content_type: contentType,
+    }),
+
+  list: (bucketName = null) =>
+    api.get('/upload-sessions/', { params: bucketName ? { bucket_name: bucketName } : {} }),
+
+  get: (sessionId) => api.get(`/upload-sessions/${sessionId}`),
+
+  getPartUrls: (sessionId, partNumbers) =>
+    api.post(`/upload-sessions/${sessionId}/part-urls`, { part_numbers: partNumbers }),
+
+  // parts: [{ part_number, etag }]
+  recordParts: (sessionId, parts) =>
+    api.post(`/upload-sessions/${sessionId}/parts`, { parts }),
+
+  complete: (sessionId) => api.post(`/upload-sessions/${sessionId}/complete`),
+
+  abort: (sessionId) => api.delete(`/upload-sessions/${sessionId}`),
+};
+
 // Audit API
 export const auditAPI = {
   getLogs: (filters = {}, skip = 0, limit = 100) =>
@@ -147,6 +228,9 @@ export const s3ConnectionsAPI = {
 
   test: (connectionData) =>
     api.post('/s3-connections/test', connectionData),
+
+  checkHealth: (connectionId) =>
+    api.post(`/s3-connections/${connectionId}/health/check`),
 };
 
 export default api;